@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Reflexive accumulation: ATM share issuance funding BTC purchases
+
+fair_value_model.py's base scenario grows holdings 3% and shares 2% per
+quarter whatever the prices. Here the two are linked through the market,
+path by path: at every step of the joint BTC / premium simulation
+(premium_simulator.py) the company sells new shares at that path's
+simulated MSTR price and buys BTC at its simulated BTC price, which
+changes its holdings, share count and NAV per share, and so the next
+step's MSTR price.
+
+Selling a fraction r of the shares at premium p buys r x p of the current
+holdings, so BTC per share grows by (1 + r p) / (1 + r): issuance above NAV
+is accretive and below it dilutive. By default the company only issues
+while the premium is at least MIN_ISSUE_PREMIUM.
+
+The recursion runs along the time axis only; every step updates all paths
+of a chunk at once, so it runs at Monte Carlo scale like the other
+simulators:
+
+    python accumulation_simulator.py
+    python accumulation_simulator.py --issuance 0.05 --min-premium 1.5
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import btc_monte_carlo
+import fair_value_scenarios
+import nav_data
+import premium_simulator
+
+# No issuance below this premium (selling below NAV shrinks BTC per share)
+MIN_ISSUE_PREMIUM = 1.0
+TRADING_DAYS_PER_QUARTER = 63
+
+N_PATHS = premium_simulator.N_PATHS
+
+
+def accumulation_chunk(rng, config, size):
+    """
+    Prices, holdings, shares and BTC per share at each horizon, each (horizons, size)
+    """
+    start = config['params']['start']
+    holdings = np.full(size, float(start['btc_holdings']))
+    shares = np.full(size, float(start['shares_outstanding']))
+    names = ['btc', 'premium', 'mstr', 'btc_holdings', 'shares_outstanding', 'btc_per_share']
+    out = {name: np.empty((len(config['record']), size)) for name in names}
+
+    rate = config['issuance'] * config['dt'] / TRADING_DAYS_PER_QUARTER
+    row = 0
+    for j, log_btc, log_premium in premium_simulator.iter_steps(rng, config, size):
+        btc = np.exp(log_btc)
+        premium = np.exp(log_premium)
+        # New shares sell at the step's MSTR price (premium x NAV per share before
+        # issuance) and the proceeds buy BTC at the step's BTC price:
+        # new BTC = new shares x premium x holdings / shares
+        issuing = premium >= config['min_premium']
+        new_shares = np.where(issuing, rate[j] * shares, 0.0)
+        holdings += new_shares * premium * holdings / shares
+        shares += new_shares
+
+        if config['record_mask'][j]:
+            btc_per_share = holdings / shares
+            out['btc'][row] = btc
+            out['premium'][row] = premium
+            out['mstr'][row] = premium * btc * btc_per_share
+            out['btc_holdings'][row] = holdings
+            out['shares_outstanding'][row] = shares
+            out['btc_per_share'][row] = btc_per_share
+            row += 1
+    return out
+
+
+def simulate(n_paths=N_PATHS, params=None, issuance=None, min_premium=MIN_ISSUE_PREMIUM,
+             step_days=premium_simulator.STEP_DAYS, seed=0, max_workers=None,
+             scenario=fair_value_scenarios.DEFAULT_SCENARIO, quantiles=premium_simulator.QUANTILES):
+    """
+    Per-quarter quantiles and means of the prices, holdings, share count and
+    BTC per share under reflexive issuance
+
+    `params` are premium_simulator.fit_params() parameters (fitted on the
+    stored history by default). `issuance` is the fraction of the share
+    count sold per quarter while issuing, by default the scenario's
+    dilution assumption. Returns a DataFrame indexed by quarter.
+    """
+    params = params if params is not None else premium_simulator.fit_params(nav_data.load_nav_frame())
+    quarter_ends, assumptions = btc_monte_carlo.scenario_assumptions(scenario)
+    issuance = assumptions['shares_dilution_quarterly'] if issuance is None else issuance
+    start = params['start']
+    config = premium_simulator.build_config(params, step_days, quarter_ends, assumptions)
+    holdings = float(start['btc_holdings'])
+    shares = float(start['shares_outstanding'])
+    config.update({
+        'issuance': issuance,
+        'min_premium': min_premium,
+    })
+    config['ranges'].update({
+        'btc_holdings': (holdings / 10, holdings * 1000),
+        'shares_outstanding': (shares / 10, shares * 1000),
+        'btc_per_share': (holdings / shares / 1000, holdings / shares * 1000),
+    })
+
+    histograms = premium_simulator.run_simulation(accumulation_chunk, config, n_paths, seed, max_workers)
+    table = premium_simulator.quantile_table(histograms, quarter_ends, quantiles)
+    table.attrs.update({'paths': n_paths, 'issuance': issuance, 'min_premium': min_premium,
+                        'start_date': str(start['date'].date()), 'btc_holdings': holdings,
+                        'shares_outstanding': shares, 'assumptions': dict(assumptions)})
+    return table
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--paths': str(N_PATHS), '--issuance': None,
+               '--min-premium': str(MIN_ISSUE_PREMIUM), '--step-days': str(premium_simulator.STEP_DAYS),
+               '--seed': '0', '--workers': None, '--scenario': fair_value_scenarios.DEFAULT_SCENARIO}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    start = time.perf_counter()
+    table = simulate(int(options['--paths']),
+                     issuance=float(options['--issuance']) if options['--issuance'] else None,
+                     min_premium=float(options['--min-premium']), step_days=int(options['--step-days']),
+                     seed=int(options['--seed']),
+                     max_workers=int(options['--workers']) if options['--workers'] else None,
+                     scenario=options['--scenario'])
+    elapsed = time.perf_counter() - start
+
+    attrs = table.attrs
+    print(f"{attrs['paths']:,} paths issuing {attrs['issuance']:.1%} of shares per quarter while the premium "
+          f"is at least {attrs['min_premium']:.2f}x, from {attrs['btc_holdings']:,.0f} BTC and "
+          f"{attrs['shares_outstanding']:,.0f} shares ({attrs['start_date']}), in {elapsed:.1f}s\n")
+
+    assumptions = attrs['assumptions']
+    fixed = btc_monte_carlo.fair_value_path_factors(attrs['btc_holdings'], attrs['shares_outstanding'],
+                                                    len(table), assumptions)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        for name, label, fmt in [('mstr', 'MSTR price', '{:,.2f}'),
+                                 ('btc_holdings', 'BTC holdings', '{:,.0f}'),
+                                 ('shares_outstanding', 'Shares outstanding', '{:,.0f}'),
+                                 ('btc_per_share', 'BTC per share', '{:.6f}')]:
+            with pd.option_context('display.float_format', fmt.format):
+                print(f"{label}:")
+                print(table.filter(regex=f'^(date|{name}_)'))
+                print()
+    print(f"BTC per share under fixed {assumptions['btc_holdings_growth_quarterly']:.0%} holdings growth and "
+          f"{assumptions['shares_dilution_quarterly']:.0%} dilution per quarter: "
+          + ', '.join(f"{v:.6f}" for v in fixed))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+As-of join engine for step-function series such as BTC holdings
+
+Holdings change only at purchase events, so the value at any time t is the
+one recorded by the last event at or before t. With the event dates sorted
+once, a single np.searchsorted call resolves every query timestamp in
+O(n log m), whether the queries are daily closes or millions of minute bars,
+and purchases announced on weekends or holidays still apply from the next
+bar onward.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def to_ns(timestamps):
+    """View datetime-like values as int64 nanoseconds since the epoch"""
+    if isinstance(timestamps, (pd.Series, pd.Index)):
+        timestamps = timestamps.to_numpy(dtype='datetime64[ns]')
+    return np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64)
+
+
+def asof_index(event_times, query_times):
+    """
+    Index of the last event at or before each query time
+
+    Both arguments are int64 arrays; event_times must be sorted. Queries
+    before the first event get -1.
+    """
+    return np.searchsorted(event_times, query_times, side='right') - 1
+
+
+def asof_lookup(event_times, values, query_times, fill_value=np.nan):
+    """Step-function lookup of `values` (aligned with event_times) at query_times"""
+    idx = asof_index(event_times, query_times)
+    values = np.asarray(values, dtype=np.float64)
+    out = values[np.maximum(idx, 0)] if len(values) else np.full(len(idx), fill_value)
+    out[idx < 0] = fill_value
+    return out
+
+
+class HoldingsTable:
+    """
+    Sorted purchase events with cumulative holdings and cost
+
+    Attributes are plain NumPy arrays aligned on `times` (int64 ns):
+      cumulative_btc_holdings    BTC held after each purchase
+      cumulative_cost_millions   total USD spent after each purchase
+      avg_cost_basis             average USD cost per BTC held
+    """
+
+    def __init__(self, dates, cumulative_btc_holdings, total_cost_millions):
+        times = to_ns(dates)
+        order = np.argsort(times, kind='stable')
+        self.times = times[order]
+        self.cumulative_btc_holdings = np.asarray(cumulative_btc_holdings, dtype=np.float64)[order]
+        self.cumulative_cost_millions = np.cumsum(np.asarray(total_cost_millions, dtype=np.float64)[order])
+        self.avg_cost_basis = self.cumulative_cost_millions * 1_000_000 / self.cumulative_btc_holdings
+
+    @classmethod
+    def from_frame(cls, holdings_df):
+        """
+        Build from the purchase history frame (mstr_btc_holdings.json layout)
+
+        Companies without purchase costs may omit total_cost_millions; the
+        cost columns are then NaN.
+        """
+        cost = holdings_df['total_cost_millions'] if 'total_cost_millions' in holdings_df else np.nan
+        return cls(holdings_df['date'],
+                   holdings_df['cumulative_btc_holdings'],
+                   np.broadcast_to(cost, len(holdings_df)))
+
+    def lookup(self, timestamps):
+        """Holdings, cumulative cost and average cost in effect at each timestamp"""
+        query = to_ns(timestamps)
+        idx = asof_index(self.times, query)
+        valid = idx >= 0
+        safe = np.maximum(idx, 0)
+        out = {}
+        for name in ['cumulative_btc_holdings', 'cumulative_cost_millions', 'avg_cost_basis']:
+            values = getattr(self, name)[safe] if len(self.times) else np.zeros(len(query))
+            out[name] = np.where(valid, values, np.nan)
+        return out
+
+    def attach(self, frame, time_column='date'):
+        """Return a copy of `frame` with the as-of holdings columns added"""
+        frame = frame.copy()
+        for name, values in self.lookup(frame[time_column]).items():
+            frame[name] = values
+        return frame
+
+
+class ShareTable:
+    """
+    Dated share-count breakpoints, resolved for a whole timestamp column at once
+
+    Each entry gives the share count in effect from its date onward. Dates
+    before the first entry take the first entry's count.
+    """
+
+    def __init__(self, dates, shares_outstanding):
+        times = to_ns(dates)
+        order = np.argsort(times, kind='stable')
+        self.times = times[order]
+        self.shares_outstanding = np.asarray(shares_outstanding, dtype=np.float64)[order]
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from [{'date': 'YYYY-MM-DD', 'shares_outstanding': N}, ...]"""
+        return cls([r['date'] for r in records], [r['shares_outstanding'] for r in records])
+
+    def lookup(self, timestamps, interpolate=False):
+        """
+        Share count at each timestamp
+
+        With interpolate=True the count moves linearly between consecutive
+        filings instead of stepping at each one; it stays flat outside the
+        table's date range.
+        """
+        query = to_ns(timestamps)
+        if interpolate:
+            return np.interp(query.astype(np.float64), self.times.astype(np.float64), self.shares_outstanding)
+        idx = np.maximum(asof_index(self.times, query), 0)
+        return self.shares_outstanding[idx]
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the data pipeline
+
+Each benchmark runs its variants in fresh child processes, so one variant's
+allocations never hide another's. Wall time is measured in one run and peak
+memory in a second run under tracemalloc (which traces NumPy buffers as well
+as Python objects), since tracing slows the code down:
+
+    python benchmarks.py json_import [ROWS]
+    python benchmarks.py regime_vote [ROWS]
+    python benchmarks.py lead_lag [ROWS] [MAX_LAG]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import lead_lag
+import price_store
+import regime
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def run_child(*args):
+    """Run `python benchmarks.py _child ...` and return its JSON result"""
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '_child', *args],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def print_table(title, results):
+    print(f"\n{title}")
+    print(f"{'variant':<12} {'time (s)':>10} {'peak memory (MB)':>18}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['seconds']:>10.2f} {r['peak_mb']:>18.1f}")
+
+
+# ============================================================================
+# JSON IMPORT: json.load vs streaming batches
+# ============================================================================
+
+def write_history_file(path, rows, interval='1m'):
+    """Write a synthetic history file in the JSON export layout, one record at a time"""
+    step = int(price_store.interval_timedelta(interval).total_seconds())
+    rng = np.random.default_rng(0)
+    close = 50_000 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    dates = (1_700_000_000 + step * np.arange(rows)).astype('datetime64[s]').astype(str)
+    with open(path, 'w') as f:
+        f.write('[\n')
+        for i in range(rows):
+            record = {'date': dates[i], 'open': close[i], 'high': close[i] * 1.001,
+                      'low': close[i] * 0.999, 'close': close[i], 'volume': int(rng.integers(1, 10**9))}
+            f.write('  ' + json.dumps(record) + (',\n' if i < rows - 1 else '\n'))
+        f.write(']\n')
+
+
+def import_with_json_load(path, root, interval):
+    with open(path, 'r') as f:
+        records = json.load(f)
+    return price_store.write_series('BENCH', price_store.records_to_columns(records, interval),
+                                    interval=interval, root=root)
+
+
+def import_streaming(path, root, interval):
+    return price_store.import_json('BENCH', path, root=root, interval=interval)
+
+
+JSON_IMPORTS = {
+    'json.load': import_with_json_load,
+    'streaming': import_streaming,
+}
+
+
+def bench_json_import(rows=2_000_000, interval='1m'):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.json')
+        print(f"Writing {rows:,} synthetic {interval} bars...")
+        write_history_file(path, rows, interval)
+        print(f"History file: {os.path.getsize(path) / 2**20:.0f} MB")
+
+        results = {}
+        for name in JSON_IMPORTS:
+            timed = run_child('json_import', name, path, os.path.join(tmp, name), interval, 'time')
+            traced = run_child('json_import', name, path, os.path.join(tmp, name), interval, 'memory')
+            results[name] = {**timed, **traced}
+        assert len({r['digest'] for r in results.values()}) == 1, "imports produced different series"
+
+    print_table(f"JSON import of {rows:,} rows", results)
+    ratio = results['json.load']['peak_mb'] / results['streaming']['peak_mb']
+    print(f"\nStreaming import peaks at {ratio:.0f}x less memory than json.load")
+    return results
+
+
+def child_json_import(variant, path, root, interval, measure):
+    if measure == 'memory':
+        tracemalloc.start()
+        meta = JSON_IMPORTS[variant](path, root, interval)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {'peak_mb': peak / 2**20, 'digest': meta['digest']}
+    start = time.perf_counter()
+    meta = JSON_IMPORTS[variant](path, root, interval)
+    return {'seconds': time.perf_counter() - start, 'digest': meta['digest']}
+
+
+# ============================================================================
+# REGIME VOTE: row-wise apply vs vectorized signals
+# ============================================================================
+
+def synthetic_nav_frame(rows, interval='1m'):
+    """Merged-frame columns needed by the regime indicators, on a random walk"""
+    step = price_store.interval_timedelta(interval)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2024-01-01') + step * np.arange(rows),
+        'close_btc': 50_000 * np.exp(np.cumsum(rng.normal(0, 0.001, rows))),
+    })
+
+
+def vote_with_apply(frame):
+    """The row-wise majority vote previously used by regime_analysis.py"""
+    labels = {name: np.where(frame[f'signal_{name}'], 'Bull', 'Bear') for name in ['ma', 'momentum', 'ath']}
+    frame = frame.assign(**{f'regime_{name}': values for name, values in labels.items()})
+    return frame.apply(
+        lambda row: 'Bull' if [row['regime_ma'], row['regime_momentum'], row['regime_ath']].count('Bull') >= 2 else 'Bear',
+        axis=1
+    )
+
+
+def bench_regime_vote(rows=1_000_000, interval='1m'):
+    frame = regime.add_regime_indicators(synthetic_nav_frame(rows, interval))
+
+    start = time.perf_counter()
+    signals = {name: (lambda f, name=name: f[f'signal_{name}'].to_numpy()) for name in ['ma', 'momentum', 'ath']}
+    vectorized = regime.classify(frame.copy(), signals)['regime_combined']
+    vectorized_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    applied = vote_with_apply(frame)
+    apply_seconds = time.perf_counter() - start
+
+    assert (np.asarray(vectorized) == applied.to_numpy()).all(), "votes differ"
+    print(f"\nMajority vote over {rows:,} rows")
+    print(f"{'variant':<12} {'time (s)':>10}")
+    print(f"{'apply':<12} {apply_seconds:>10.3f}")
+    print(f"{'vectorized':<12} {vectorized_seconds:>10.3f}")
+    print(f"\nVectorized vote is {apply_seconds / vectorized_seconds:.0f}x faster")
+
+
+# ============================================================================
+# LEAD/LAG: loop over lags vs FFT cross-correlation
+# ============================================================================
+
+def cross_correlation_loop(x, y, max_lag):
+    """One pass over the standardized series per lag"""
+    xs = (x - x.mean()) / x.std()
+    ys = (y - y.mean()) / y.std()
+    n = len(x)
+    return np.array([np.mean(xs[max(0, -k):n - max(0, k)] * ys[max(0, k):n - max(0, -k)])
+                     for k in range(-max_lag, max_lag + 1)])
+
+
+def bench_lead_lag(rows=500_000, max_lag=5_000):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=rows)
+    y = 0.3 * np.roll(x, 60) + rng.normal(size=rows)
+
+    start = time.perf_counter()
+    fast = lead_lag.cross_correlation(x, y, max_lag)
+    fft_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = cross_correlation_loop(x, y, max_lag)
+    loop_seconds = time.perf_counter() - start
+
+    assert np.allclose(fast.to_numpy(), slow), "correlations differ"
+    print(f"\nCross-correlation of {rows:,} rows at {2 * max_lag + 1:,} lags (peak at lag {fast.abs().idxmax()})")
+    print(f"{'variant':<12} {'time (s)':>10}")
+    print(f"{'loop':<12} {loop_seconds:>10.3f}")
+    print(f"{'fft':<12} {fft_seconds:>10.3f}")
+    print(f"\nFFT cross-correlation is {loop_seconds / fft_seconds:.0f}x faster")
+
+
+BENCHMARKS = {
+    'json_import': (bench_json_import, child_json_import),
+    'regime_vote': (bench_regime_vote, None),
+    'lead_lag': (bench_lead_lag, None),
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '_child':
+        _, child = BENCHMARKS[sys.argv[2]]
+        print(json.dumps(child(*sys.argv[3:])))
+        sys.exit(0)
+
+    names = sys.argv[1:2] or list(BENCHMARKS)
+    extra = [int(a) for a in sys.argv[2:]]
+    for name in names:
+        bench, _ = BENCHMARKS[name]
+        bench(*extra)
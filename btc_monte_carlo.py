@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo BTC price paths and fair-value distributions
+
+fair_value_model.py projects MSTR from four hand-picked BTC prices per
+quarter. This simulator draws BTC paths from the latest stored close to
+each 2026 quarter end with one of three return models:
+
+  gbm         geometric Brownian motion with the historical drift and
+              volatility of daily log returns (quarter-end values are drawn
+              directly, no daily steps needed)
+  bootstrap   stationary block bootstrap of historical daily log returns,
+              keeping volatility clusters intact
+  regime      Bull/Bear Markov chain fitted to the regime labels of
+              regime.py, drawing each day's return from the history of the
+              current regime
+
+Along every path fair_value_model.calculate_fair_value() (BTC NAV per share
+x premium target + software value per share, with holdings and shares
+compounding quarterly) is evaluated at each quarter end. The quarter ends,
+starting holdings and share count, growth, dilution and software value
+come from a fair_value_model scenario (scenarios/base_2026.json by default). Paths are simulated in chunks of bounded
+size across a process pool, each chunk with its own SeedSequence child
+stream, and every chunk is reduced to fixed log-spaced histograms, so
+memory does not grow with the number of paths and quantiles come out
+within 0.1% of the exact values:
+
+    python btc_monte_carlo.py --method bootstrap --paths 10000000
+    python btc_monte_carlo.py --scenario scenarios/high_dilution_2026.json
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import fair_value_model
+import fair_value_scenarios
+import histogram
+import nav_benchmarks
+import nav_data
+import regime
+import regime_bootstrap
+
+QUANTILES = [0.05, 0.25, 0.50, 0.75, 0.95]
+N_PATHS = 1_000_000
+
+# Elements of the (paths x days) return matrix simulated at once
+CHUNK_CELLS = 1 << 21
+
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+def btc_history():
+    """Daily BTC closes and the Bull flag of the combined regime (regime.py)"""
+    btc = nav_data.load_prices(nav_data.BTC_SYMBOL)[['date', 'close']].rename(columns={'close': 'close_btc'})
+    btc = btc.dropna().reset_index(drop=True)
+    return regime.add_regime_indicators(btc)[['date', 'close_btc', 'regime_bull']]
+
+
+def fit_model(history, method, block_length=None):
+    """Parameters of one return model from the daily history"""
+    log_returns = np.diff(np.log(history['close_btc'].to_numpy()))
+    model = {'method': method}
+    if method == 'gbm':
+        model['mu'] = log_returns.mean()
+        model['sigma'] = log_returns.std(ddof=1)
+    elif method == 'bootstrap':
+        model['returns'] = log_returns
+        model['block_length'] = block_length or regime_bootstrap.default_block_length(len(log_returns))
+    elif method == 'regime':
+        # A day's return belongs to the regime in force at the start of the day
+        state = history['regime_bull'].to_numpy()[:-1].astype(np.intp)
+        order = np.argsort(state, kind='stable')
+        counts = np.bincount(state, minlength=2)
+        transitions = np.zeros((2, 2))
+        np.add.at(transitions, (state[:-1], state[1:]), 1)
+        model['returns'] = log_returns[order]
+        model['offsets'] = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        model['counts'] = counts
+        model['switch'] = transitions[[0, 1], [1, 0]] / transitions.sum(axis=1)
+        model['start_state'] = int(history['regime_bull'].iloc[-1])
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return model
+
+
+def simulate_log_returns(rng, model, size, days):
+    """
+    Cumulative log return at each horizon in `days`, shape (size, len(days))
+    """
+    days = np.asarray(days)
+    method = model['method']
+    if method == 'gbm':
+        # Independent Gaussian increments between consecutive horizons
+        steps = np.diff(days, prepend=0)
+        increments = rng.normal(model['mu'] * steps, model['sigma'] * np.sqrt(steps), size=(size, len(days)))
+        return np.cumsum(increments, axis=1)
+
+    if method == 'bootstrap':
+        returns = model['returns']
+        index = regime_bootstrap.stationary_indices(rng, size, len(returns), model['block_length'],
+                                                    length=days[-1])
+        daily = returns[index]
+    else:
+        daily = np.empty((size, days[-1]))
+        state = np.full(size, model['start_state'], dtype=np.intp)
+        for t in range(days[-1]):
+            state ^= rng.random(size) < model['switch'][state]
+            pick = (rng.random(size) * model['counts'][state]).astype(np.intp)
+            daily[:, t] = model['returns'][model['offsets'][state] + pick]
+    return np.cumsum(daily, axis=1)[:, days - 1]
+
+
+def scenario_assumptions(scenario=fair_value_scenarios.DEFAULT_SCENARIO):
+    """
+    Quarter ends and assumptions of a fair_value_model scenario (dict or path)
+
+    Returns ({quarter: end date}, assumptions) with the quarters of the
+    scenario's BTC price scenarios.
+    """
+    model = fair_value_model.FairValueModel(scenario)
+    quarter_ends = {quarter: prices['date'] for quarter, prices in model.btc_scenarios.items()}
+    return quarter_ends, model.assumptions
+
+
+def projected_holdings(holdings, shares, n_quarters, assumptions):
+    """Holdings and share count at each quarter end, compounding as in fair_value_model.py"""
+    quarters = np.arange(1, n_quarters + 1)
+    return (holdings * (1 + assumptions['btc_holdings_growth_quarterly']) ** quarters,
+            shares * (1 + assumptions['shares_dilution_quarterly']) ** quarters)
+
+
+def fair_value_path_factors(holdings, shares, n_quarters, assumptions):
+    """BTC per share at each quarter end, as projected by fair_value_model.py"""
+    holdings, shares = projected_holdings(holdings, shares, n_quarters, assumptions)
+    return holdings / shares
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+# Set in each worker process by _init_worker
+_config = None
+
+
+def _init_worker(config):
+    global _config
+    _config = config
+
+
+def _simulate_chunk(task):
+    seed, size = task
+    c = _config
+    rng = np.random.default_rng(seed)
+    prices = c['start_price'] * np.exp(simulate_log_returns(rng, c['model'], size, c['days']))
+    fair = fair_value_model.calculate_fair_value(prices, c['btc_holdings'], c['shares_outstanding'], c['premium'],
+                                                 software_value_per_share=c['software_value'])['fair_price']
+    price_hist = histogram.LogHistogram(*c['price_range'], rows=len(c['days']))
+    fair_hist = histogram.LogHistogram(*c['fair_range'], rows=len(c['days']))
+    price_hist.add(prices.T)
+    fair_hist.add(fair.T)
+    return price_hist, fair_hist
+
+
+def simulate(n_paths=N_PATHS, method='bootstrap', premium=None, seed=0, max_workers=None,
+             block_length=None, scenario=fair_value_scenarios.DEFAULT_SCENARIO, quantiles=QUANTILES):
+    """
+    Per-quarter quantiles and means of the simulated BTC price and MSTR fair value
+
+    `premium` is the NAV premium target of the fair value (by default the
+    historical median from nav_benchmarks). `scenario` supplies the quarter
+    ends, the starting holdings and share count, growth, dilution and
+    software value. Returns a DataFrame indexed by quarter.
+    """
+    quarter_ends, assumptions = scenario_assumptions(scenario)
+    state = fair_value_model.FairValueModel(scenario).state
+    history = btc_history()
+    premium = premium if premium is not None else nav_benchmarks.load_benchmarks()['historical_median']
+    software_value = assumptions['software_business_value_per_share']
+
+    start_date = history['date'].iloc[-1]
+    start_price = history['close_btc'].iloc[-1]
+    days = np.array([(pd.Timestamp(d) - start_date).days for d in quarter_ends.values()])
+    holdings, shares = projected_holdings(state['btc_holdings'], state['shares_outstanding'], len(days), assumptions)
+    top_fair = fair_value_model.calculate_fair_value(start_price * 1000, holdings, shares, premium,
+                                                     software_value_per_share=software_value)['fair_price']
+    config = {
+        'model': fit_model(history, method, block_length),
+        'start_price': start_price,
+        'days': days,
+        'premium': premium,
+        'btc_holdings': holdings,
+        'shares_outstanding': shares,
+        'software_value': software_value,
+        'price_range': (start_price / 1000, start_price * 1000),
+        'fair_range': (software_value + 1e-3, top_fair.max()),
+    }
+
+    size = max(1, CHUNK_CELLS // max(days[-1] if method != 'gbm' else len(days), 1))
+    sizes = [min(size, n_paths - i) for i in range(0, n_paths, size)]
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks)) or 1
+    if max_workers == 1:
+        _init_worker(config)
+        results = map(_simulate_chunk, tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(config,))
+        results = pool.map(_simulate_chunk, tasks)
+
+    price_hist = fair_hist = None
+    try:
+        for chunk_price, chunk_fair in results:
+            if price_hist is None:
+                price_hist, fair_hist = chunk_price, chunk_fair
+            else:
+                price_hist.merge(chunk_price)
+                fair_hist.merge(chunk_fair)
+    finally:
+        if max_workers > 1:
+            pool.shutdown()
+
+    table = pd.DataFrame(index=pd.Index(list(quarter_ends), name='quarter'))
+    table['date'] = list(quarter_ends.values())
+    for prefix, hist in [('btc', price_hist), ('fair_value', fair_hist)]:
+        values = hist.quantiles(quantiles)
+        for j, q in enumerate(quantiles):
+            table[f'{prefix}_q{round(q * 100):02d}'] = values[:, j]
+        table[f'{prefix}_mean'] = hist.mean()
+    table.attrs.update({'paths': n_paths, 'method': method, 'premium': premium,
+                        'start_date': str(start_date.date()), 'start_price': start_price,
+                        'btc_holdings': state['btc_holdings'], 'shares_outstanding': state['shares_outstanding'],
+                        'assumptions': dict(assumptions)})
+    return table
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--method': 'bootstrap', '--paths': str(N_PATHS), '--premium': None, '--seed': '0',
+               '--workers': None, '--block-length': None, '--scenario': fair_value_scenarios.DEFAULT_SCENARIO}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    start = time.perf_counter()
+    table = simulate(int(options['--paths']), options['--method'],
+                     float(options['--premium']) if options['--premium'] else None,
+                     int(options['--seed']), int(options['--workers']) if options['--workers'] else None,
+                     float(options['--block-length']) if options['--block-length'] else None,
+                     options['--scenario'])
+    elapsed = time.perf_counter() - start
+
+    attrs = table.attrs
+    print(f"{attrs['paths']:,} {attrs['method']} paths from BTC ${attrs['start_price']:,.2f} "
+          f"({attrs['start_date']}) in {elapsed:.1f}s, fair value at {attrs['premium']:.2f}x NAV\n")
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:,.0f}'.format):
+        print("BTC price:")
+        print(table.filter(regex='^(date|btc_)'))
+        print("\nMSTR fair value:")
+        with pd.option_context('display.float_format', '{:,.2f}'.format):
+            print(table.filter(regex='^(date|fair_value_)'))
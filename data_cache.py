@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Content-hashed on-disk cache helpers
+
+Cache entries are keyed on digests of their inputs, so a changed input file
+simply produces a new key and the stale entry is never read again.
+"""
+
+import glob
+import hashlib
+import os
+
+CACHE_DIR = '.cache'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def combine_digests(*parts):
+    """Fold several digests (or other strings) into one cache key"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def cache_path(prefix, key, ext, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{prefix}-{key[:16]}.{ext}")
+
+
+def prune(prefix, keep, cache_dir=CACHE_DIR):
+    """Remove entries for `prefix` other than the path in `keep`"""
+    for path in glob.glob(os.path.join(cache_dir, f"{prefix}-*")):
+        if os.path.abspath(path) != os.path.abspath(keep):
+            os.remove(path)
+
+
+def touch(path):
+    """Mark a cache entry as just used (its mtime orders LRU eviction)"""
+    os.utime(path)
+
+
+def evict_lru(prefix, max_entries, cache_dir=CACHE_DIR):
+    """Keep the `max_entries` most recently used entries for `prefix`; return the number removed"""
+    paths = sorted(glob.glob(os.path.join(cache_dir, f"{prefix}-*")), key=os.path.getmtime, reverse=True)
+    for path in paths[max_entries:]:
+        os.remove(path)
+    return max(len(paths) - max_entries, 0)
+
+
+def atomic_write(path, write):
+    """Call write(tmp_path) and move the result into place"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
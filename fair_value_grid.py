@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Broadcasting fair-value grid
+
+fair_value_grid() evaluates the fair value model of fair_value_model.py
+
+    Fair Price = BTC NAV per share x NAV premium + software value per share
+
+over the full cube of BTC prices x premium targets x quarterly holdings
+growth rates x quarterly dilution rates x horizons (in quarters) in one
+NumPy broadcast, and returns a FairValueGrid: the values plus one labeled
+coordinate array per dimension, with label selection and conversion to
+pandas for sensitivity tables.
+
+    python fair_value_grid.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+DIMS = ('btc_price', 'nav_premium', 'holdings_growth', 'dilution', 'horizon')
+
+
+class FairValueGrid:
+    """
+    N-dimensional array of fair prices with labeled coordinates
+
+    `coords` maps each dimension name, in axis order, to its 1-d labels.
+    """
+
+    def __init__(self, values, coords, name='fair_price'):
+        self.values = values
+        self.coords = coords
+        self.name = name
+
+    @property
+    def dims(self):
+        return tuple(self.coords)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __len__(self):
+        return self.values.size
+
+    def __repr__(self):
+        sizes = ', '.join(f"{dim}: {len(labels)}" for dim, labels in self.coords.items())
+        return f"<FairValueGrid {self.name} ({sizes})>"
+
+    def coord(self, dim):
+        """Coordinate labels of `dim`, shaped to broadcast against `values`"""
+        return _axis(self.coords[dim], self.dims.index(dim), len(self.coords))
+
+    def _locate(self, dim, labels):
+        coord = self.coords[dim]
+        positions = [np.flatnonzero(np.isclose(coord, label))[:1] for label in np.atleast_1d(labels)]
+        if any(len(p) == 0 for p in positions):
+            raise KeyError(f"{labels!r} not in {dim} coordinates")
+        return np.concatenate(positions)
+
+    def sel(self, **labels):
+        """
+        Select by coordinate label
+
+        A scalar label drops its dimension and a list keeps it; selecting a
+        scalar on every dimension returns a float.
+        """
+        positions = []
+        coords = {}
+        for dim, coord in self.coords.items():
+            if dim not in labels:
+                positions.append(np.arange(len(coord)))
+                coords[dim] = coord
+            elif np.ndim(labels[dim]) == 0:
+                positions.append(self._locate(dim, labels[dim]))
+            else:
+                positions.append(self._locate(dim, labels[dim]))
+                coords[dim] = coord[positions[-1]]
+        # np.ix_ selects the outer product of the positions on every axis
+        values = self.values[np.ix_(*positions)].reshape([len(c) for c in coords.values()])
+        if not coords:
+            return float(values)
+        return FairValueGrid(values, coords, self.name)
+
+    def to_series(self):
+        """Long pandas Series with a MultiIndex over every dimension"""
+        index = pd.MultiIndex.from_product(list(self.coords.values()), names=self.dims)
+        return pd.Series(self.values.ravel(), index=index, name=self.name)
+
+    def to_frame(self):
+        return self.to_series().reset_index()
+
+    def table(self, index, columns, **labels):
+        """2-d DataFrame of `index` x `columns` after selecting every other dimension by label"""
+        grid = self.sel(**labels) if labels else self
+        if set(grid.dims) != {index, columns}:
+            raise ValueError(f"select a single label for each of {[d for d in grid.dims if d not in (index, columns)]}")
+        values = grid.values if grid.dims == (index, columns) else grid.values.T
+        return pd.DataFrame(values, index=pd.Index(grid.coords[index], name=index),
+                            columns=pd.Index(grid.coords[columns], name=columns))
+
+
+def _axis(values, axis, ndim):
+    shape = [1] * ndim
+    shape[axis] = -1
+    return values.reshape(shape)
+
+
+def fair_value_grid(btc_price, nav_premium, holdings_growth=0.0, dilution=0.0, horizon=0,
+                    btc_holdings=1.0, shares_outstanding=1.0, software_value_per_share=None):
+    """
+    Fair price at every combination of the given values
+
+    Each of the first five arguments is a scalar or 1-d array and becomes
+    one dimension of the result (see DIMS). Holdings and shares compound
+    quarterly from `btc_holdings` and `shares_outstanding` over `horizon`
+    quarters, as in fair_value_model.py's projections. The software value
+    defaults to fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE.
+    """
+    if software_value_per_share is None:
+        # fair_value_model imports this module (through fair_value_scenarios)
+        import fair_value_model
+        software_value_per_share = fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE
+    coords = {dim: np.atleast_1d(np.asarray(values, dtype=np.float64)) for dim, values in
+              zip(DIMS, (btc_price, nav_premium, holdings_growth, dilution, horizon))}
+    price, premium, growth, dil, quarters = (_axis(c, i, len(DIMS)) for i, c in enumerate(coords.values()))
+
+    # BTC per share after `quarters` of growth and dilution: small (growth, dilution, horizon) cube
+    btc_per_share = btc_holdings / shares_outstanding * ((1 + growth) / (1 + dil)) ** quarters
+    # One full-size product and an in-place add for the whole grid
+    values = np.multiply(price * premium, btc_per_share)
+    values += software_value_per_share
+    return FairValueGrid(values, coords)
+
+
+if __name__ == "__main__":
+    import nav_data
+
+    latest = nav_data.load_nav_frame().dropna(subset=['close_btc', 'nav_premium']).iloc[-1]
+    holdings = latest['cumulative_btc_holdings']
+    shares = latest['shares_outstanding']
+
+    btc_prices = np.arange(50_000, 250_001, 1_000)
+    premiums = np.round(np.arange(0.8, 3.01, 0.05), 2)
+    growth = np.linspace(0, 0.06, 13)
+    dilution = np.linspace(0, 0.05, 11)
+    horizons = np.arange(0, 9)
+
+    start = time.perf_counter()
+    grid = fair_value_grid(btc_prices, premiums, growth, dilution, horizons, holdings, shares)
+    elapsed = time.perf_counter() - start
+    print(f"{grid}: {len(grid):,} fair values in {elapsed * 1000:.0f} ms "
+          f"({holdings:,.0f} BTC, {shares:,.0f} shares as of {latest['date'].date()})")
+
+    table = grid.table('btc_price', 'nav_premium', holdings_growth=0.03, dilution=0.02, horizon=4)
+    shown = table.loc[[75_000, 100_000, 125_000, 150_000, 200_000], [1.0, 1.5, 1.8, 2.1, 2.5]]
+    shown.index = shown.index.astype(np.int64)
+    print(f"\nFair MSTR price in 4 quarters (3% holdings growth, 2% dilution per quarter):")
+    with pd.option_context('display.width', 200, 'display.float_format', '${:,.2f}'.format):
+        print(shown)
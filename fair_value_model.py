@@ -2,156 +2,62 @@
 """
 MicroStrategy Fair Value Model
 Predicts fair MSTR price based on NAV Premium analysis and BTC price scenarios
-"""
-
-import json
-import pandas as pd
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, timedelta
-
-# Set style
-plt.style.use('dark_background')
-sns.set_palette("husl")
-
-print("="*80)
-print("MICROSTRATEGY FAIR VALUE MODEL")
-print("="*80)
-
-# ============================================================================
-# CURRENT STATE (as of Nov 6, 2025)
-# ============================================================================
-
-CURRENT_DATE = "2025-11-06"
-CURRENT_BTC_PRICE = 101141.77
-CURRENT_MSTR_PRICE = 237.20
-CURRENT_BTC_HOLDINGS = 641205
-CURRENT_SHARES_OUTSTANDING = 320_000_000  # Estimated
-CURRENT_NAV_PREMIUM = 1.17
-
-# Calculate current NAV
-CURRENT_BTC_NAV = (CURRENT_BTC_PRICE * CURRENT_BTC_HOLDINGS) / 1_000_000  # in millions
-CURRENT_NAV_PER_SHARE = CURRENT_BTC_NAV / (CURRENT_SHARES_OUTSTANDING / 1_000_000)
-
-print(f"\nCurrent State ({CURRENT_DATE}):")
-print(f"  BTC Price: ${CURRENT_BTC_PRICE:,.2f}")
-print(f"  MSTR Price: ${CURRENT_MSTR_PRICE:,.2f}")
-print(f"  BTC Holdings: {CURRENT_BTC_HOLDINGS:,} BTC")
-print(f"  Shares Outstanding: {CURRENT_SHARES_OUTSTANDING:,}")
-print(f"  BTC NAV: ${CURRENT_BTC_NAV:,.0f}M")
-print(f"  NAV per Share: ${CURRENT_NAV_PER_SHARE:,.2f}")
-print(f"  Current NAV Premium: {CURRENT_NAV_PREMIUM:.2f}x")
 
-# ============================================================================
-# HISTORICAL NAV PREMIUM BENCHMARKS (from regime analysis)
-# ============================================================================
+Importing this module has no side effects: calculate_fair_value() and
+FairValueModel are the library, and the NAV premium benchmarks are only
+loaded from the data when a model first needs them. Running it prints the
+report for a scenario file (see fair_value_scenarios.py) and writes
+fair_value_projections.json for the default scenario, or
+fair_value_projections_<scenario name>.json for any other:
 
-NAV_PREMIUM_BENCHMARKS = {
-    'historical_mean': 1.98,
-    'historical_median': 1.79,
-    'bull_market_mean': 2.06,
-    'bull_market_median': 1.98,
-    'bear_market_mean': 1.88,
-    'bear_market_median': 1.62,
-    'current': 1.17,
-    'historical_min': 0.81,
-    'historical_max': 7.42,
-    'fair_value_range': (1.5, 2.5),  # Conservative fair value range
-}
-
-print(f"\nHistorical NAV Premium Benchmarks:")
-for key, value in NAV_PREMIUM_BENCHMARKS.items():
-    if isinstance(value, tuple):
-        print(f"  {key}: {value[0]:.2f}x - {value[1]:.2f}x")
-    else:
-        print(f"  {key}: {value:.2f}x")
+    python fair_value_model.py
+    python fair_value_model.py scenarios/high_dilution_2026.json
+"""
 
-# ============================================================================
-# BTC PRICE SCENARIOS FOR 2026
-# ============================================================================
+import json
+import os
+import sys
 
-# Define BTC price scenarios for each quarter of 2026
-BTC_SCENARIOS = {
-    'Q1_2026': {
-        'date': '2026-03-31',
-        'bear': 75000,
-        'base': 95000,
-        'bull': 125000,
-        'moon': 150000,
-    },
-    'Q2_2026': {
-        'date': '2026-06-30',
-        'bear': 70000,
-        'base': 105000,
-        'bull': 140000,
-        'moon': 175000,
-    },
-    'Q3_2026': {
-        'date': '2026-09-30',
-        'bear': 65000,
-        'base': 115000,
-        'bull': 155000,
-        'moon': 200000,
-    },
-    'Q4_2026': {
-        'date': '2026-12-31',
-        'bear': 60000,
-        'base': 125000,
-        'bull': 170000,
-        'moon': 225000,
-    },
-}
-
-print(f"\nBTC Price Scenarios for 2026:")
-for quarter, scenarios in BTC_SCENARIOS.items():
-    print(f"\n  {quarter} ({scenarios['date']}):")
-    print(f"    Bear: ${scenarios['bear']:,}")
-    print(f"    Base: ${scenarios['base']:,}")
-    print(f"    Bull: ${scenarios['bull']:,}")
-    print(f"    Moon: ${scenarios['moon']:,}")
+import pandas as pd
 
-# ============================================================================
-# ASSUMPTIONS FOR 2026
-# ============================================================================
+import fair_value_scenarios
+import nav_benchmarks
 
-# Bitcoin holdings growth (MSTR continues accumulating)
-BTC_HOLDINGS_GROWTH_QUARTERLY = 0.03  # 3% per quarter (~12.5% annually)
+PROJECTIONS_FILE = 'fair_value_projections.json'
 
-# Shares outstanding growth (dilution from ATM offerings)
-SHARES_DILUTION_QUARTERLY = 0.02  # 2% per quarter (~8% annually)
+# Software business value when none is given (rough, conservative estimate)
+SOFTWARE_BUSINESS_VALUE_PER_SHARE = 15
 
-# Software business value (rough estimate)
-SOFTWARE_BUSINESS_VALUE_PER_SHARE = 15  # Conservative estimate
+# Today's fair value cases: (name, NAV premium benchmark key or fixed premium)
+TODAY_CASES = [
+    ('Conservative (Bear Market Median)', 'bear_market_median'),
+    ('Fair Value (Historical Median)', 'historical_median'),
+    ('Bull Case (Bull Market Mean)', 'bull_market_mean'),
+    ('Optimistic (2.5x Premium)', 2.5),
+]
 
-print(f"\nModel Assumptions:")
-print(f"  BTC Holdings Growth: {BTC_HOLDINGS_GROWTH_QUARTERLY*100:.1f}% per quarter")
-print(f"  Share Dilution: {SHARES_DILUTION_QUARTERLY*100:.1f}% per quarter")
-print(f"  Software Business Value: ${SOFTWARE_BUSINESS_VALUE_PER_SHARE:.0f} per share")
 
 # ============================================================================
 # FAIR VALUE CALCULATION FUNCTION
 # ============================================================================
 
-def calculate_fair_value(btc_price, btc_holdings, shares_outstanding, nav_premium_target, 
+def calculate_fair_value(btc_price, btc_holdings, shares_outstanding, nav_premium_target,
                          include_software=True, software_value_per_share=SOFTWARE_BUSINESS_VALUE_PER_SHARE):
     """
     Calculate fair MSTR price given inputs
-    
+
     Fair Price = (BTC NAV * NAV Premium + Software Value) / Shares Outstanding
     """
     btc_nav_millions = (btc_price * btc_holdings) / 1_000_000
     nav_per_share = btc_nav_millions / (shares_outstanding / 1_000_000)
-    
+
     btc_component = nav_per_share * nav_premium_target
-    
+
     if include_software:
         fair_price = btc_component + software_value_per_share
     else:
         fair_price = btc_component
-    
+
     return {
         'fair_price': fair_price,
         'btc_nav_per_share': nav_per_share,
@@ -160,167 +66,235 @@ def calculate_fair_value(btc_price, btc_holdings, shares_outstanding, nav_premiu
         'implied_nav_premium': nav_premium_target
     }
 
+
 # ============================================================================
-# TODAY'S FAIR VALUE
+# MODEL
 # ============================================================================
 
-print(f"\n" + "="*80)
-print("FAIR VALUE ANALYSIS - TODAY (Nov 6, 2025)")
-print("="*80)
-
-today_scenarios = {
-    'Conservative (Bear Market Median)': calculate_fair_value(
-        CURRENT_BTC_PRICE, CURRENT_BTC_HOLDINGS, CURRENT_SHARES_OUTSTANDING, 
-        NAV_PREMIUM_BENCHMARKS['bear_market_median']
-    ),
-    'Fair Value (Historical Median)': calculate_fair_value(
-        CURRENT_BTC_PRICE, CURRENT_BTC_HOLDINGS, CURRENT_SHARES_OUTSTANDING, 
-        NAV_PREMIUM_BENCHMARKS['historical_median']
-    ),
-    'Bull Case (Bull Market Mean)': calculate_fair_value(
-        CURRENT_BTC_PRICE, CURRENT_BTC_HOLDINGS, CURRENT_SHARES_OUTSTANDING, 
-        NAV_PREMIUM_BENCHMARKS['bull_market_mean']
-    ),
-    'Optimistic (2.5x Premium)': calculate_fair_value(
-        CURRENT_BTC_PRICE, CURRENT_BTC_HOLDINGS, CURRENT_SHARES_OUTSTANDING, 
-        2.5
-    ),
-    'Current Market Price': {
-        'fair_price': CURRENT_MSTR_PRICE,
-        'btc_nav_per_share': CURRENT_NAV_PER_SHARE,
-        'btc_component': CURRENT_NAV_PER_SHARE * CURRENT_NAV_PREMIUM,
-        'software_component': 0,
-        'implied_nav_premium': CURRENT_NAV_PREMIUM
-    }
-}
-
-print(f"\nCurrent BTC Price: ${CURRENT_BTC_PRICE:,.2f}")
-print(f"Current MSTR Price: ${CURRENT_MSTR_PRICE:,.2f}")
-print(f"NAV per Share: ${CURRENT_NAV_PER_SHARE:,.2f}")
-print(f"\nFair Value Scenarios:\n")
-
-today_results = []
-for scenario_name, result in today_scenarios.items():
-    fair_price = result['fair_price']
-    premium = result['implied_nav_premium']
-    upside = ((fair_price / CURRENT_MSTR_PRICE) - 1) * 100
-    
-    print(f"{scenario_name}:")
-    print(f"  Fair Price: ${fair_price:.2f}")
-    print(f"  NAV Premium: {premium:.2f}x")
-    print(f"  Upside/Downside: {upside:+.1f}%")
-    print()
-    
-    today_results.append({
-        'scenario': scenario_name,
-        'fair_price': fair_price,
-        'nav_premium': premium,
-        'upside_pct': upside
-    })
+class FairValueModel:
+    """
+    Fair value model for one scenario
 
-# ============================================================================
-# 2026 QUARTERLY PROJECTIONS
-# ============================================================================
+    `scenario` is a scenario dict or the path of a scenario file.
+    `benchmarks` defaults to nav_benchmarks.load_benchmarks(), loaded on
+    first use, so building a model only reads the scenario.
+    """
 
-print("="*80)
-print("FAIR VALUE PROJECTIONS - 2026 QUARTERS")
-print("="*80)
-
-projections = []
-
-for quarter_idx, (quarter, btc_prices) in enumerate(BTC_SCENARIOS.items(), start=1):
-    print(f"\n{quarter} ({btc_prices['date']})")
-    print("-" * 80)
-    
-    # Calculate holdings and shares for this quarter
-    quarters_ahead = quarter_idx
-    projected_btc_holdings = CURRENT_BTC_HOLDINGS * (1 + BTC_HOLDINGS_GROWTH_QUARTERLY) ** quarters_ahead
-    projected_shares = CURRENT_SHARES_OUTSTANDING * (1 + SHARES_DILUTION_QUARTERLY) ** quarters_ahead
-    
-    print(f"Projected BTC Holdings: {projected_btc_holdings:,.0f} BTC")
-    print(f"Projected Shares Outstanding: {projected_shares:,.0f}")
-    print()
-    
-    for btc_scenario in ['bear', 'base', 'bull', 'moon']:
-        btc_price = btc_prices[btc_scenario]
-        
-        print(f"  {btc_scenario.upper()} Scenario (BTC @ ${btc_price:,}):")
-        
-        # Calculate fair values at different premium levels
-        conservative = calculate_fair_value(btc_price, projected_btc_holdings, projected_shares, 1.5)
-        fair = calculate_fair_value(btc_price, projected_btc_holdings, projected_shares, 1.8)
-        bull = calculate_fair_value(btc_price, projected_btc_holdings, projected_shares, 2.1)
-        
-        print(f"    Conservative (1.5x): ${conservative['fair_price']:.2f}")
-        print(f"    Fair Value (1.8x):   ${fair['fair_price']:.2f}")
-        print(f"    Bull Case (2.1x):    ${bull['fair_price']:.2f}")
+    def __init__(self, scenario=fair_value_scenarios.DEFAULT_SCENARIO, benchmarks=None):
+        if isinstance(scenario, str):
+            scenario = fair_value_scenarios.load_scenario(scenario)
+        self.scenario = scenario
+        self.state = scenario['current_state']
+        self.btc_scenarios = scenario['btc_scenarios']
+        self.assumptions = scenario['assumptions']
+        self.premium_targets = scenario['premium_targets']
+        self._benchmarks = benchmarks
+        self._projections = None
+
+    @property
+    def name(self):
+        return self.scenario['name']
+
+    @property
+    def benchmarks(self):
+        """Historical NAV premium benchmarks (recomputed only when the data changed, see nav_benchmarks.py)"""
+        if self._benchmarks is None:
+            self._benchmarks = nav_benchmarks.load_benchmarks()
+        return self._benchmarks
+
+    @property
+    def btc_nav(self):
+        """Current BTC NAV in millions"""
+        return (self.state['btc_price'] * self.state['btc_holdings']) / 1_000_000
+
+    @property
+    def nav_per_share(self):
+        return self.btc_nav / (self.state['shares_outstanding'] / 1_000_000)
+
+    def fair_value(self, nav_premium, btc_price=None, btc_holdings=None, shares_outstanding=None):
+        """calculate_fair_value() with the scenario's current state and software value as defaults"""
+        return calculate_fair_value(
+            self.state['btc_price'] if btc_price is None else btc_price,
+            self.state['btc_holdings'] if btc_holdings is None else btc_holdings,
+            self.state['shares_outstanding'] if shares_outstanding is None else shares_outstanding,
+            nav_premium,
+            software_value_per_share=self.assumptions['software_business_value_per_share'],
+        )
+
+    def today_fair_values(self):
+        """Fair value at today's BTC price for each of TODAY_CASES, plus the market price"""
+        rows = []
+        for case, premium in TODAY_CASES:
+            premium = self.benchmarks[premium] if isinstance(premium, str) else premium
+            rows.append({'scenario': case, 'fair_price': self.fair_value(premium)['fair_price'],
+                         'nav_premium': premium})
+        rows.append({'scenario': 'Current Market Price', 'fair_price': self.state['mstr_price'],
+                     'nav_premium': self.state['nav_premium']})
+        for row in rows:
+            row['upside_pct'] = ((row['fair_price'] / self.state['mstr_price']) - 1) * 100
+        return rows
+
+    def projections(self, use_cache=True):
+        """
+        One row per quarter and BTC scenario with a `<target>_price` column per
+        premium target (cached on the scenario's inputs, see fair_value_scenarios.py)
+        """
+        if self._projections is None:
+            result, _ = fair_value_scenarios.cached_evaluate(self.scenario, use_cache)
+            self._projections = result['projections']
+        return self._projections
+
+    def summary(self):
+        """Everything written to fair_value_projections.json"""
+        return {
+            'analysis_date': self.state['date'],
+            'current_state': {
+                'btc_price': self.state['btc_price'],
+                'mstr_price': self.state['mstr_price'],
+                'btc_holdings': self.state['btc_holdings'],
+                'shares_outstanding': self.state['shares_outstanding'],
+                'nav_per_share': self.nav_per_share,
+                'nav_premium': self.state['nav_premium']
+            },
+            'today_fair_values': self.today_fair_values(),
+            'quarterly_projections_2026': self.projections(),
+            'assumptions': dict(self.assumptions),
+            'scenario': self.name,
+            'premium_targets': self.premium_targets,
+        }
+
+    def save(self, path=PROJECTIONS_FILE):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    # ------------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------------
+
+    def print_inputs(self):
+        state = self.state
+        print(f"\nCurrent State ({state['date']}):")
+        print(f"  BTC Price: ${state['btc_price']:,.2f}")
+        print(f"  MSTR Price: ${state['mstr_price']:,.2f}")
+        print(f"  BTC Holdings: {state['btc_holdings']:,} BTC")
+        print(f"  Shares Outstanding: {state['shares_outstanding']:,}")
+        print(f"  BTC NAV: ${self.btc_nav:,.0f}M")
+        print(f"  NAV per Share: ${self.nav_per_share:,.2f}")
+        print(f"  Current NAV Premium: {state['nav_premium']:.2f}x")
+
+        nav_benchmarks.print_benchmarks(self.benchmarks)
+
+        print(f"\nBTC Price Scenarios for 2026:")
+        for quarter, scenarios in self.btc_scenarios.items():
+            print(f"\n  {quarter} ({scenarios['date']}):")
+            print(f"    Bear: ${scenarios['bear']:,}")
+            print(f"    Base: ${scenarios['base']:,}")
+            print(f"    Bull: ${scenarios['bull']:,}")
+            print(f"    Moon: ${scenarios['moon']:,}")
+
+        assumptions = self.assumptions
+        print(f"\nModel Assumptions:")
+        print(f"  BTC Holdings Growth: {assumptions['btc_holdings_growth_quarterly']*100:.1f}% per quarter")
+        print(f"  Share Dilution: {assumptions['shares_dilution_quarterly']*100:.1f}% per quarter")
+        print(f"  Software Business Value: ${assumptions['software_business_value_per_share']:.0f} per share")
+        print(f"  Premium Targets: " + ", ".join(f"{t['label']} {t['premium']:.1f}x" for t in self.premium_targets))
+
+    def print_today(self):
+        print(f"\n" + "="*80)
+        print(f"FAIR VALUE ANALYSIS - TODAY ({self.state['date']})")
+        print("="*80)
+
+        print(f"\nCurrent BTC Price: ${self.state['btc_price']:,.2f}")
+        print(f"Current MSTR Price: ${self.state['mstr_price']:,.2f}")
+        print(f"NAV per Share: ${self.nav_per_share:,.2f}")
+        print(f"\nFair Value Scenarios:\n")
+
+        for row in self.today_fair_values():
+            print(f"{row['scenario']}:")
+            print(f"  Fair Price: ${row['fair_price']:.2f}")
+            print(f"  NAV Premium: {row['nav_premium']:.2f}x")
+            print(f"  Upside/Downside: {row['upside_pct']:+.1f}%")
+            print()
+
+    def print_projections(self):
+        print("="*80)
+        print("FAIR VALUE PROJECTIONS - 2026 QUARTERS")
+        print("="*80)
+
+        for quarter, btc_prices in self.btc_scenarios.items():
+            rows = [row for row in self.projections() if row['quarter'] == quarter]
+            print(f"\n{quarter} ({btc_prices['date']})")
+            print("-" * 80)
+
+            print(f"Projected BTC Holdings: {rows[0]['btc_holdings']:,.0f} BTC")
+            print(f"Projected Shares Outstanding: {rows[0]['shares_outstanding']:,.0f}")
+            print()
+
+            for row in rows:
+                print(f"  {row['btc_scenario'].upper()} Scenario (BTC @ ${row['btc_price']:,}):")
+
+                # Fair values at different premium levels
+                for target in self.premium_targets:
+                    label = f"{target['label']} ({target['premium']:.1f}x):"
+                    print(f"    {label:<21}${row[target['name'] + '_price']:.2f}")
+                print()
+
+    def print_summary_table(self):
+        print("\n" + "="*80)
+        print("SUMMARY TABLE: 2026 FAIR VALUE RANGES")
+        print("="*80)
         print()
-        
-        projections.append({
-            'quarter': quarter,
-            'date': btc_prices['date'],
-            'btc_scenario': btc_scenario,
-            'btc_price': btc_price,
-            'btc_holdings': projected_btc_holdings,
-            'shares_outstanding': projected_shares,
-            'conservative_price': conservative['fair_price'],
-            'fair_value_price': fair['fair_price'],
-            'bull_price': bull['fair_price'],
-        })
+
+        summary_df = pd.DataFrame(self.projections())
+        low, high = (f"{t['name']}_price" for t in (self.premium_targets[0], self.premium_targets[-1]))
+        for quarter in self.btc_scenarios:
+            quarter_data = summary_df[summary_df['quarter'] == quarter]
+            print(f"{quarter}:")
+            print(f"  BTC Range: ${quarter_data['btc_price'].min():,} - ${quarter_data['btc_price'].max():,}")
+            print(f"  MSTR Fair Value Range: ${quarter_data[low].min():.0f} - ${quarter_data[high].max():.0f}")
+            print(f"  Base Case (BTC @ ${quarter_data[quarter_data['btc_scenario']=='base']['btc_price'].iloc[0]:,}):")
+            base_case = quarter_data[quarter_data['btc_scenario'] == 'base'].iloc[0]
+            for target in self.premium_targets:
+                print(f"    {target['label'] + ':':<14}${base_case[target['name'] + '_price']:.2f}")
+            print()
+
 
 # ============================================================================
-# SAVE RESULTS
+# REPORT
 # ============================================================================
 
-results_summary = {
-    'analysis_date': CURRENT_DATE,
-    'current_state': {
-        'btc_price': CURRENT_BTC_PRICE,
-        'mstr_price': CURRENT_MSTR_PRICE,
-        'btc_holdings': CURRENT_BTC_HOLDINGS,
-        'shares_outstanding': CURRENT_SHARES_OUTSTANDING,
-        'nav_per_share': CURRENT_NAV_PER_SHARE,
-        'nav_premium': CURRENT_NAV_PREMIUM
-    },
-    'today_fair_values': today_results,
-    'quarterly_projections_2026': projections,
-    'assumptions': {
-        'btc_holdings_growth_quarterly': BTC_HOLDINGS_GROWTH_QUARTERLY,
-        'shares_dilution_quarterly': SHARES_DILUTION_QUARTERLY,
-        'software_business_value_per_share': SOFTWARE_BUSINESS_VALUE_PER_SHARE
-    }
-}
+def projections_path(scenario_file, name):
+    """Output file of a scenario: PROJECTIONS_FILE only for the default scenario"""
+    if os.path.abspath(scenario_file) == os.path.abspath(fair_value_scenarios.DEFAULT_SCENARIO):
+        return PROJECTIONS_FILE
+    root, ext = os.path.splitext(PROJECTIONS_FILE)
+    return f"{root}_{name}{ext}"
 
-with open('fair_value_projections.json', 'w') as f:
-    json.dump(results_summary, f, indent=2)
 
-print("\n" + "="*80)
-print("Results saved to fair_value_projections.json")
-print("="*80)
+def main(args):
+    scenario_file = args[0] if args else fair_value_scenarios.DEFAULT_SCENARIO
+
+    print("="*80)
+    print("MICROSTRATEGY FAIR VALUE MODEL")
+    print("="*80)
+
+    model = FairValueModel(scenario_file)
+    print(f"\nScenario: {model.name} ({scenario_file})")
+    model.print_inputs()
+    model.print_today()
+    model.print_projections()
+
+    path = projections_path(scenario_file, model.name)
+    model.save(path)
+    print("\n" + "="*80)
+    print(f"Results saved to {path}")
+    print("="*80)
+
+    model.print_summary_table()
+    print("="*80)
+    print("ANALYSIS COMPLETE")
+    print("="*80)
 
-# ============================================================================
-# CREATE SUMMARY TABLE
-# ============================================================================
 
-print("\n" + "="*80)
-print("SUMMARY TABLE: 2026 FAIR VALUE RANGES")
-print("="*80)
-print()
-
-summary_df = pd.DataFrame(projections)
-
-for quarter in ['Q1_2026', 'Q2_2026', 'Q3_2026', 'Q4_2026']:
-    quarter_data = summary_df[summary_df['quarter'] == quarter]
-    print(f"{quarter}:")
-    print(f"  BTC Range: ${quarter_data['btc_price'].min():,} - ${quarter_data['btc_price'].max():,}")
-    print(f"  MSTR Fair Value Range: ${quarter_data['conservative_price'].min():.0f} - ${quarter_data['bull_price'].max():.0f}")
-    print(f"  Base Case (BTC @ ${quarter_data[quarter_data['btc_scenario']=='base']['btc_price'].iloc[0]:,}):")
-    base_case = quarter_data[quarter_data['btc_scenario'] == 'base'].iloc[0]
-    print(f"    Conservative: ${base_case['conservative_price']:.2f}")
-    print(f"    Fair Value:   ${base_case['fair_value_price']:.2f}")
-    print(f"    Bull Case:    ${base_case['bull_price']:.2f}")
-    print()
-
-print("="*80)
-print("ANALYSIS COMPLETE")
-print("="*80)
+if __name__ == "__main__":
+    main(sys.argv[1:])
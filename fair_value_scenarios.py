@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Declarative fair-value scenarios with a memoized result cache
+
+A scenario file (JSON, see scenarios/base_2026.json) holds everything
+fair_value_model.py used to hard-code: the current state, the quarterly BTC
+price scenarios, the holdings growth / dilution / software value
+assumptions and the premium targets. A file can extend another one and
+override only what differs:
+
+    {"extends": "base_2026.json", "name": "high_dilution_2026",
+     "assumptions": {"shares_dilution_quarterly": 0.05}}
+
+Each scenario's results are cached in .cache/ under a hash of its resolved
+inputs (so editing a base file invalidates everything that extends it).
+Entries are evicted least-recently-used beyond MAX_CACHE_ENTRIES, so
+rerunning a batch only computes the scenarios whose inputs changed:
+
+    python fair_value_scenarios.py scenarios/
+    python fair_value_scenarios.py scenarios/base_2026.json --output scenario_results.csv
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import fair_value_grid
+
+SCENARIO_DIR = 'scenarios'
+DEFAULT_SCENARIO = os.path.join(SCENARIO_DIR, 'base_2026.json')
+
+CACHE_PREFIX = 'fair_value_scenario'
+# Bump when the result layout or the model changes, to invalidate cached results
+SCENARIO_VERSION = 1
+MAX_CACHE_ENTRIES = 2000
+
+BTC_SCENARIO_NAMES = ['bear', 'base', 'bull', 'moon']
+REQUIRED = {
+    'current_state': ['date', 'btc_price', 'mstr_price', 'btc_holdings', 'shares_outstanding', 'nav_premium'],
+    'btc_scenarios': [],
+    'assumptions': ['btc_holdings_growth_quarterly', 'shares_dilution_quarterly',
+                    'software_business_value_per_share'],
+    'premium_targets': [],
+}
+
+
+# ============================================================================
+# SCENARIO FILES
+# ============================================================================
+
+def _merge(base, override):
+    """Recursive dict merge; non-dict values in `override` replace the base's"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _read(path, seen):
+    path = os.path.abspath(path)
+    if path in seen:
+        raise ValueError(f"Scenario {path} extends itself")
+    with open(path) as f:
+        spec = json.load(f)
+    base = spec.pop('extends', None)
+    if base is None:
+        return spec
+    base = _read(os.path.join(os.path.dirname(path), base), seen | {path})
+    base.pop('name', None)
+    return _merge(base, spec)
+
+
+def load_scenario(path=DEFAULT_SCENARIO):
+    """Read a scenario file, resolving `extends` chains, and check it is complete"""
+    scenario = _read(path, frozenset())
+    scenario.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    for section, keys in REQUIRED.items():
+        if section not in scenario:
+            raise ValueError(f"Scenario {path} has no '{section}'")
+        missing = [key for key in keys if key not in scenario[section]]
+        if missing:
+            raise ValueError(f"Scenario {path}: '{section}' is missing {', '.join(missing)}")
+    for quarter, prices in scenario['btc_scenarios'].items():
+        missing = [key for key in ['date'] + BTC_SCENARIO_NAMES if key not in prices]
+        if missing:
+            raise ValueError(f"Scenario {path}: {quarter} is missing {', '.join(missing)}")
+    for target in scenario['premium_targets']:
+        target.setdefault('label', target['name'].replace('_', ' ').title())
+    return scenario
+
+
+def scenario_paths(paths):
+    """Expand files and directories (all *.json inside) into a sorted list of scenario files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.json'))))
+        else:
+            files.append(path)
+    return files
+
+
+def scenario_key(scenario):
+    """Cache key: hash of the resolved inputs (the name does not affect results)"""
+    inputs = {k: v for k, v in scenario.items() if k != 'name'}
+    return data_cache.combine_digests(CACHE_PREFIX, SCENARIO_VERSION, json.dumps(inputs, sort_keys=True))
+
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+def evaluate_scenario(scenario):
+    """
+    Fair values of one scenario
+
+    Returns {'today': [...], 'projections': [...]}: today's fair value at each
+    premium target, and one row per quarter and BTC scenario with the projected
+    holdings, share count and a `<target>_price` column per premium target.
+    """
+    state = scenario['current_state']
+    assumptions = scenario['assumptions']
+    targets = scenario['premium_targets']
+    premiums = [t['premium'] for t in targets]
+    growth = assumptions['btc_holdings_growth_quarterly']
+    dilution = assumptions['shares_dilution_quarterly']
+    software = assumptions['software_business_value_per_share']
+
+    today = fair_value_grid.fair_value_grid(state['btc_price'], premiums, 0, 0, 0, state['btc_holdings'],
+                                            state['shares_outstanding'], software)
+    today_rows = [{
+        'name': target['name'],
+        'fair_price': float(price),
+        'nav_premium': target['premium'],
+        'upside_pct': float((price / state['mstr_price'] - 1) * 100),
+    } for target, price in zip(targets, today.values.ravel())]
+
+    # Fair values at every premium target for every scenario price and
+    # quarter, in one broadcast over the grid
+    quarters = scenario['btc_scenarios']
+    grid = fair_value_grid.fair_value_grid(
+        sorted({prices[s] for prices in quarters.values() for s in BTC_SCENARIO_NAMES}),
+        premiums, growth, dilution, np.arange(1, len(quarters) + 1),
+        state['btc_holdings'], state['shares_outstanding'], software,
+    )
+
+    projections = []
+    for quarters_ahead, (quarter, prices) in enumerate(quarters.items(), start=1):
+        for btc_scenario in BTC_SCENARIO_NAMES:
+            values = grid.sel(btc_price=prices[btc_scenario], horizon=quarters_ahead).values.ravel()
+            row = {
+                'quarter': quarter,
+                'date': prices['date'],
+                'btc_scenario': btc_scenario,
+                'btc_price': prices[btc_scenario],
+                'btc_holdings': state['btc_holdings'] * (1 + growth) ** quarters_ahead,
+                'shares_outstanding': state['shares_outstanding'] * (1 + dilution) ** quarters_ahead,
+            }
+            row.update({f"{target['name']}_price": float(v) for target, v in zip(targets, values)})
+            projections.append(row)
+    return {'today': today_rows, 'projections': projections}
+
+
+def cached_evaluate(scenario, use_cache=True, max_entries=MAX_CACHE_ENTRIES):
+    """
+    evaluate_scenario() through the on-disk cache; returns (result, cache_hit)
+
+    Pass max_entries=None to skip eviction (run_batch() evicts once per batch).
+    """
+    path = data_cache.cache_path(CACHE_PREFIX, scenario_key(scenario), 'json')
+    if use_cache and os.path.exists(path):
+        with open(path) as f:
+            result = json.load(f)
+        data_cache.touch(path)
+        return result, True
+
+    result = evaluate_scenario(scenario)
+    if use_cache:
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f)
+        data_cache.atomic_write(path, write)
+        if max_entries is not None:
+            data_cache.evict_lru(CACHE_PREFIX, max_entries)
+    return result, False
+
+
+def run_batch(paths, use_cache=True, max_entries=MAX_CACHE_ENTRIES):
+    """
+    Evaluate every scenario file in `paths` (files or directories)
+
+    Returns ({name: result}, stats) where stats counts the scenarios computed,
+    read from the cache and the cache entries evicted.
+    """
+    results = {}
+    stats = {'computed': 0, 'cached': 0, 'evicted': 0}
+    for path in scenario_paths(paths):
+        scenario = load_scenario(path)
+        if scenario['name'] in results:
+            raise ValueError(f"Duplicate scenario name '{scenario['name']}' ({path})")
+        result, hit = cached_evaluate(scenario, use_cache, max_entries=None)
+        results[scenario['name']] = result
+        stats['cached' if hit else 'computed'] += 1
+    if use_cache:
+        stats['evicted'] = data_cache.evict_lru(CACHE_PREFIX, max_entries)
+    return results, stats
+
+
+def projections_frame(results):
+    """All projection rows of a batch, with a leading `scenario` column"""
+    frames = [pd.DataFrame(result['projections']).assign(scenario=name) for name, result in results.items()]
+    table = pd.concat(frames, ignore_index=True)
+    return table[['scenario'] + [c for c in table.columns if c != 'scenario']]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--max-entries': str(MAX_CACHE_ENTRIES), '--output': None}
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] in options:
+            options[args[i]] = args[i + 1]
+            i += 2
+        elif args[i] == '--no-cache':
+            i += 1
+        elif args[i].startswith('--'):
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        else:
+            paths.append(args[i])
+            i += 1
+
+    start = time.perf_counter()
+    results, stats = run_batch(paths or [SCENARIO_DIR], use_cache='--no-cache' not in args,
+                               max_entries=int(options['--max-entries']))
+    elapsed = time.perf_counter() - start
+    print(f"{len(results)} scenarios in {elapsed * 1000:.0f} ms: {stats['computed']} computed, "
+          f"{stats['cached']} from cache, {stats['evicted']} cache entries evicted\n")
+
+    table = projections_frame(results)
+    last_quarter = table.groupby('scenario')['quarter'].transform('last')
+    final = table[(table['quarter'] == last_quarter) & (table['btc_scenario'] == 'base')]
+    print("Base-case fair value in the final quarter:")
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:,.2f}'.format):
+        print(final.drop(columns=['btc_scenario', 'btc_holdings', 'shares_outstanding'])
+              .set_index('scenario'))
+
+    if options['--output']:
+        table.to_csv(options['--output'], index=False)
+        print(f"\nProjections saved to {options['--output']}")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Fair-value sensitivity surfaces
+
+For the fair value model of fair_value_grid.py,
+
+    F = P x p x b0 x ((1 + g) / (1 + d)) ** h + s
+
+(BTC price P, NAV premium p, BTC per share b0, quarterly holdings growth g
+and dilution d over h quarters, software value per share s), every partial
+derivative has a closed form in terms of the BTC component F - s:
+
+    dF/dP = (F - s) / P            dF/dg =  (F - s) h / (1 + g)
+    dF/dp = (F - s) / p            dF/dd = -(F - s) h / (1 + d)
+    dF/ds = 1
+
+sensitivities() evaluates them, and the elasticities (x / F) dF/dx, over a
+whole scenario grid in one batched pass; tornado() gives the exact fair
+value swing for a relative shock to each input at every grid point, summarized
+across the grid. Both feed the sensitivity charts in visualize_fair_value.py:
+
+    python fair_value_sensitivity.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import fair_value_grid
+import fair_value_model
+
+INPUTS = ('btc_price', 'nav_premium', 'holdings_growth', 'dilution', 'software_value_per_share')
+
+# Relative input shock used for tornado charts
+TORNADO_SHOCK = 0.10
+
+
+def sensitivities(btc_price, nav_premium, holdings_growth=0.0, dilution=0.0, horizon=0,
+                  btc_holdings=1.0, shares_outstanding=1.0,
+                  software_value_per_share=fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE):
+    """
+    Fair price, partial derivatives and elasticities over a scenario grid
+
+    Takes the arguments of fair_value_grid.fair_value_grid() and returns
+    {'fair_price': grid, 'derivative': {input: grid}, 'elasticity': {input: grid}},
+    each grid a FairValueGrid over the same coordinates.
+    """
+    grid = fair_value_grid.fair_value_grid(btc_price, nav_premium, holdings_growth, dilution, horizon,
+                                           btc_holdings, shares_outstanding, software_value_per_share)
+    fair = grid.values
+    btc_part = fair - software_value_per_share
+    price, premium, growth, dil, quarters = (grid.coord(dim) for dim in fair_value_grid.DIMS)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        btc_share = btc_part / fair
+        derivative = {
+            'btc_price': btc_part / price,
+            'nav_premium': btc_part / premium,
+            'holdings_growth': btc_part * (quarters / (1 + growth)),
+            'dilution': btc_part * (-quarters / (1 + dil)),
+            'software_value_per_share': np.broadcast_to(1.0, fair.shape),
+        }
+        elasticity = {
+            'btc_price': btc_share,
+            'nav_premium': btc_share,
+            'holdings_growth': btc_share * (quarters * growth / (1 + growth)),
+            'dilution': btc_share * (-quarters * dil / (1 + dil)),
+            'software_value_per_share': software_value_per_share / fair,
+        }
+    return {
+        'fair_price': grid,
+        'derivative': {name: fair_value_grid.FairValueGrid(values, grid.coords, f'd_fair_price_d_{name}')
+                       for name, values in derivative.items()},
+        'elasticity': {name: fair_value_grid.FairValueGrid(values, grid.coords, f'elasticity_{name}')
+                       for name, values in elasticity.items()},
+    }
+
+
+def tornado(btc_price, nav_premium, holdings_growth=0.0, dilution=0.0, horizon=0,
+            btc_holdings=1.0, shares_outstanding=1.0,
+            software_value_per_share=fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE,
+            shock=TORNADO_SHOCK, quantiles=(0.05, 0.95)):
+    """
+    Fair value change (fraction of F) when each input is scaled by 1 - shock
+    and 1 + shock, at every grid point
+
+    Returns one row per input with the median low / high change and the
+    `quantiles` of each across the grid, sorted by median swing.
+    """
+    grid = fair_value_grid.fair_value_grid(btc_price, nav_premium, holdings_growth, dilution, horizon,
+                                           btc_holdings, shares_outstanding, software_value_per_share)
+    fair = grid.values
+    btc_part = fair - software_value_per_share
+    growth, dil, quarters = (grid.coord(dim) for dim in ('holdings_growth', 'dilution', 'horizon'))
+
+    rows = {}
+    for sign, side in [(-1, 'low'), (1, 'high')]:
+        factor = 1 + sign * shock
+        # Exact changes: F is linear in P, p and s; g and d enter through the growth factor
+        changes = {
+            'btc_price': sign * shock * btc_part,
+            'nav_premium': sign * shock * btc_part,
+            'holdings_growth': btc_part * (((1 + growth * factor) / (1 + growth)) ** quarters - 1),
+            'dilution': btc_part * (((1 + dil) / (1 + dil * factor)) ** quarters - 1),
+            'software_value_per_share': np.broadcast_to(sign * shock * software_value_per_share, fair.shape),
+        }
+        for name, change in changes.items():
+            relative = np.broadcast_to(change / fair, fair.shape)
+            row = rows.setdefault(name, {})
+            row[f'{side}_median'] = np.median(relative)
+            for q, value in zip(quantiles, np.quantile(relative, quantiles)):
+                row[f'{side}_q{round(q * 100):02d}'] = value
+
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = 'input'
+    table['swing'] = (table['high_median'] - table['low_median']).abs()
+    return table.sort_values('swing', ascending=False)
+
+
+if __name__ == "__main__":
+    btc_prices = np.arange(50_000, 250_001, 2_000)
+    premiums = np.round(np.arange(1.0, 3.01, 0.1), 2)
+    growth = np.linspace(0, 0.06, 7)
+    dilution = np.linspace(0, 0.04, 5)
+    horizons = np.arange(1, 5)
+    args = (btc_prices, premiums, growth, dilution, horizons, 641_205, 320_000_000)
+
+    start = time.perf_counter()
+    result = sensitivities(*args)
+    table = tornado(*args)
+    elapsed = time.perf_counter() - start
+    print(f"Sensitivities and tornado over {len(result['fair_price']):,} grid points in {elapsed * 1000:.0f} ms\n")
+
+    print(f"Fair value change for a {TORNADO_SHOCK:.0%} change in each input (median and 5-95% across the grid):")
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:+.2%}'.format):
+        print(table.drop(columns='swing'))
+
+    elasticity = result['elasticity']['holdings_growth'].table('btc_price', 'horizon', nav_premium=1.8,
+                                                                holdings_growth=0.03, dilution=0.02)
+    print(f"\nElasticity to holdings growth at 1.8x premium, 3% growth, 2% dilution:")
+    elasticity.index = elasticity.index.astype(np.int64)
+    elasticity.columns = elasticity.columns.astype(np.int64)
+    with pd.option_context('display.float_format', '{:.4f}'.format):
+        print(elasticity.loc[[60_000, 100_000, 150_000, 200_000]])
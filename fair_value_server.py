@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Warm local fair-value query server
+
+Loads the merged NAV frame and the premium benchmarks once (both from
+.cache/ when the inputs are unchanged) and answers queries from memory:
+
+  fair_value   fair MSTR price for any BTC price, NAV premium, holdings,
+               share count and software value (or without it, with
+               "include_software": false); the premium can be a number,
+               a benchmark name ("historical_median") or a historical
+               percentile (optionally within the Bull or Bear regime)
+  percentile   where a premium -- given directly or implied by an MSTR price
+               -- ranks in the premium history
+  benchmarks   the nav_benchmarks.py benchmarks
+  state        the defaults (latest BTC price, holdings and share count) and
+               the data date
+  stats        server-side latency per request
+
+Numeric inputs may be lists, which broadcast against each other, and a
+request may be a list of queries (a batch), answered with a list. Inputs
+must be finite, and prices, holdings and share counts positive; responses
+are strict JSON (never NaN or Infinity).
+
+The server listens on a Unix socket (or TCP with --port) and speaks both
+newline-delimited JSON and plain HTTP (POST /query with a JSON body, or
+GET /benchmarks, /state, /stats), so notebooks can use FairValueClient and
+dashboards plain HTTP:
+
+    python fair_value_server.py serve
+    python fair_value_server.py serve --port 8766
+    python fair_value_server.py query '{"op": "fair_value", "btc_price": [100000, 150000], "percentile": 50}'
+    python fair_value_server.py bench --queries 20000
+    curl -s localhost:8766/query -d '{"op": "percentile", "mstr_price": 250}'
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+import fair_value_model
+import live_monitor
+import nav_benchmarks
+import nav_data
+
+SOCKET_PATH = 'fair_value.sock'
+REGIMES = ('all', 'bull', 'bear')
+
+
+def _output(values):
+    """JSON-ready scalar or (nested) list"""
+    values = np.asarray(values)
+    return values.item() if values.ndim == 0 else values.tolist()
+
+
+def _array(values, name, positive=False):
+    try:
+        values = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number or a list of numbers")
+    if not np.isfinite(values).all():
+        raise ValueError(f"'{name}' must be finite")
+    if positive and np.any(values <= 0):
+        raise ValueError(f"'{name}' must be positive")
+    return values
+
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+# ============================================================================
+# SERVICE
+# ============================================================================
+
+class FairValueService:
+    """
+    Query answering over an in-memory NAV frame and benchmarks
+
+    handle() takes a decoded request (a query dict or a list of them) and
+    returns the response; errors come back as {'error': message} per query.
+    """
+
+    OPS = ('fair_value', 'percentile', 'benchmarks', 'state', 'stats')
+
+    def __init__(self, frame, benchmarks, software_value_per_share=fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE):
+        history = nav_benchmarks.benchmark_frame(frame)
+        premium = history['nav_premium'].to_numpy(float)
+        bull = history['regime_bull'].to_numpy()
+        # Sorted premium history per regime, for percentiles in O(log n)
+        self.premiums = {'all': np.sort(premium), 'bull': np.sort(premium[bull]), 'bear': np.sort(premium[~bull])}
+        self.benchmark_values = benchmarks
+        latest = frame.iloc[-1]
+        self.defaults = {
+            'btc_price': float(latest['close_btc']),
+            'btc_holdings': float(latest['cumulative_btc_holdings']),
+            'shares_outstanding': float(latest['shares_outstanding']),
+            'software_value_per_share': float(software_value_per_share),
+        }
+        self.as_of = str(latest['date'].date())
+        self.latest_premium = float(latest['nav_premium'])
+        self.latency = live_monitor.LatencyStats()
+
+    @classmethod
+    def from_cache(cls, interval='1d'):
+        """Service over the cached NAV frame and benchmarks (rebuilt only if an input changed)"""
+        return cls(nav_data.load_nav_frame(interval=interval), nav_benchmarks.load_benchmarks(interval=interval))
+
+    def _history(self, regime):
+        if regime not in REGIMES:
+            raise ValueError(f"Unknown regime: {regime} (expected one of {', '.join(REGIMES)})")
+        return self.premiums[regime]
+
+    def _inputs(self, btc_price, btc_holdings, shares_outstanding):
+        """BTC price, holdings and share count arrays, defaulting to the latest data"""
+        return (_array(self.defaults['btc_price'] if btc_price is None else btc_price, 'btc_price', True),
+                _array(self.defaults['btc_holdings'] if btc_holdings is None else btc_holdings, 'btc_holdings',
+                       True),
+                _array(self.defaults['shares_outstanding'] if shares_outstanding is None else shares_outstanding,
+                       'shares_outstanding', True))
+
+    def fair_value(self, btc_price=None, nav_premium=None, percentile=None, regime='all', btc_holdings=None,
+                   shares_outstanding=None, software_value_per_share=None, include_software=True):
+        if (nav_premium is None) == (percentile is None):
+            raise ValueError("Give exactly one of 'nav_premium' and 'percentile'")
+        if not isinstance(include_software, bool):
+            raise ValueError("'include_software' must be true or false")
+        if isinstance(nav_premium, str):
+            if not isinstance(self.benchmark_values.get(nav_premium), float):
+                raise ValueError(f"Unknown benchmark: {nav_premium}")
+            nav_premium = self.benchmark_values[nav_premium]
+        if percentile is not None:
+            history = self._history(regime)
+            q = _array(percentile, 'percentile')
+            if np.any((q < 0) | (q > 100)):
+                raise ValueError("'percentile' must be between 0 and 100")
+            nav_premium = np.interp(q / 100 * (len(history) - 1), np.arange(len(history)), history)
+        premium = _array(nav_premium, 'nav_premium')
+        price, holdings, shares = self._inputs(btc_price, btc_holdings, shares_outstanding)
+        software = self.defaults['software_value_per_share'] if software_value_per_share is None \
+            else _array(software_value_per_share, 'software_value_per_share')
+
+        result = fair_value_model.calculate_fair_value(price, holdings, shares, premium, include_software,
+                                                       software_value_per_share=software)
+        return {
+            'fair_price': _output(result['fair_price']),
+            'nav_premium': _output(premium),
+            'btc_nav_per_share': _output(result['btc_nav_per_share']),
+            'software_component': _output(result['software_component']),
+        }
+
+    def percentile(self, nav_premium=None, mstr_price=None, btc_price=None, regime='all', btc_holdings=None,
+                   shares_outstanding=None):
+        history = self._history(regime)
+        if nav_premium is None:
+            if mstr_price is None:
+                raise ValueError("Give 'nav_premium', or 'mstr_price' (and optionally 'btc_price')")
+            price, holdings, shares = self._inputs(btc_price, btc_holdings, shares_outstanding)
+            nav_per_share = price * holdings / shares
+            nav_premium = _array(mstr_price, 'mstr_price', True) / nav_per_share
+        premium = _array(nav_premium, 'nav_premium')
+        # Ties count half, so a premium equal to the median is the 50th percentile
+        rank = (np.searchsorted(history, premium, 'left') + np.searchsorted(history, premium, 'right')) / 2
+        return {
+            'percentile': _output(rank / len(history) * 100),
+            'nav_premium': _output(premium),
+            'regime': regime,
+            'days': len(history),
+        }
+
+    def benchmarks(self):
+        return self.benchmark_values
+
+    def state(self):
+        return dict(self.defaults, as_of=self.as_of, nav_premium=self.latest_premium)
+
+    def stats(self):
+        return self.latency.summary()
+
+    def handle(self, request):
+        """Answer a query dict, or a list of them"""
+        if isinstance(request, list):
+            return [self.handle(query) for query in request]
+        if not isinstance(request, dict):
+            return {'error': 'A query must be a JSON object or a list of them'}
+        params = dict(request)
+        op = params.pop('op', 'fair_value')
+        if op not in self.OPS:
+            return {'error': f"Unknown op: {op} (expected one of {', '.join(self.OPS)})"}
+        try:
+            return getattr(self, op)(**params)
+        except (ValueError, TypeError) as e:
+            return {'error': str(e)}
+
+    def handle_bytes(self, data):
+        """
+        Decode, answer and encode one request, recording its latency
+
+        NaN and Infinity are rejected in the request and never written: a
+        response that would need them is replaced by an error.
+        """
+        start = time.perf_counter_ns()
+        try:
+            response = self.handle(json.loads(data, parse_constant=_reject_constant))
+        except ValueError as e:
+            response = {'error': f"Invalid JSON: {e}"}
+        try:
+            encoded = json.dumps(response, allow_nan=False).encode()
+        except ValueError:
+            encoded = json.dumps({'error': 'The result is not finite'}).encode()
+        self.latency.add(time.perf_counter_ns() - start)
+        return encoded
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+async def _serve_http(service, request_line, reader, writer):
+    """Answer HTTP/1.1 requests on a connection (keep-alive) starting from `request_line`"""
+    while request_line:
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+        op = path.split('?', 1)[0].strip('/')
+        if method == 'POST' and op in ('', 'query'):
+            status, payload = '200 OK', service.handle_bytes(body)
+        elif method == 'GET' and op in service.OPS:
+            status, payload = '200 OK', service.handle_bytes(json.dumps({'op': op}))
+        else:
+            status, payload = '404 Not Found', json.dumps({'error': f"No route for {method} {path}"}).encode()
+
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+        await writer.drain()
+        if headers.get('connection', '').lower() == 'close':
+            break
+        request_line = await reader.readline()
+
+
+async def serve(service, path=SOCKET_PATH, host='127.0.0.1', port=None):
+    """
+    Start the server on Unix socket `path`, or on TCP `host`:`port` if a port
+    is given. Each connection speaks JSON lines unless its first line is an
+    HTTP request line.
+    """
+    async def handle(reader, writer):
+        try:
+            line = await reader.readline()
+            if line.startswith((b'GET ', b'POST ')):
+                await _serve_http(service, line, reader, writer)
+                return
+            while line:
+                if line.strip():
+                    writer.write(service.handle_bytes(line) + b'\n')
+                    await writer.drain()
+                line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    if port is not None:
+        return await asyncio.start_server(handle, host, port)
+    if os.path.exists(path):
+        os.remove(path)
+    return await asyncio.start_unix_server(handle, path)
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class FairValueClient:
+    """
+    Blocking JSON-lines client for notebooks and scripts
+
+        client = FairValueClient()            # or FairValueClient('127.0.0.1:8766')
+        client.query('fair_value', btc_price=150_000, nav_premium='historical_median')
+        client.batch([{'op': 'percentile', 'nav_premium': 1.2}, ...])
+    """
+
+    def __init__(self, address=SOCKET_PATH):
+        if os.path.exists(address) or ':' not in address:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(address)
+        else:
+            host, port = address.rsplit(':', 1)
+            self.sock = socket.create_connection((host, int(port)))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile('rwb')
+
+    def request(self, request):
+        self.file.write(json.dumps(request).encode() + b'\n')
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def query(self, op='fair_value', **params):
+        return self.request(dict(params, op=op))
+
+    def batch(self, queries):
+        return self.request(list(queries))
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def bench(client, n_queries, batch_size=1, seed=0):
+    """Round-trip latency (us) per request of random fair-value and percentile queries"""
+    rng = np.random.default_rng(seed)
+    latencies = np.empty(n_queries // batch_size)
+    for i in range(len(latencies)):
+        queries = []
+        for _ in range(batch_size):
+            if rng.random() < 0.5:
+                queries.append({'op': 'fair_value', 'btc_price': float(rng.uniform(50_000, 250_000)),
+                                'percentile': float(rng.uniform(0, 100))})
+            else:
+                queries.append({'op': 'percentile', 'mstr_price': float(rng.uniform(100, 600))})
+        start = time.perf_counter_ns()
+        client.request(queries[0] if batch_size == 1 else queries)
+        latencies[i] = (time.perf_counter_ns() - start) / 1000
+    return latencies
+
+
+async def main(argv):
+    mode = argv[0] if argv else 'serve'
+    options = {'--socket': SOCKET_PATH, '--host': '127.0.0.1', '--port': None, '--interval': '1d',
+               '--queries': '10000', '--batch': '1'}
+    args = []
+    i = 1
+    while i < len(argv):
+        if argv[i] in options:
+            options[argv[i]] = argv[i + 1]
+            i += 2
+        elif argv[i].startswith('--'):
+            print(f"Unknown option: {argv[i]}")
+            sys.exit(1)
+        else:
+            args.append(argv[i])
+            i += 1
+    address = f"{options['--host']}:{options['--port']}" if options['--port'] else options['--socket']
+
+    if mode == 'serve':
+        start = time.perf_counter()
+        service = FairValueService.from_cache(options['--interval'])
+        server = await serve(service, options['--socket'], options['--host'],
+                             int(options['--port']) if options['--port'] else None)
+        print(f"Loaded {len(service.premiums['all'])} days of premium history (through {service.as_of}) "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms; listening on {address}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if not options['--port'] and os.path.exists(options['--socket']):
+                os.remove(options['--socket'])
+    elif mode == 'query':
+        client = FairValueClient(address)
+        print(json.dumps(client.request(json.loads(args[0])), indent=2))
+        client.close()
+    elif mode == 'bench':
+        client = FairValueClient(address)
+        batch_size = int(options['--batch'])
+        latencies = bench(client, int(options['--queries']), batch_size)
+        server_side = client.query('stats')
+        client.close()
+        print(f"{len(latencies):,} requests ({batch_size} queries each): round trip p50 "
+              f"{np.percentile(latencies, 50):.0f} us, p99 {np.percentile(latencies, 99):.0f} us, "
+              f"max {latencies.max():.0f} us")
+        print(f"Server side: p50 {server_side['p50_us']:.0f} us, p99 {server_side['p99_us']:.0f} us "
+              f"over the last {min(server_side['ticks'], 100_000):,} requests")
+    else:
+        print(f"Unknown mode: {mode}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Log-spaced histograms for streaming quantiles of positive values
+
+Simulated fair values, premiums and latencies are reduced chunk by chunk
+to bin counts, so memory does not grow with the number of values. With
+the default 2^14 bins over four decades each bin is 0.06% wide, which
+bounds the quantile error.
+"""
+
+import numpy as np
+
+
+class LogHistogram:
+    """
+    Counts of positive values in log-spaced bins, one histogram per row
+
+    Values outside [lo, hi) land in an underflow / overflow bin. Histograms
+    from different chunks merge by adding counts.
+    """
+
+    def __init__(self, lo, hi, rows, bins=1 << 14):
+        self.log_lo = np.log(lo)
+        self.step = (np.log(hi) - self.log_lo) / bins
+        self.bins = bins
+        self.counts = np.zeros((rows, bins + 2), dtype=np.int64)
+        self.total = np.zeros(rows)
+
+    def add(self, values):
+        """Add a (rows, n) array of values"""
+        rows = values.shape[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            index = np.floor((np.log(values) - self.log_lo) / self.step) + 1
+        index = np.clip(np.nan_to_num(index, nan=0, neginf=0), 0, self.bins + 1).astype(np.intp)
+        index += (np.arange(rows) * (self.bins + 2))[:, None]
+        self.counts += np.bincount(index.ravel(), minlength=rows * (self.bins + 2)).reshape(rows, -1)
+        self.total += values.sum(axis=1)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.total += other.total
+
+    def edges(self):
+        return np.exp(self.log_lo + self.step * np.arange(self.bins + 1))
+
+    def mean(self):
+        return self.total / self.counts.sum(axis=1)
+
+    def quantiles(self, qs):
+        """(rows, len(qs)) quantiles, interpolated geometrically inside a bin"""
+        cumulative = np.cumsum(self.counts, axis=1)
+        edges = self.edges()
+        out = np.empty((self.counts.shape[0], len(qs)))
+        for r, cum in enumerate(cumulative):
+            targets = np.asarray(qs) * cum[-1]
+            b = np.clip(np.searchsorted(cum, targets, side='right'), 1, self.bins)
+            before = cum[b - 1]
+            fraction = np.clip((targets - before) / np.maximum(self.counts[r, b], 1), 0, 1)
+            out[r] = edges[b - 1] * np.exp(self.step * fraction)
+        return out
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Lead/lag cross-correlations between BTC returns, MSTR returns and premium changes
+
+regime_analysis.py only looks at same-day relationships. This module
+measures, for every lag k up to a maximum, the correlation between one
+series at bar t and another at bar t + k:
+
+  cross_correlation()           one correlation per lag over the whole sample
+  rolling_cross_correlation()   the same profile inside windows of `window`
+                                bars, one window every `step` bars
+
+Both compute all lags at once with FFT correlation, O(n log n) per series
+pair (per window in rolling mode) instead of one pass over the data per
+lag, so thousands of lags on minute bars are cheap. lead_lag() runs every
+pair in PAIRS and caches the result in .cache/, keyed on the hash of the
+input series and the parameters:
+
+    python lead_lag.py --max-lag 30
+    python lead_lag.py --interval 1m --max-lag 1440 --window 10080 --step 60
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import fft
+
+import data_cache
+import nav_data
+import price_store
+
+CACHE_PREFIX = 'lead_lag'
+# Bump when the correlation definition changes, to invalidate cached results
+LEAD_LAG_VERSION = 1
+
+DEFAULT_MAX_LAG = 30
+
+# (leader, follower) pairs: positive lags mean the first series leads
+PAIRS = [
+    ('btc_return', 'premium_change'),
+    ('mstr_return', 'premium_change'),
+    ('btc_return', 'mstr_return'),
+]
+
+# Elements of the (windows x FFT length) matrix transformed at once in rolling mode
+CHUNK_CELLS = 1 << 23
+
+
+def lead_lag_series(frame):
+    """
+    Bar-to-bar BTC log return, MSTR log return and NAV premium change
+
+    Rows where any of the three is undefined are dropped.
+    """
+    series = pd.DataFrame({
+        'date': frame['date'],
+        'btc_return': np.log(frame['close_btc']).diff(),
+        'mstr_return': np.log(frame['close_mstr']).diff(),
+        'premium_change': frame['nav_premium'].diff(),
+    })
+    return series.dropna().reset_index(drop=True)
+
+
+def pair_name(leader, follower):
+    return f"{leader}_vs_{follower}"
+
+
+# ============================================================================
+# CROSS-CORRELATION
+# ============================================================================
+
+def _standardize(x, axis=-1):
+    x = x - x.mean(axis=axis, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return x / x.std(axis=axis, keepdims=True)
+
+
+def _lagged_products(xs, ys, max_lag):
+    """
+    Sums of xs[t] * ys[t + k] for k = -max_lag..max_lag along the last axis,
+    divided by the number of overlapping pairs
+    """
+    n = xs.shape[-1]
+    nfft = fft.next_fast_len(n + max_lag)
+    cc = fft.irfft(np.conj(fft.rfft(xs, nfft)) * fft.rfft(ys, nfft), nfft)
+    # Negative lags wrap around to the end of the circular result
+    cc = np.concatenate([cc[..., nfft - max_lag:], cc[..., :max_lag + 1]], axis=-1)
+    lags = np.arange(-max_lag, max_lag + 1)
+    return cc / (n - np.abs(lags))
+
+
+def cross_correlation(x, y, max_lag=DEFAULT_MAX_LAG):
+    """
+    Correlation of x[t] with y[t + k] for k = -max_lag..max_lag
+
+    Both series are standardized over the whole sample, and each lag is
+    averaged over its overlapping pairs. A peak at a positive lag means x
+    leads y. Returns a Series indexed by lag.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    max_lag = min(max_lag, len(x) - 1)
+    values = _lagged_products(_standardize(x), _standardize(y), max_lag)
+    return pd.Series(values, index=pd.RangeIndex(-max_lag, max_lag + 1, name='lag'))
+
+
+def rolling_cross_correlation(x, y, max_lag=DEFAULT_MAX_LAG, window=250, step=1, dates=None):
+    """
+    cross_correlation() inside sliding windows of `window` bars
+
+    One window ends every `step` bars; each is standardized on its own.
+    Returns a frame with one row per window (indexed by the date of its last
+    bar when `dates` is given) and one column per lag.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    max_lag = min(max_lag, window - 1)
+    xw = np.lib.stride_tricks.sliding_window_view(x, window)[::step]
+    yw = np.lib.stride_tricks.sliding_window_view(y, window)[::step]
+
+    nfft = fft.next_fast_len(window + max_lag)
+    size = max(1, CHUNK_CELLS // nfft)
+    chunks = [_lagged_products(_standardize(xw[i:i + size]), _standardize(yw[i:i + size]), max_lag)
+              for i in range(0, len(xw), size)]
+    values = np.concatenate(chunks) if chunks else np.empty((0, 2 * max_lag + 1))
+
+    ends = np.arange(window - 1, len(x), step)
+    index = pd.Index(np.asarray(dates)[ends], name='date') if dates is not None else pd.Index(ends, name='end')
+    return pd.DataFrame(values, index=index, columns=pd.RangeIndex(-max_lag, max_lag + 1, name='lag'))
+
+
+def peak_lags(correlations):
+    """Lag and value of the largest absolute correlation in each column"""
+    lags = correlations.abs().idxmax()
+    return pd.DataFrame({
+        'peak_lag': lags,
+        'peak_corr': [correlations.at[lag, column] for column, lag in lags.items()],
+        'corr_lag0': correlations.loc[0],
+    })
+
+
+# ============================================================================
+# CACHED ANALYSIS
+# ============================================================================
+
+def lead_lag_key(series, max_lag, window=None, step=1):
+    columns = {name: series[name].to_numpy() for name in series.columns if name != 'date'}
+    columns['date'] = series['date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return data_cache.combine_digests(LEAD_LAG_VERSION, price_store.columns_digest(columns),
+                                      max_lag, window, step)
+
+
+def lead_lag(frame, max_lag=DEFAULT_MAX_LAG, window=None, step=1, pairs=PAIRS, use_cache=True):
+    """
+    Cross-correlations of every pair in `pairs`
+
+    Without `window`, returns a frame indexed by lag with one column per
+    pair; with it, returns {pair name: rolling_cross_correlation() frame}.
+    Results are reused from the cache while the input series and
+    parameters are unchanged.
+    """
+    series = lead_lag_series(frame)
+    key = data_cache.combine_digests(lead_lag_key(series, max_lag, window, step), pairs)
+    prefix = CACHE_PREFIX if window is None else f"{CACHE_PREFIX}_rolling"
+    path = data_cache.cache_path(prefix, key, 'pkl')
+    if use_cache and os.path.exists(path):
+        return pd.read_pickle(path)
+
+    if window is None:
+        result = pd.DataFrame({pair_name(a, b): cross_correlation(series[a], series[b], max_lag)
+                               for a, b in pairs})
+    else:
+        result = {pair_name(a, b): rolling_cross_correlation(series[a], series[b], max_lag, window, step,
+                                                              dates=series['date'])
+                  for a, b in pairs}
+    if use_cache:
+        data_cache.atomic_write(path, lambda tmp: pd.to_pickle(result, tmp))
+        data_cache.prune(prefix, keep=path)
+    return result
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--max-lag': str(DEFAULT_MAX_LAG), '--window': None, '--step': '1', '--interval': '1d'}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    merged_df = nav_data.load_nav_frame(interval=options['--interval'])
+    max_lag = int(options['--max-lag'])
+    window = int(options['--window']) if options['--window'] else None
+    step = int(options['--step'])
+
+    start = time.perf_counter()
+    result = lead_lag(merged_df, max_lag, window, step)
+    elapsed = time.perf_counter() - start
+    print(f"Lead/lag cross-correlations up to {max_lag} bars ({options['--interval']}) in {elapsed:.2f}s")
+    print("Positive lags: the first series leads the second\n")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.4f}'.format):
+        if window is None:
+            print(peak_lags(result))
+            shown = [k for k in (-5, -2, -1, 0, 1, 2, 5) if k in result.index]
+            print(f"\nCorrelation by lag:\n{result.loc[shown]}")
+        else:
+            for name, rolling in result.items():
+                print(f"{name}: {len(rolling)} windows of {window} bars")
+                if len(rolling):
+                    latest = rolling.iloc[-1]
+                    lag = latest.abs().idxmax()
+                    print(f"  latest window ({rolling.index[-1]}): peak lag {lag}, corr {latest[lag]:.4f}, "
+                          f"lag 0 corr {latest[0]:.4f}")
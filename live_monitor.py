@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Asyncio live monitor for the NAV premium
+
+Reads BTC and MSTR price ticks from a pluggable feed, keeps the NAV
+premium, regime vote and fair-value gap up to date through
+live_nav.LiveNavCalculator, and publishes a snapshot per tick to every
+subscriber. Alerts are published when the premium crosses one of the
+configured thresholds (by default the 1.7x reference line drawn by
+run_analysis.py); a crossing only counts once the premium has cleared the
+threshold by the dead band, so a premium hovering at the line does not
+alert on every tick.
+
+A feed is any async iterable of Tick(symbol, time, price) with `time` in
+int64 epoch nanoseconds:
+
+  ReplayFeed   replays the stored merged history, optionally in real time
+  FileFeed     reads newline-delimited JSON ticks from a file
+  SocketFeed   reads newline-delimited JSON ticks from a TCP connection
+
+    python live_monitor.py replay                  replay the stored history
+    python live_monitor.py serve 8765              stand-in tick server
+    python live_monitor.py socket 127.0.0.1:8765   monitor a tick server
+    python live_monitor.py file ticks.jsonl --thresholds 1.5,1.7,2.5 --dead-band 0.05
+"""
+
+import asyncio
+import json
+import sys
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+import fair_value_model
+import live_nav
+import nav_benchmarks
+import nav_data
+import price_store
+
+BTC_SYMBOL = nav_data.BTC_SYMBOL
+MSTR_SYMBOL = nav_data.MSTR_SYMBOL
+
+# Reference premium line from run_analysis.py
+DEFAULT_THRESHOLDS = (1.7,)
+
+# How far (in premium x) past a threshold the premium must move to flip sides
+DEAD_BAND = 0.02
+
+Tick = namedtuple('Tick', ['symbol', 'time', 'price'])
+
+
+def parse_tick(line):
+    """Tick from one JSON line: {"symbol": ..., "date": ISO string or epoch seconds, "price": ...}"""
+    data = json.loads(line)
+    date = data['date']
+    t = int(date * 1_000_000_000) if isinstance(date, (int, float)) else pd.Timestamp(date).value
+    return Tick(data['symbol'], t, float(data['price']))
+
+
+def format_tick(tick):
+    return json.dumps({'symbol': tick.symbol, 'date': tick.time / 1e9, 'price': tick.price})
+
+
+# ============================================================================
+# FEEDS
+# ============================================================================
+
+class ReplayFeed:
+    """
+    Ticks from a merged NAV frame: one BTC and one MSTR tick per bar
+
+    `speed` is simulated seconds per wall-clock second (e.g. 86400 replays
+    one day per second); 0 replays as fast as possible.
+    """
+
+    def __init__(self, frame, speed=0):
+        self.frame = frame
+        self.speed = speed
+
+    async def __aiter__(self):
+        times = self.frame['date'].to_numpy(dtype='datetime64[ns]').view(np.int64).tolist()
+        btc = self.frame['close_btc'].tolist()
+        mstr = self.frame['close_mstr'].tolist()
+        previous = None
+        for t, btc_price, mstr_price in zip(times, btc, mstr):
+            if self.speed and previous is not None:
+                await asyncio.sleep((t - previous) / 1e9 / self.speed)
+            previous = t
+            yield Tick(BTC_SYMBOL, t, btc_price)
+            yield Tick(MSTR_SYMBOL, t, mstr_price)
+            # Let subscribers run between bars
+            await asyncio.sleep(0)
+
+
+class FileFeed:
+    """Ticks from a newline-delimited JSON file (see parse_tick)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    async def __aiter__(self):
+        with open(self.path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield parse_tick(line)
+                    await asyncio.sleep(0)
+
+
+class SocketFeed:
+    """Ticks from a TCP server sending newline-delimited JSON (see serve_ticks)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def __aiter__(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    yield parse_tick(line)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+
+async def serve_ticks(feed, host='127.0.0.1', port=8765):
+    """
+    Stand-in tick server: stream a feed as JSON lines to each client
+
+    Every connecting client gets the whole feed from the start, then the
+    connection is closed.
+    """
+    async def handle(reader, writer):
+        try:
+            async for tick in feed:
+                writer.write((format_tick(tick) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+# ============================================================================
+# MONITOR
+# ============================================================================
+
+class LatencyStats:
+    """Per-tick processing times (ns) over the most recent `window` ticks"""
+
+    def __init__(self, window=100_000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, ns):
+        self.samples.append(ns)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {'ticks': 0, 'p50_us': np.nan, 'p99_us': np.nan, 'max_us': np.nan}
+        us = np.fromiter(self.samples, dtype=np.float64) / 1000
+        return {'ticks': self.count,
+                'p50_us': float(np.percentile(us, 50)),
+                'p99_us': float(np.percentile(us, 99)),
+                'max_us': float(us.max())}
+
+
+class LiveMonitor:
+    """
+    Turns ticks into snapshots and threshold alerts for subscribers
+
+    Each subscriber gets its own bounded asyncio.Queue of messages (dicts
+    with 'type' 'snapshot' or 'alert'). A slow subscriber never blocks the
+    monitor: when its queue is full the oldest message is dropped.
+    Ticks are grouped into bars of `bar_interval` (floored timestamps), so
+    BTC and MSTR ticks within one bar revise that bar; ticks for a bar that
+    has already closed are counted in `late_ticks` and skipped.
+
+    Fair value = BTC NAV per share x `fair_value_premium` + software value
+    per share, by default the historical-median premium of nav_benchmarks
+    and the software value of fair_value_model.
+    """
+
+    def __init__(self, calculator, thresholds=DEFAULT_THRESHOLDS, bar_interval='1d',
+                 fair_value_premium=None, software_value_per_share=None, dead_band=DEAD_BAND):
+        self.calculator = calculator
+        self.thresholds = sorted(thresholds)
+        self.bar_ns = price_store.interval_timedelta(bar_interval).value
+        if fair_value_premium is None:
+            fair_value_premium = nav_benchmarks.load_benchmarks()['historical_median']
+        if software_value_per_share is None:
+            software_value_per_share = fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE
+        self.fair_value_premium = fair_value_premium
+        self.software_value_per_share = software_value_per_share
+        self.dead_band = dead_band
+        self.subscribers = []
+        self.above = {threshold: None for threshold in self.thresholds}
+        self.latency = LatencyStats()
+        self.late_ticks = 0
+        self.latest = None
+
+    def subscribe(self, maxsize=1024):
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.remove(queue)
+
+    def warm_up(self, frame):
+        """Replay history through the calculator without publishing anything"""
+        for t, btc, mstr in zip(frame['date'], frame['close_btc'], frame['close_mstr']):
+            row = self.calculator.update(t, btc, mstr)
+            if row is not None:
+                self._check_thresholds(row)
+                self.latest = row
+
+    def publish(self, message):
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def _check_thresholds(self, row):
+        """
+        Alert messages for every threshold the premium crossed since the last tick
+
+        A threshold flips to above at threshold + dead_band and back to
+        below under threshold - dead_band; in between it keeps its side.
+        """
+        premium = row['nav_premium']
+        alerts = []
+        if premium != premium:
+            return alerts
+        for threshold in self.thresholds:
+            was_above = self.above[threshold]
+            if was_above is None:
+                self.above[threshold] = premium >= threshold
+                continue
+            if was_above:
+                above = premium >= threshold - self.dead_band
+            else:
+                above = premium >= threshold + self.dead_band
+            if above != was_above:
+                alerts.append({
+                    'type': 'alert',
+                    'date': row['date'],
+                    'threshold': threshold,
+                    'direction': 'above' if above else 'below',
+                    'nav_premium': premium,
+                    'regime': row['regime_combined'],
+                })
+            self.above[threshold] = above
+        return alerts
+
+    def process(self, tick):
+        """Apply one tick, publish its snapshot and any alerts; return the snapshot"""
+        start = time.perf_counter_ns()
+        bar = tick.time - tick.time % self.bar_ns
+        last = self.calculator.last_time
+        if last is not None and bar < last:
+            self.late_ticks += 1
+            return None
+        if tick.symbol == BTC_SYMBOL:
+            row = self.calculator.update(bar, btc_price=tick.price)
+        elif tick.symbol == MSTR_SYMBOL:
+            row = self.calculator.update(bar, mstr_price=tick.price)
+        else:
+            return None
+        if row is None:
+            return None
+
+        btc_nav_per_share = row['btc_nav_millions'] / (row['shares_outstanding'] / 1_000_000)
+        fair_value = btc_nav_per_share * self.fair_value_premium + self.software_value_per_share
+        row['type'] = 'snapshot'
+        row['tick_symbol'] = tick.symbol
+        row['fair_value'] = fair_value
+        row['fair_value_gap'] = row['close_mstr'] / fair_value - 1
+
+        self.publish(row)
+        for alert in self._check_thresholds(row):
+            self.publish(alert)
+        self.latest = row
+        self.latency.add(time.perf_counter_ns() - start)
+        return row
+
+    async def run(self, feed):
+        """Consume a feed until it ends"""
+        async for tick in feed:
+            self.process(tick)
+        self.publish({'type': 'end', 'latency': self.latency.summary(), 'late_ticks': self.late_ticks})
+
+
+async def print_messages(queue, every=250):
+    """Subscriber that prints alerts and every `every`-th snapshot until the feed ends"""
+    n = 0
+    while True:
+        message = await queue.get()
+        if message['type'] == 'end':
+            return message
+        if message['type'] == 'alert':
+            print(f"ALERT {message['date']}: NAV premium {message['nav_premium']:.3f}x crossed "
+                  f"{message['direction']} {message['threshold']:.2f}x ({message['regime']})")
+        elif n % every == 0:
+            print(f"{message['date']}  BTC ${message['close_btc']:>10,.2f}  MSTR ${message['close_mstr']:>8,.2f}  "
+                  f"premium {message['nav_premium']:.3f}x  {message['regime_combined']:<4}  "
+                  f"fair value ${message['fair_value']:,.2f} ({message['fair_value_gap']:+.1%})")
+        n += message['type'] == 'snapshot'
+
+
+async def main(argv):
+    mode = argv[0] if argv else 'replay'
+    options = {'--thresholds': ','.join(str(t) for t in DEFAULT_THRESHOLDS), '--speed': '0', '--interval': '1d',
+               '--dead-band': str(DEAD_BAND)}
+    args = []
+    i = 1
+    while i < len(argv):
+        if argv[i] in options:
+            options[argv[i]] = argv[i + 1]
+            i += 2
+        else:
+            args.append(argv[i])
+            i += 1
+    thresholds = [float(t) for t in options['--thresholds'].split(',')]
+    interval = options['--interval']
+
+    if mode == 'serve':
+        frame = nav_data.load_nav_frame(interval=interval)
+        server = await serve_ticks(ReplayFeed(frame, float(options['--speed'])),
+                                   port=int(args[0]) if args else 8765)
+        print(f"Serving ticks on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+        async with server:
+            await server.serve_forever()
+        return
+
+    monitor = LiveMonitor(live_nav.LiveNavCalculator.from_files(), thresholds, bar_interval=interval,
+                          dead_band=float(options['--dead-band']))
+    if mode == 'replay':
+        feed = ReplayFeed(nav_data.load_nav_frame(interval=interval), float(options['--speed']))
+    else:
+        # Live feeds start from the stored history so the indicators are warm
+        history = nav_data.load_nav_frame(interval=interval)
+        monitor.warm_up(history)
+        if mode == 'file':
+            feed = FileFeed(args[0])
+        elif mode == 'socket':
+            host, port = args[0].rsplit(':', 1)
+            feed = SocketFeed(host, int(port))
+        else:
+            print(f"Unknown mode: {mode}")
+            sys.exit(1)
+
+    printer = asyncio.create_task(print_messages(monitor.subscribe()))
+    await monitor.run(feed)
+    end = await printer
+
+    latency = end['latency']
+    print(f"\nProcessed {latency['ticks']} ticks: p50 {latency['p50_us']:.1f} us, "
+          f"p99 {latency['p99_us']:.1f} us, max {latency['max_us']:.1f} us per tick")
+    if end['late_ticks']:
+        print(f"Skipped {end['late_ticks']} late ticks")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
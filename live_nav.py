@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Live NAV premium calculator with constant-time updates
+
+LiveNavCalculator keeps just enough state to produce one row of the
+regime_analysis.py frame per new bar: the holdings and share count in
+effect, the latest BTC / MSTR prices, running sums for the time-window
+moving averages, the momentum anchor, the running ATH and the previous
+premium. Each update() is amortized O(1), and replaying a history through
+it reproduces regime.add_regime_indicators() / regime.add_premium_trend()
+on the full frame:
+
+    python live_nav.py          replay the stored history chunk by chunk and compare
+"""
+
+import math
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import asof_join
+import regime
+
+# ============================================================================
+# CONSTANT-TIME BUILDING BLOCKS
+# ============================================================================
+
+class AsofCursor:
+    """As-of lookup into sorted event times for non-decreasing queries"""
+
+    def __init__(self, times):
+        self.times = times
+        self.index = -1
+
+    def advance(self, t):
+        """Index of the last event at or before t (-1 if none)"""
+        times = self.times
+        while self.index + 1 < len(times) and times[self.index + 1] <= t:
+            self.index += 1
+        return self.index
+
+
+class RollingMean:
+    """
+    Mean over the trailing time window (t - window, t], ignoring NaN
+
+    Same semantics as DataFrame.rolling(window, on='date', min_periods=1).
+    The sum is kept with Neumaier compensation, so long intraday streams do
+    not drift away from a fresh recompute.
+    """
+
+    def __init__(self, window):
+        self.window = pd.Timedelta(window).value
+        self.values = deque()
+        self.total = 0.0
+        self.compensation = 0.0
+        self.count = 0
+
+    def _add(self, x):
+        t = self.total + x
+        if abs(self.total) >= abs(x):
+            self.compensation += (self.total - t) + x
+        else:
+            self.compensation += (x - t) + self.total
+        self.total = t
+
+    def update(self, t, value):
+        """Add the value at time t; a repeated t replaces the last value"""
+        if self.values and self.values[-1][0] == t:
+            _, old = self.values.pop()
+            if not math.isnan(old):
+                self._add(-old)
+                self.count -= 1
+        self.values.append((t, value))
+        if not math.isnan(value):
+            self._add(value)
+            self.count += 1
+        while self.values[0][0] <= t - self.window:
+            _, old = self.values.popleft()
+            if not math.isnan(old):
+                self._add(-old)
+                self.count -= 1
+        if self.count == 0:
+            self.total = self.compensation = 0.0
+            return np.nan
+        return (self.total + self.compensation) / self.count
+
+
+class LookbackReturn:
+    """Return since the last value at or before t - lookback (regime.lookback_return)"""
+
+    def __init__(self, lookback):
+        self.lookback = pd.Timedelta(lookback).value
+        self.values = deque()
+        self.anchor = np.nan
+
+    def update(self, t, value):
+        """Add the value at time t; a repeated t replaces the last value"""
+        if self.values and self.values[-1][0] == t:
+            self.values.pop()
+        self.values.append((t, value))
+        while self.values[0][0] <= t - self.lookback:
+            self.anchor = self.values.popleft()[1]
+        return value / self.anchor - 1
+
+
+# ============================================================================
+# LIVE CALCULATOR
+# ============================================================================
+
+class LiveNavCalculator:
+    """
+    Incremental NAV premium, regime indicators and premium trend
+
+    Feed bars in time order with update(timestamp, btc_price, mstr_price);
+    either price may be omitted to reuse the latest one. An update with the
+    same timestamp as the last bar revises that bar (it is still open), so
+    separate BTC and MSTR ticks for one bar end in the same state as a
+    single update with both prices. Holdings and the share count are
+    resolved as of each bar from the same tables the batch pipeline uses,
+    and can be overridden with set_holdings() / set_shares() when a new
+    filing arrives mid-session.
+    """
+
+    def __init__(self, holdings_table, share_table, interpolate_shares=False,
+                 ma_fast=regime.MA_FAST, ma_slow=regime.MA_SLOW, momentum=regime.MOMENTUM,
+                 drawdown_threshold=regime.DRAWDOWN_THRESHOLD, smooth=regime.SMOOTH):
+        self.holdings_table = holdings_table
+        self.share_table = share_table
+        self.interpolate_shares = interpolate_shares
+        self.holdings_cursor = AsofCursor(holdings_table.times)
+        self.shares_cursor = AsofCursor(share_table.times)
+        self.holdings_override = None
+        self.shares_override = None
+
+        self.ma_fast = RollingMean(ma_fast)
+        self.ma_slow = RollingMean(ma_slow)
+        self.momentum = LookbackReturn(momentum)
+        self.derivative_smooth = RollingMean(smooth)
+        self.drawdown_threshold = drawdown_threshold
+
+        self.last_time = None
+        self.btc_price = np.nan
+        self.mstr_price = np.nan
+        self.ath = -np.inf
+        self.prev_ath = -np.inf
+        self.premium = np.nan
+        self.prev_premium = np.nan
+
+    @classmethod
+    def from_files(cls, holdings_path=None, shares_path=None, **kwargs):
+        """Build from the holdings and shares files used by nav_data"""
+        import nav_data
+        holdings = nav_data.load_holdings(holdings_path or nav_data.HOLDINGS_FILE)
+        shares = nav_data.load_share_table(shares_path or nav_data.SHARES_FILE)
+        return cls(asof_join.HoldingsTable.from_frame(holdings), shares, **kwargs)
+
+    def set_holdings(self, cumulative_btc_holdings, cumulative_cost_millions=np.nan):
+        """Override the holdings table from now on (e.g. a purchase announced today)"""
+        self.holdings_override = (float(cumulative_btc_holdings), float(cumulative_cost_millions))
+
+    def set_shares(self, shares_outstanding):
+        """Override the share table from now on"""
+        self.shares_override = float(shares_outstanding)
+
+    def _holdings(self, t):
+        if self.holdings_override is not None:
+            btc, cost = self.holdings_override
+            return btc, cost
+        i = self.holdings_cursor.advance(t)
+        if i < 0:
+            return np.nan, np.nan
+        table = self.holdings_table
+        return table.cumulative_btc_holdings[i], table.cumulative_cost_millions[i]
+
+    def _shares(self, t):
+        if self.shares_override is not None:
+            return self.shares_override
+        table = self.share_table
+        i = self.shares_cursor.advance(t)
+        if i < 0 or not self.interpolate_shares or i + 1 == len(table.times):
+            return table.shares_outstanding[max(i, 0)]
+        # Same straight line as np.interp between the surrounding filings
+        t0, t1 = table.times[i], table.times[i + 1]
+        s0, s1 = table.shares_outstanding[i], table.shares_outstanding[i + 1]
+        return s0 + (s1 - s0) * ((t - t0) / (t1 - t0))
+
+    def update(self, timestamp, btc_price=None, mstr_price=None):
+        """
+        Process one bar and return its row as a dict
+
+        Returns None for bars before the first BTC purchase, which the
+        batch frame drops as well.
+        """
+        t = timestamp if isinstance(timestamp, int) else pd.Timestamp(timestamp).value
+        if self.last_time is not None and t < self.last_time:
+            raise ValueError(f"bars must arrive in time order, got {pd.Timestamp(t)} "
+                             f"after {pd.Timestamp(self.last_time)}")
+        if btc_price is not None:
+            self.btc_price = float(btc_price)
+        if mstr_price is not None:
+            self.mstr_price = float(mstr_price)
+
+        holdings, cost = self._holdings(t)
+        if math.isnan(holdings):
+            return None
+        if t != self.last_time:
+            # New bar: the current one becomes the baseline for ATH and derivative
+            self.prev_ath = self.ath
+            self.prev_premium = self.premium
+        self.last_time = t
+        close = self.btc_price
+        shares = self._shares(t)
+
+        market_cap = self.mstr_price * shares / 1_000_000
+        btc_nav = close * holdings / 1_000_000
+        premium = market_cap / btc_nav
+
+        ma_fast = self.ma_fast.update(t, close)
+        ma_slow = self.ma_slow.update(t, close)
+        momentum = self.momentum.update(t, close)
+        self.ath = close if close > self.prev_ath else self.prev_ath
+        drawdown = (close - self.ath) / self.ath
+
+        regime_ma = 'Bull' if ma_fast > ma_slow else 'Bear'
+        regime_momentum = 'Bull' if momentum > 0 else 'Bear'
+        regime_ath = 'Bull' if drawdown > self.drawdown_threshold else 'Bear'
+        votes = (regime_ma == 'Bull') + (regime_momentum == 'Bull') + (regime_ath == 'Bull')
+
+        derivative = premium - self.prev_premium
+        derivative_pct = premium / self.prev_premium - 1
+        self.premium = premium
+
+        return {
+            'date': pd.Timestamp(t),
+            'close_btc': close,
+            'close_mstr': self.mstr_price,
+            'cumulative_btc_holdings': holdings,
+            'cumulative_cost_millions': cost,
+            'avg_cost_basis': cost * 1_000_000 / holdings,
+            'shares_outstanding': shares,
+            'market_cap_millions': market_cap,
+            'btc_nav_millions': btc_nav,
+            'nav_premium': premium,
+            'btc_ma_fast': ma_fast,
+            'btc_ma_slow': ma_slow,
+            'regime_ma': regime_ma,
+            'btc_momentum': momentum,
+            'regime_momentum': regime_momentum,
+            'btc_ath': self.ath,
+            'drawdown': drawdown,
+            'regime_ath': regime_ath,
+            'regime_combined': 'Bull' if votes >= 2 else 'Bear',
+            'nav_premium_derivative': derivative,
+            'nav_premium_derivative_pct': derivative_pct,
+            'nav_premium_derivative_smooth': self.derivative_smooth.update(t, derivative),
+        }
+
+    def replay(self, frame):
+        """Feed a frame with date / close_btc / close_mstr columns; return the rows as a frame"""
+        rows = []
+        for t, btc, mstr in zip(frame['date'], frame['close_btc'], frame['close_mstr']):
+            row = self.update(t, btc, mstr)
+            if row is not None:
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+
+# ============================================================================
+# CONSISTENCY CHECK AGAINST THE BATCH PIPELINE
+# ============================================================================
+
+def compare_with_batch(live_df, batch_df, rtol=1e-9):
+    """Return a list of mismatch descriptions (empty when the frames agree)"""
+    problems = []
+    if len(live_df) != len(batch_df):
+        return [f"row count {len(live_df)} != {len(batch_df)}"]
+    for column in live_df.columns:
+        live, batch = live_df[column].to_numpy(), batch_df[column].to_numpy()
+        if live.dtype.kind == 'f' or batch.dtype.kind == 'f':
+            ok = np.isclose(live.astype(float), batch.astype(float), rtol=rtol, atol=1e-12, equal_nan=True)
+        else:
+            ok = live == batch
+        if not ok.all():
+            problems.append(f"{column}: {int((~ok).sum())} mismatching rows")
+    return problems
+
+
+if __name__ == "__main__":
+    import histogram
+    import nav_data
+
+    interval = sys.argv[1] if len(sys.argv) > 1 else '1d'
+
+    # Replay and compare one chunk of the batch frame at a time, so
+    # intraday histories run in bounded memory
+    calc = LiveNavCalculator.from_files()
+    latencies = histogram.LogHistogram(0.01, 1e6, rows=1)
+    bars = 0
+    problems = []
+    last = None
+    for batch_df in regime.iter_regime_chunks(nav_data.iter_nav_chunks(interval)):
+        chunk_latencies = np.empty(len(batch_df))
+        rows = []
+        for i, (t, btc, mstr) in enumerate(zip(batch_df['date'], batch_df['close_btc'], batch_df['close_mstr'])):
+            start = time.perf_counter_ns()
+            row = calc.update(t, btc, mstr)
+            chunk_latencies[i] = time.perf_counter_ns() - start
+            if row is not None:
+                rows.append(row)
+        latencies.add(chunk_latencies[None, :] / 1000)
+        bars += len(batch_df)
+        live_df = pd.DataFrame(rows)
+        problems += [f"{batch_df['date'].iloc[0]}: {problem}"
+                     for problem in compare_with_batch(live_df, batch_df[live_df.columns])]
+        last = rows[-1] if rows else last
+
+    p50, p99 = latencies.quantiles([0.50, 0.99])[0]
+    print(f"Replayed {bars} bars: p50 {p50:.1f} us, p99 {p99:.1f} us per update")
+
+    if problems:
+        print("Live and batch results differ:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print(f"Matches the batch recompute. Latest: {last['date']} NAV premium {last['nav_premium']:.3f}x, "
+          f"regime {last['regime_combined']}")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+NAV premium benchmarks derived from the merged NAV frame
+
+fair_value_model.py used to carry a hand-copied dict of premium levels
+from the regime analysis output. compute_benchmarks() derives the same
+figures (overall, Bull and Bear mean / median, extremes, quantiles and
+per-BTC-price-bucket statistics) from the data, and load_benchmarks()
+memoizes them on the hash of the NAV inputs, both in-process and as a
+small JSON file in .cache/, so a refresh after new data lands is a
+recomputation and otherwise a lookup.
+
+Intraday benchmarks are folded chunk by chunk (stream_benchmarks()) from
+regime.iter_regime_chunks() over nav_data.iter_nav_chunks(), so the full
+bar history is never in memory; their medians and quantiles are read
+from log-spaced histograms with bins 0.06% wide.
+
+    python nav_benchmarks.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import histogram
+import nav_data
+import regime
+
+CACHE_PREFIX = 'nav_benchmarks'
+# Bump when the benchmark definitions change, to invalidate cached results
+BENCHMARKS_VERSION = 2
+
+QUANTILES = [0.05, 0.10, 0.25, 0.75, 0.90, 0.95]
+
+# BTC price bucket edges in USD (the last bucket is open-ended)
+BTC_PRICE_BUCKETS = [0, 25_000, 50_000, 75_000, 100_000, 125_000, 150_000]
+
+# Premium range of the streaming histograms (values outside are still counted)
+HISTOGRAM_RANGE = (0.01, 100.0)
+
+# Conservative fair-value premium range; a judgement call, not a statistic
+FAIR_VALUE_RANGE = (1.5, 2.5)
+
+# Benchmarks already computed in this process, by input key
+_memo = {}
+
+
+def _premium_stats(premium):
+    return {'mean': float(premium.mean()), 'median': float(premium.median())}
+
+
+def price_buckets(edges=BTC_PRICE_BUCKETS):
+    """Bucket bins (with an open-ended last bucket) and their labels"""
+    bins = list(edges) + [np.inf]
+    labels = [f"${lo / 1000:.0f}k+" if hi == np.inf else f"${lo / 1000:.0f}k-${hi / 1000:.0f}k"
+              for lo, hi in zip(bins[:-1], bins[1:])]
+    return bins, labels
+
+
+def price_bucket_stats(frame, edges=BTC_PRICE_BUCKETS):
+    """Premium count, mean, median and interquartile range per BTC price bucket"""
+    bins, labels = price_buckets(edges)
+    buckets = pd.cut(frame['close_btc'], bins, labels=labels, right=False)
+    grouped = frame['nav_premium'].groupby(buckets, observed=True)
+    return pd.DataFrame({
+        'days': grouped.size(),
+        'mean': grouped.mean(),
+        'median': grouped.median(),
+        'q25': grouped.quantile(0.25),
+        'q75': grouped.quantile(0.75),
+    })
+
+
+def benchmark_frame(frame):
+    """
+    The rows of a merged NAV frame the benchmarks are computed on, with the
+    combined regime of regime.py
+
+    These are the rows regime_analysis.py analyses (premium and its
+    derivatives defined), so the regime statistics match its "NAV Premium
+    Statistics by Market Regime" section.
+    """
+    return benchmark_rows(regime.add_premium_trend(regime.add_regime_indicators(frame)))
+
+
+def benchmark_rows(frame):
+    """Rows of a frame with regime indicators and premium trend that have all benchmark inputs"""
+    return frame[frame[['close_btc', 'nav_premium', 'nav_premium_derivative',
+                        'nav_premium_derivative_smooth']].notna().all(axis=1)]
+
+
+def latest_premium(frame):
+    """The last row of a merged NAV frame that has a NAV premium"""
+    return frame.loc[frame['nav_premium'].last_valid_index()]
+
+
+def compute_benchmarks(frame):
+    """
+    Premium benchmarks from a merged NAV frame (on the rows of
+    benchmark_frame(), except `current` and `as_of`, which are the latest
+    premium even when its trend is not defined yet)
+    """
+    latest = latest_premium(frame)
+    frame = benchmark_frame(frame)
+    premium = frame['nav_premium']
+    bull = frame['regime_bull'].to_numpy()
+
+    overall = _premium_stats(premium)
+    bull_stats = _premium_stats(premium[bull])
+    bear_stats = _premium_stats(premium[~bull])
+    benchmarks = {
+        'historical_mean': overall['mean'],
+        'historical_median': overall['median'],
+        'bull_market_mean': bull_stats['mean'],
+        'bull_market_median': bull_stats['median'],
+        'bear_market_mean': bear_stats['mean'],
+        'bear_market_median': bear_stats['median'],
+        'current': float(latest['nav_premium']),
+        'historical_min': float(premium.min()),
+        'historical_max': float(premium.max()),
+    }
+    for q, value in zip(QUANTILES, premium.quantile(QUANTILES)):
+        benchmarks[f'historical_q{round(q * 100):02d}'] = float(value)
+    benchmarks['fair_value_range'] = FAIR_VALUE_RANGE
+
+    buckets = price_bucket_stats(frame)
+    benchmarks['btc_price_buckets'] = {
+        label: {key: float(value) if key != 'days' else int(value) for key, value in row.items()}
+        for label, row in buckets.iterrows()
+    }
+    benchmarks['as_of'] = str(latest['date'].date())
+    return benchmarks
+
+
+def stream_benchmarks(chunks, edges=BTC_PRICE_BUCKETS):
+    """
+    compute_benchmarks() folded over the chunks of regime.iter_regime_chunks()
+
+    Only one chunk is held at a time: counts, sums and extremes are exact,
+    medians and quantiles are read from one LogHistogram per group.
+    """
+    bins, labels = price_buckets(edges)
+    groups = ['all', 'Bull', 'Bear'] + labels
+    hists = {name: histogram.LogHistogram(*HISTOGRAM_RANGE, rows=1) for name in groups}
+    low, high = np.inf, -np.inf
+    latest = None
+
+    for chunk in chunks:
+        if chunk['nav_premium'].notna().any():
+            latest = latest_premium(chunk)
+        chunk = benchmark_rows(chunk)
+        if chunk.empty:
+            continue
+        premium = chunk['nav_premium'].to_numpy(dtype=np.float64)
+        bull = chunk['regime_bull'].to_numpy()
+        bucket = np.searchsorted(bins, chunk['close_btc'].to_numpy(), side='right') - 1
+        hists['all'].add(premium[None, :])
+        hists['Bull'].add(premium[None, bull])
+        hists['Bear'].add(premium[None, ~bull])
+        for i, label in enumerate(labels):
+            hists[label].add(premium[None, bucket == i])
+        low, high = min(low, premium.min()), max(high, premium.max())
+
+    if not hists['all'].counts.any():
+        raise ValueError("No rows with a NAV premium and its trend to benchmark")
+
+    def stats(name, qs):
+        hist = hists[name]
+        return float(hist.mean()[0]), [float(v) for v in hist.quantiles(qs)[0]]
+
+    mean, (median, *quantiles) = stats('all', [0.5] + QUANTILES)
+    bull_mean, (bull_median,) = stats('Bull', [0.5])
+    bear_mean, (bear_median,) = stats('Bear', [0.5])
+    benchmarks = {
+        'historical_mean': mean,
+        'historical_median': median,
+        'bull_market_mean': bull_mean,
+        'bull_market_median': bull_median,
+        'bear_market_mean': bear_mean,
+        'bear_market_median': bear_median,
+        'current': float(latest['nav_premium']),
+        'historical_min': float(low),
+        'historical_max': float(high),
+    }
+    for q, value in zip(QUANTILES, quantiles):
+        benchmarks[f'historical_q{round(q * 100):02d}'] = value
+    benchmarks['fair_value_range'] = FAIR_VALUE_RANGE
+
+    benchmarks['btc_price_buckets'] = {}
+    for label in labels:
+        days = int(hists[label].counts.sum())
+        if days == 0:
+            continue
+        bucket_mean, (bucket_median, q25, q75) = stats(label, [0.5, 0.25, 0.75])
+        benchmarks['btc_price_buckets'][label] = {'days': days, 'mean': bucket_mean, 'median': bucket_median,
+                                                  'q25': q25, 'q75': q75}
+    benchmarks['as_of'] = str(latest['date'].date())
+    return benchmarks
+
+
+def load_benchmarks(use_cache=True, interval='1d'):
+    """
+    Benchmarks for the current data, recomputed only when an input changed
+
+    The key is nav_data.nav_frame_key(), i.e. the content hashes of the
+    price, holdings and share inputs. Intraday intervals are streamed
+    through stream_benchmarks() instead of loading the merged frame.
+    """
+    key = data_cache.combine_digests(BENCHMARKS_VERSION, nav_data.nav_frame_key(interval=interval))
+    if use_cache and key in _memo:
+        return _memo[key]
+
+    prefix = CACHE_PREFIX if interval == '1d' else f"{CACHE_PREFIX}_{interval}"
+    path = data_cache.cache_path(prefix, key, 'json')
+    if use_cache and os.path.exists(path):
+        with open(path, 'r') as f:
+            benchmarks = json.load(f)
+        benchmarks['fair_value_range'] = tuple(benchmarks['fair_value_range'])
+    else:
+        if interval == '1d':
+            benchmarks = compute_benchmarks(nav_data.load_nav_frame(use_cache=use_cache, interval=interval))
+        else:
+            benchmarks = stream_benchmarks(regime.iter_regime_chunks(nav_data.iter_nav_chunks(interval)))
+        if use_cache:
+            def write(tmp_path):
+                with open(tmp_path, 'w') as f:
+                    json.dump(benchmarks, f, indent=2)
+            data_cache.atomic_write(path, write)
+            data_cache.prune(prefix, keep=path)
+    _memo[key] = benchmarks
+    return benchmarks
+
+
+def print_benchmarks(benchmarks):
+    print(f"\nHistorical NAV Premium Benchmarks (data through {benchmarks['as_of']}):")
+    for key, value in benchmarks.items():
+        if key in ('btc_price_buckets', 'as_of'):
+            continue
+        if isinstance(value, tuple):
+            print(f"  {key}: {value[0]:.2f}x - {value[1]:.2f}x")
+        else:
+            print(f"  {key}: {value:.2f}x")
+    print(f"\nNAV Premium by BTC Price:")
+    for label, row in benchmarks['btc_price_buckets'].items():
+        print(f"  {label:>12}: mean {row['mean']:.2f}x, median {row['median']:.2f}x, "
+              f"IQR {row['q25']:.2f}x - {row['q75']:.2f}x ({row['days']} days)")
+
+
+if __name__ == "__main__":
+    interval = sys.argv[1] if len(sys.argv) > 1 else '1d'
+    start = time.perf_counter()
+    benchmarks = load_benchmarks(interval=interval)
+    print(f"Loaded benchmarks in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print_benchmarks(benchmarks)
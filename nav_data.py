@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Shared data loading for the NAV premium analysis
+
+Builds the merged BTC / MSTR / holdings frame with the NAV premium once and
+caches it under .cache/, keyed on the hashes of the input files. Every
+analysis script (and the notebook) calls load_nav_frame() instead of
+repeating the load -> merge -> holdings -> shares -> premium pipeline.
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+
+import asof_join
+import data_cache
+import price_store
+
+BTC_SYMBOL = 'BTC-USD'
+MSTR_SYMBOL = 'MSTR'
+HOLDINGS_FILE = 'mstr_btc_holdings.json'
+SHARES_FILE = 'mstr_shares_outstanding.json'
+
+# Bump when the merge / premium logic changes so old cache entries are ignored
+PIPELINE_VERSION = 4
+
+CACHE_PREFIX = 'nav_frame'
+
+
+def load_prices(symbol, interval='1d', start=None, end=None):
+    """Load a price series from the columnar store, sorted by date"""
+    return price_store.load_frame(symbol, interval=interval, start=start, end=end)
+
+
+def load_holdings(path=HOLDINGS_FILE):
+    """Load the BTC purchase history"""
+    with open(path, 'r') as f:
+        holdings_data = json.load(f)
+
+    holdings_df = pd.DataFrame(holdings_data)
+    holdings_df['date'] = pd.to_datetime(holdings_df['date'])
+    return holdings_df.sort_values('date')
+
+
+def load_share_table(path=SHARES_FILE):
+    """Load the dated shares-outstanding breakpoints"""
+    with open(path, 'r') as f:
+        return asof_join.ShareTable.from_records(json.load(f))
+
+
+def stock_close_column(symbol):
+    """Name of the company's close column in the merged frame"""
+    return 'close_mstr' if symbol == MSTR_SYMBOL else 'close_stock'
+
+
+def build_nav_frame(btc_df, mstr_df, holdings_table, share_table, interpolate_shares=False,
+                    stock_column='close_mstr'):
+    """
+    Merge prices and holdings and compute the NAV premium
+
+    Works on bars of any interval: prices are joined on identical bar
+    timestamps and holdings / shares are resolved as of each bar.
+    `mstr_df` can hold any treasury company's prices; its close ends up in
+    `stock_column`.
+    """
+    merged_df = pd.merge(btc_df[['date', 'close']],
+                         mstr_df[['date', 'close']].rename(columns={'close': stock_column}),
+                         on='date',
+                         how='inner')
+    merged_df = merged_df.rename(columns={'close': 'close_btc'})
+
+    # As-of join: each bar takes the holdings of the last purchase at or before it
+    merged_df = holdings_table.attach(merged_df)
+
+    # Keep dates where MSTR held Bitcoin
+    merged_df = merged_df[merged_df['cumulative_btc_holdings'].notna()].copy()
+
+    merged_df['shares_outstanding'] = share_table.lookup(merged_df['date'], interpolate=interpolate_shares)
+    merged_df['market_cap_millions'] = (merged_df[stock_column] * merged_df['shares_outstanding']) / 1_000_000
+    merged_df['btc_nav_millions'] = (merged_df['close_btc'] * merged_df['cumulative_btc_holdings']) / 1_000_000
+    merged_df['nav_premium'] = merged_df['market_cap_millions'] / merged_df['btc_nav_millions']
+    return merged_df.reset_index(drop=True)
+
+
+def _slice_dates(frame, start, end):
+    dates = frame['date'].to_numpy()
+    lo = dates.searchsorted(pd.Timestamp(start).to_datetime64(), 'left')
+    hi = dates.searchsorted(pd.Timestamp(end).to_datetime64(), 'right')
+    return frame.iloc[lo:hi]
+
+
+def iter_nav_chunks(interval='1d', chunk_rows=1_000_000, holdings_path=HOLDINGS_FILE,
+                    shares_path=SHARES_FILE, interpolate_shares=False, symbol=MSTR_SYMBOL, btc_df=None):
+    """
+    Yield the merged NAV frame in chunks of at most chunk_rows company bars
+
+    Only one chunk of each price series is read from the memory-mapped store
+    at a time, so intraday histories are processed in bounded memory. A
+    preloaded `btc_df` (sorted by date) is sliced instead of re-reading the
+    BTC series from the store.
+    """
+    holdings_table = asof_join.HoldingsTable.from_frame(load_holdings(holdings_path))
+    share_table = load_share_table(shares_path)
+    price_store.ensure_series(BTC_SYMBOL, interval=interval)
+
+    for stock_chunk in price_store.iter_frames(symbol, chunk_rows, ['close'], interval=interval):
+        start, end = stock_chunk['date'].iloc[0], stock_chunk['date'].iloc[-1]
+        if btc_df is None:
+            btc_chunk = load_prices(BTC_SYMBOL, interval, start=start, end=end)
+        else:
+            btc_chunk = _slice_dates(btc_df, start, end)
+        yield build_nav_frame(btc_chunk, stock_chunk, holdings_table, share_table,
+                              interpolate_shares=interpolate_shares,
+                              stock_column=stock_close_column(symbol))
+
+
+def nav_frame_key(holdings_path=HOLDINGS_FILE, shares_path=SHARES_FILE, interpolate_shares=False,
+                  interval='1d', symbol=MSTR_SYMBOL):
+    """Cache key from the content hashes of the price, holdings and share inputs"""
+    price_store.ensure_series(BTC_SYMBOL, interval=interval)
+    price_store.ensure_series(symbol, interval=interval)
+    return data_cache.combine_digests(
+        PIPELINE_VERSION,
+        interval,
+        price_store.read_meta(BTC_SYMBOL, interval=interval)['digest'],
+        price_store.read_meta(symbol, interval=interval)['digest'],
+        data_cache.file_digest(holdings_path),
+        data_cache.file_digest(shares_path),
+        interpolate_shares,
+    )
+
+
+def load_nav_frame(use_cache=True, holdings_path=HOLDINGS_FILE, shares_path=SHARES_FILE,
+                   interpolate_shares=False, interval='1d', chunk_rows=1_000_000,
+                   symbol=MSTR_SYMBOL, btc_df=None):
+    """
+    Return the merged NAV premium frame for the given bar interval
+
+    The frame is rebuilt only when one of the inputs has changed since the
+    last build; otherwise it is read back from the cache. `symbol` selects
+    the treasury company (MSTR by default); pass its own holdings and share
+    files along with it. `btc_df` is the BTC series for `interval` if the
+    caller already has it loaded.
+
+    The whole frame is held in memory; for long intraday histories fold
+    over iter_nav_chunks() instead (as nav_benchmarks and live_nav do).
+    """
+    key = nav_frame_key(holdings_path, shares_path, interpolate_shares, interval, symbol)
+    prefix = CACHE_PREFIX
+    if symbol != MSTR_SYMBOL:
+        prefix += f"_{symbol}"
+    if interval != '1d':
+        prefix += f"_{interval}"
+    path = data_cache.cache_path(prefix, key, 'pkl')
+
+    if use_cache and os.path.exists(path):
+        return pd.read_pickle(path)
+
+    print(f"Building merged NAV frame{'' if symbol == MSTR_SYMBOL else ' for ' + symbol}...")
+    chunks = list(iter_nav_chunks(interval, chunk_rows, holdings_path, shares_path, interpolate_shares,
+                                  symbol, btc_df))
+    merged_df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    if use_cache:
+        data_cache.atomic_write(path, merged_df.to_pickle)
+        data_cache.prune(prefix, keep=path)
+    return merged_df
+
+
+if __name__ == "__main__":
+    interval = sys.argv[1] if len(sys.argv) > 1 else '1d'
+    merged_df = load_nav_frame(interval=interval)
+    print(f"Merged data: {len(merged_df)} records from {merged_df['date'].min()} to {merged_df['date'].max()}")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Walk-forward backtest of NAV-premium rotation signals
+
+The strategy family: at each daily close, rank today's NAV premium among
+the premiums of the previous `lookback` days (all previous days for
+lookback 0, i.e. an expanding history). If it ranks below `threshold` --
+for threshold 0.5, the premium is below its trailing median -- hold MSTR
+over the next day, otherwise hold BTC. Switching sells one asset and buys
+the other, paying `cost_bps` on each side.
+
+Benchmarks only ever use data before the signal day, so every day's
+position is what the strategy would have chosen at that close. All
+(lookback x threshold x cost) parameter sets are evaluated at once:
+
+  premium_ranks()   walk-forward ranks for every lookback from one cumulative
+                    count of lower premiums per day (O(days^2) once)
+  backtest()        positions, turnover and net returns for the whole grid as
+                    (lookbacks, thresholds, costs, days) arrays, in chunks of
+                    lookbacks, and the usual performance metrics
+
+Every parameter set is scored over the same days (from the first day the
+longest lookback has a full window). Picking the best of thousands of
+sets is itself fitted to the history, so read the top of the table as
+a description of the sample, not a forecast.
+
+    python premium_backtest.py
+    python premium_backtest.py --max-lookback 750 --costs 0,10,25,50 --output premium_backtest.csv
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import nav_data
+
+# Trailing windows in trading days; 0 is the expanding (all previous days) history
+LOOKBACKS = [0] + list(range(20, 501, 10))
+# Previous days an expanding history needs before it gives signals
+MIN_HISTORY = 60
+# Hold MSTR while today's premium ranks below this fraction of the window
+THRESHOLDS = np.round(np.arange(0.05, 0.951, 0.01), 2)
+# Cost per side of a switch, in basis points of the traded value
+COSTS_BPS = [0, 10, 25]
+
+# Elements of the (lookbacks x thresholds x costs x days) arrays evaluated at once
+CHUNK_CELLS = 1 << 22
+
+
+def backtest_series(frame):
+    """Dates, premium and daily BTC / MSTR returns of the rows with all three inputs"""
+    frame = frame.dropna(subset=['close_btc', 'close_mstr', 'nav_premium']).reset_index(drop=True)
+    returns = frame[['close_btc', 'close_mstr']].pct_change().fillna(0.0)
+    return (frame['date'], frame['nav_premium'].to_numpy(float),
+            returns['close_btc'].to_numpy(), returns['close_mstr'].to_numpy())
+
+
+def premium_ranks(premium, lookbacks=LOOKBACKS, min_history=MIN_HISTORY, chunk_cells=CHUNK_CELLS):
+    """
+    Walk-forward rank of each day's premium within its lookback window
+
+    Returns (ranks, valid), each (len(lookbacks), days): the fraction of the
+    previous `lookback` days (all previous days for 0) with a lower premium,
+    and whether that window was complete.
+    """
+    n = len(premium)
+    lookbacks = np.asarray(lookbacks)
+    days = np.arange(n)
+    # Window length per lookback and day
+    span = np.where(lookbacks[:, None] > 0, lookbacks[:, None], days[None, :])
+    counts = np.zeros((len(lookbacks), n))
+
+    rows = max(chunk_cells // n, 1)
+    for a in range(0, n, rows):
+        t = days[a:a + rows]
+        # below[i, s]: days up to s, and before t[i], with a lower premium than day t[i]
+        lower = (premium[None, :] < premium[t, None]) & (days[None, :] < t[:, None])
+        below = np.cumsum(lower, axis=1, dtype=np.int32)
+        row = np.arange(len(t))
+        total = below[row, t - 1]
+        start = t[None, :] - span[:, t] - 1
+        before = np.where(start >= 0, below[row[None, :], np.maximum(start, 0)], 0)
+        counts[:, t] = total[None, :] - before
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ranks = counts / span
+    valid = (days[None, :] >= span) & (days[None, :] >= np.where(lookbacks[:, None] > 0, 1, min_history))
+    return ranks, valid
+
+
+def performance(net, years):
+    """CAGR, volatility, Sharpe ratio (zero risk-free rate) and max drawdown along the last axis"""
+    log_equity = np.cumsum(np.log1p(net), axis=-1)
+    per_year = net.shape[-1] / years
+    mean = net.mean(axis=-1)
+    std = net.std(axis=-1)
+    peak = np.maximum(np.maximum.accumulate(log_equity, axis=-1), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = mean / std * np.sqrt(per_year)
+    return {
+        'cagr': np.exp(log_equity[..., -1] / years) - 1,
+        'volatility': std * np.sqrt(per_year),
+        'sharpe': sharpe,
+        'max_drawdown': np.expm1((log_equity - peak).min(axis=-1)),
+    }
+
+
+def backtest(frame=None, lookbacks=LOOKBACKS, thresholds=THRESHOLDS, costs_bps=COSTS_BPS,
+             min_history=MIN_HISTORY, chunk_cells=CHUNK_CELLS):
+    """
+    Performance of every (lookback, threshold, cost) parameter set
+
+    `frame` is a merged NAV frame (nav_data.load_nav_frame() by default).
+    Returns one row per parameter set with CAGR, volatility, Sharpe ratio,
+    max drawdown, switches per year and the fraction of days in MSTR; the
+    evaluation period and buy-and-hold BTC / MSTR baselines are in attrs.
+    """
+    frame = frame if frame is not None else nav_data.load_nav_frame()
+    dates, premium, btc_return, mstr_return = backtest_series(frame)
+    lookbacks = np.asarray(lookbacks)
+    thresholds = np.asarray(thresholds, dtype=float)
+    costs = np.asarray(costs_bps, dtype=float) / 10_000
+
+    ranks, valid = premium_ranks(premium, lookbacks, min_history, chunk_cells)
+    ready = np.flatnonzero(valid.all(axis=0))
+    if len(ready) == 0 or ready[0] >= len(premium) - 2:
+        raise ValueError(f"Not enough history for a {lookbacks.max()}-day lookback ({len(premium)} days)")
+    first = ready[0]
+    # Position chosen at close t (first..n-2) earns the return of day t + 1
+    btc_next = btc_return[first + 1:]
+    mstr_next = mstr_return[first + 1:]
+    years = (dates.iloc[-1] - dates.iloc[first]).days / 365.25
+
+    metrics = {name: np.empty((len(lookbacks), len(thresholds), len(costs)))
+               for name in ['cagr', 'volatility', 'sharpe', 'max_drawdown', 'switches_per_year',
+                            'time_in_mstr']}
+    step = max(chunk_cells // (len(thresholds) * len(costs) * len(btc_next)), 1)
+    for a in range(0, len(lookbacks), step):
+        b = min(a + step, len(lookbacks))
+        in_mstr = ranks[a:b, None, first:-1] < thresholds[None, :, None]
+        gross = np.where(in_mstr, mstr_next, btc_next)
+        # A switch at close t is paid for out of day t + 1 (the first position is free)
+        switched = np.zeros_like(in_mstr)
+        switched[..., 1:] = in_mstr[..., 1:] != in_mstr[..., :-1]
+        charge = 2 * costs[None, None, :, None] * switched[:, :, None, :]
+        net = (1 + gross[:, :, None, :]) * (1 - charge) - 1
+
+        for name, values in performance(net, years).items():
+            metrics[name][a:b] = values
+        metrics['switches_per_year'][a:b] = (switched.sum(axis=-1) / years)[..., None]
+        metrics['time_in_mstr'][a:b] = in_mstr.mean(axis=-1)[..., None]
+
+    index = pd.MultiIndex.from_product([lookbacks, thresholds, costs_bps],
+                                       names=['lookback', 'threshold', 'cost_bps'])
+    table = pd.DataFrame({name: values.ravel() for name, values in metrics.items()}, index=index).reset_index()
+
+    baselines = performance(np.stack([btc_next, mstr_next]), years)
+    table.attrs.update({
+        'start': str(dates.iloc[first].date()),
+        'end': str(dates.iloc[-1].date()),
+        'days': len(btc_next),
+        'baselines': {asset: {name: float(values[i]) for name, values in baselines.items()}
+                      for i, asset in enumerate(['btc', 'mstr'])},
+    })
+    return table
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--max-lookback': str(LOOKBACKS[-1]), '--step': '10', '--costs': ','.join(map(str, COSTS_BPS)),
+               '--top': '10', '--output': None}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    lookbacks = [0] + list(range(20, int(options['--max-lookback']) + 1, int(options['--step'])))
+    costs = [float(c) for c in options['--costs'].split(',')]
+
+    start = time.perf_counter()
+    table = backtest(lookbacks=lookbacks, costs_bps=costs)
+    elapsed = time.perf_counter() - start
+
+    attrs = table.attrs
+    print(f"{len(table):,} parameter sets ({len(lookbacks)} lookbacks x {len(THRESHOLDS)} thresholds x "
+          f"{len(costs)} costs) over {attrs['days']} days, {attrs['start']} to {attrs['end']}, "
+          f"in {elapsed * 1000:.0f} ms\n")
+
+    columns = ['cagr', 'volatility', 'sharpe', 'max_drawdown']
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.3f}'.format):
+        print("Buy and hold:")
+        print(pd.DataFrame(attrs['baselines']).T[columns])
+
+        print("\nMSTR below the expanding historical median, BTC above it:")
+        print(table[(table['lookback'] == 0) & (table['threshold'] == 0.5)].set_index('cost_bps'))
+
+        cost = costs[len(costs) // 2]
+        print(f"\nTop {options['--top']} by Sharpe ratio at {cost:g} bps per side:")
+        top = table[table['cost_bps'] == cost].nlargest(int(options['--top']), 'sharpe')
+        print(top.to_string(index=False))
+
+    if options['--output']:
+        table.to_csv(options['--output'], index=False)
+        print(f"\nResults saved to {options['--output']}")
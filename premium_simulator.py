@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Joint simulation of BTC and the mean-reverting NAV premium
+
+fair_value_model.py holds the premium at fixed targets, while historically
+it swings between well under 1x and over 7x. This simulator moves BTC and
+the premium together:
+
+  regime    Bull/Bear Markov chain (regime.py labels, as in btc_monte_carlo)
+  BTC       log returns with regime-dependent drift and volatility
+  premium   Ornstein-Uhlenbeck process on the log premium with
+            regime-dependent mean, reversion speed and volatility, its
+            shocks correlated with the BTC shocks within each regime
+
+Every parameter is estimated from the merged NAV frame (one observation
+per trading day). Time advances in steps of `step_days` trading days using
+the exact OU / log-normal transitions, with the regime held over a step,
+so 1M paths to the end of 2026 take a few dozen vectorized steps. The MSTR
+price on each path is premium x BTC NAV per share, with holdings and
+shares compounding as in fair_value_model.py (quarter ends and growth
+assumptions from a scenario file, scenarios/base_2026.json by default):
+
+    python premium_simulator.py
+    python premium_simulator.py --paths 1000000 --premium-mean 2.0
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import btc_monte_carlo
+import fair_value_scenarios
+import histogram
+import nav_data
+import regime
+
+QUANTILES = btc_monte_carlo.QUANTILES
+N_PATHS = 1_000_000
+STEP_DAYS = 5
+
+# Paths simulated at once by one task
+CHUNK_PATHS = 1 << 17
+
+
+# ============================================================================
+# ESTIMATION
+# ============================================================================
+
+def fit_params(frame):
+    """
+    Regime-conditioned parameters from a merged NAV frame
+
+    Each array is indexed by regime (0 = Bear, 1 = Bull); rates are per
+    trading day. A day's move is attributed to the regime at its start.
+    """
+    frame = regime.add_regime_indicators(frame)
+    frame = frame[frame[['close_btc', 'nav_premium']].notna().all(axis=1)]
+    log_btc = np.log(frame['close_btc'].to_numpy())
+    log_premium = np.log(frame['nav_premium'].to_numpy())
+    state = frame['regime_bull'].to_numpy().astype(np.intp)
+
+    btc_return = np.diff(log_btc)
+    x, y, s = log_premium[:-1], log_premium[1:], state[:-1]
+
+    params = {name: np.empty(2) for name in
+              ['btc_mu', 'btc_sigma', 'premium_mean', 'premium_theta', 'premium_sigma', 'rho']}
+    for r in (0, 1):
+        mask = s == r
+        # AR(1) fit of the daily log premium: y = a + b x + e
+        b, a = np.polyfit(x[mask], y[mask], 1)
+        # A slope outside (0, 1) has no mean-reverting OU equivalent
+        b = np.clip(b, 1e-6, 1 - 1e-6)
+        residual = y[mask] - (a + b * x[mask])
+        theta = -np.log(b)
+        params['premium_mean'][r] = a / (1 - b)
+        params['premium_theta'][r] = theta
+        params['premium_sigma'][r] = residual.std(ddof=2) * np.sqrt(2 * theta / (1 - b ** 2))
+        params['btc_mu'][r] = btc_return[mask].mean()
+        params['btc_sigma'][r] = btc_return[mask].std(ddof=1)
+        params['rho'][r] = np.corrcoef(btc_return[mask], residual)[0, 1]
+
+    transitions = np.zeros((2, 2))
+    np.add.at(transitions, (state[:-1], state[1:]), 1)
+    params['transition'] = transitions / transitions.sum(axis=1, keepdims=True)
+    params['start'] = {
+        'date': frame['date'].iloc[-1],
+        'btc_price': frame['close_btc'].iloc[-1],
+        'premium': frame['nav_premium'].iloc[-1],
+        'state': int(state[-1]),
+        'btc_holdings': frame['cumulative_btc_holdings'].iloc[-1],
+        'shares_outstanding': frame['shares_outstanding'].iloc[-1],
+    }
+    return params
+
+
+def step_coefficients(params, dt):
+    """
+    Per-step transition coefficients, shape (2, steps) each, for step
+    lengths `dt` (trading days)
+    """
+    dt = np.asarray(dt, dtype=np.float64)[None, :]
+    theta = params['premium_theta'][:, None]
+    decay = np.exp(-theta * dt)
+    # Probability of leaving each regime over a step: (P^dt) off-diagonal
+    values, vectors = np.linalg.eig(params['transition'])
+    switch = np.empty((2, dt.shape[1]))
+    for j, k in enumerate(dt[0]):
+        power = (vectors @ np.diag(values.real ** k) @ np.linalg.inv(vectors)).real
+        switch[:, j] = [power[0, 1], power[1, 0]]
+    return {
+        'switch': switch,
+        'btc_drift': params['btc_mu'][:, None] * dt,
+        'btc_scale': params['btc_sigma'][:, None] * np.sqrt(dt),
+        'decay': decay,
+        'premium_scale': params['premium_sigma'][:, None] * np.sqrt((1 - decay ** 2) / (2 * theta)),
+    }
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+_config = None
+
+
+def _init_worker(config):
+    global _config
+    _config = config
+
+
+def iter_steps(rng, config, size):
+    """
+    Advance `size` paths one step at a time
+
+    Yields (step index, log BTC price, log premium) after each step; the
+    arrays are updated in place by the next step.
+    """
+    c = config['coefficients']
+    params = config['params']
+    start = params['start']
+    mean = params['premium_mean']
+    rho = params['rho']
+    rho_c = np.sqrt(1 - rho ** 2)
+
+    state = np.full(size, start['state'], dtype=np.intp)
+    log_btc = np.full(size, np.log(start['btc_price']))
+    log_premium = np.full(size, np.log(start['premium']))
+    for j in range(len(config['record_mask'])):
+        state ^= rng.random(size) < c['switch'][state, j]
+        z_btc = rng.standard_normal(size)
+        z_premium = rho[state] * z_btc + rho_c[state] * rng.standard_normal(size)
+        log_btc += c['btc_drift'][state, j] + c['btc_scale'][state, j] * z_btc
+        m = mean[state]
+        log_premium -= m
+        log_premium *= c['decay'][state, j]
+        log_premium += m + c['premium_scale'][state, j] * z_premium
+        yield j, log_btc, log_premium
+
+
+def simulate_chunk(rng, config, size):
+    """
+    BTC price, premium and MSTR price at each horizon, each (horizons, size)
+    """
+    out = {name: np.empty((len(config['record']), size)) for name in ['btc', 'premium']}
+    row = 0
+    for j, log_btc, log_premium in iter_steps(rng, config, size):
+        if config['record_mask'][j]:
+            out['btc'][row] = log_btc
+            out['premium'][row] = log_premium
+            row += 1
+
+    np.exp(out['btc'], out=out['btc'])
+    np.exp(out['premium'], out=out['premium'])
+    out['mstr'] = out['premium'] * out['btc'] * config['btc_per_share'][:, None]
+    return out
+
+
+def _simulate_task(task):
+    chunk_fn, seed, size = task
+    c = _config
+    out = chunk_fn(np.random.default_rng(seed), c, size)
+    histograms = {}
+    for name, (lo, hi) in c['ranges'].items():
+        histograms[name] = histogram.LogHistogram(lo, hi, rows=len(c['record']))
+        histograms[name].add(out[name])
+    return histograms
+
+
+def build_config(params, step_days=STEP_DAYS, quarter_ends=None, assumptions=None):
+    """
+    Step grid, transition coefficients and histogram ranges for a simulation
+
+    `quarter_ends` and `assumptions` default to those of the default
+    fair_value_model scenario (btc_monte_carlo.scenario_assumptions()).
+    """
+    if quarter_ends is None or assumptions is None:
+        default_ends, default_assumptions = btc_monte_carlo.scenario_assumptions()
+        quarter_ends = default_ends if quarter_ends is None else quarter_ends
+        assumptions = default_assumptions if assumptions is None else assumptions
+    start = params['start']
+    start_day = np.datetime64(start['date'].date())
+    horizons = np.array([np.busday_count(start_day, np.datetime64(d)) for d in quarter_ends.values()])
+
+    # Step boundaries every `step_days`, plus each quarter end
+    boundaries = np.union1d(np.arange(step_days, horizons[-1], step_days), horizons)
+    dt = np.diff(boundaries, prepend=0)
+
+    btc_per_share = btc_monte_carlo.fair_value_path_factors(start['btc_holdings'], start['shares_outstanding'],
+                                                            len(horizons), assumptions)
+    mstr_start = start['premium'] * start['btc_price'] * btc_per_share[0]
+    return {
+        'params': params,
+        'coefficients': step_coefficients(params, dt),
+        'dt': dt,
+        'record': horizons,
+        'record_mask': np.isin(boundaries, horizons),
+        'btc_per_share': btc_per_share,
+        'ranges': {
+            'btc': (start['btc_price'] / 1000, start['btc_price'] * 1000),
+            'premium': (1e-3, 1e3),
+            'mstr': (mstr_start / 1e5, mstr_start * 1e5),
+        },
+    }
+
+
+def run_simulation(chunk_fn, config, n_paths, seed=0, max_workers=None):
+    """
+    Run chunk_fn(rng, config, size) over chunks of paths in a process pool
+
+    chunk_fn returns {name: (horizons, size) array} for every name in
+    config['ranges']; the result is one merged LogHistogram per name.
+    """
+    sizes = [min(CHUNK_PATHS, n_paths - i) for i in range(0, n_paths, CHUNK_PATHS)]
+    tasks = [(chunk_fn, s, size) for s, size in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks)) or 1
+    if max_workers == 1:
+        _init_worker(config)
+        results = list(map(_simulate_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(config,)) as pool:
+            results = list(pool.map(_simulate_task, tasks))
+
+    histograms = results[0]
+    for other in results[1:]:
+        for name, hist in other.items():
+            histograms[name].merge(hist)
+    return histograms
+
+
+def quantile_table(histograms, quarter_ends, quantiles=QUANTILES):
+    """Quantile and mean columns per histogram, one row per quarter"""
+    table = pd.DataFrame(index=pd.Index(list(quarter_ends), name='quarter'))
+    table['date'] = list(quarter_ends.values())
+    for name, hist in histograms.items():
+        values = hist.quantiles(quantiles)
+        for j, q in enumerate(quantiles):
+            table[f'{name}_q{round(q * 100):02d}'] = values[:, j]
+        table[f'{name}_mean'] = hist.mean()
+    return table
+
+
+def simulate(n_paths=N_PATHS, params=None, step_days=STEP_DAYS, seed=0, max_workers=None,
+             scenario=fair_value_scenarios.DEFAULT_SCENARIO, quantiles=QUANTILES):
+    """
+    Per-quarter quantiles and means of BTC, the NAV premium and the MSTR price
+
+    `params` defaults to fit_params() on the stored history; edit a copy
+    (e.g. params['premium_mean'][:] = np.log(2.0)) for what-if runs.
+    `scenario` supplies the quarter ends and growth assumptions. Returns a
+    DataFrame indexed by quarter.
+    """
+    params = params if params is not None else fit_params(nav_data.load_nav_frame())
+    quarter_ends, assumptions = btc_monte_carlo.scenario_assumptions(scenario)
+    config = build_config(params, step_days, quarter_ends, assumptions)
+    histograms = run_simulation(simulate_chunk, config, n_paths, seed, max_workers)
+    table = quantile_table(histograms, quarter_ends, quantiles)
+    start = params['start']
+    table.attrs.update({'paths': n_paths, 'step_days': step_days, 'start_date': str(start['date'].date()),
+                        'start_btc': start['btc_price'], 'start_premium': start['premium']})
+    return table
+
+
+def print_params(params):
+    per_year = 252
+    table = pd.DataFrame({
+        'btc_drift_ann': params['btc_mu'] * per_year,
+        'btc_vol_ann': params['btc_sigma'] * np.sqrt(per_year),
+        'premium_mean': np.exp(params['premium_mean']),
+        'premium_half_life_days': np.log(2) / params['premium_theta'],
+        'premium_vol_ann': params['premium_sigma'] * np.sqrt(per_year),
+        'rho': params['rho'],
+        'stay_prob': np.diag(params['transition']),
+    }, index=regime.REGIME_LABELS)
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.3f}'.format):
+        print(table)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--paths': str(N_PATHS), '--step-days': str(STEP_DAYS), '--seed': '0', '--workers': None,
+               '--premium-mean': None, '--scenario': fair_value_scenarios.DEFAULT_SCENARIO}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    params = fit_params(nav_data.load_nav_frame())
+    if options['--premium-mean']:
+        params['premium_mean'][:] = np.log(float(options['--premium-mean']))
+    print("Regime-conditioned parameters (per trading day, annualized where noted):")
+    print_params(params)
+
+    start = time.perf_counter()
+    table = simulate(int(options['--paths']), params, int(options['--step-days']), int(options['--seed']),
+                     int(options['--workers']) if options['--workers'] else None, options['--scenario'])
+    elapsed = time.perf_counter() - start
+
+    attrs = table.attrs
+    print(f"\n{attrs['paths']:,} joint paths from BTC ${attrs['start_btc']:,.2f}, premium "
+          f"{attrs['start_premium']:.2f}x ({attrs['start_date']}), {attrs['step_days']}-day steps, "
+          f"in {elapsed:.1f}s\n")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        for name, label, fmt in [('btc', 'BTC price', '{:,.0f}'), ('premium', 'NAV premium', '{:.2f}'),
+                                 ('mstr', 'MSTR price', '{:,.2f}')]:
+            with pd.option_context('display.float_format', fmt.format):
+                print(f"{label}:")
+                print(table.filter(regex=f'^(date|{name}_)'))
+                print()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Shared Yahoo Finance chart fetcher for the price store
+
+Full mode pulls five years of daily bars and rewrites the stored series.
+Incremental mode reads the last stored date, requests only the smallest
+chart range that covers the gap, and appends the new bars to the store.
+
+fetch_symbols() pulls a list of symbols concurrently on a bounded thread
+pool, sharing one client and retrying failed requests with exponential
+backoff:
+
+    python price_fetcher.py                      every symbol in treasury_symbols.json
+    python price_fetcher.py BTC-USD MSTR --incremental --workers 4
+    python price_fetcher.py --base-url http://127.0.0.1:8000
+    python price_fetcher.py BTC-USD MSTR --interval 5m --incremental
+
+The API client is pluggable: anything with a
+get_chart(symbol, interval, range) method returning a Yahoo chart response
+works, e.g. HttpChartClient pointed at a local stand-in server, or
+ReplayClient serving canned responses from disk.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import price_store
+
+# Yahoo chart ranges and the number of days each one covers
+CHART_RANGES = [
+    ('5d', 5),
+    ('1mo', 31),
+    ('3mo', 92),
+    ('6mo', 183),
+    ('1y', 366),
+    ('2y', 731),
+    ('5y', 1827),
+    ('10y', 3653),
+]
+FULL_RANGE = '5y'
+
+YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart'
+SYMBOLS_FILE = 'treasury_symbols.json'
+
+# HTTP statuses worth retrying; other 4xx errors fail immediately
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Longest chart range Yahoo serves for each intraday interval
+INTRADAY_MAX_RANGE = {
+    '1m': '5d',
+    '2m': '1mo',
+    '5m': '1mo',
+    '15m': '1mo',
+    '30m': '1mo',
+    '90m': '1mo',
+    '60m': '2y',
+    '1h': '2y',
+}
+
+
+# Where the sandbox's data_api package lives
+SANDBOX_RUNTIME = '/opt/.manus/.sandbox-runtime'
+
+
+class DataApiClient:
+    """Yahoo Finance through the sandbox data_api runtime"""
+
+    def __init__(self):
+        if SANDBOX_RUNTIME not in sys.path:
+            sys.path.append(SANDBOX_RUNTIME)
+        from data_api import ApiClient
+        self.client = ApiClient()
+
+    def get_chart(self, symbol, interval='1d', range=FULL_RANGE):
+        return self.client.call_api('YahooFinance/get_stock_chart', query={
+            'symbol': symbol,
+            'region': 'US',
+            'interval': interval,
+            'range': range,
+            'includeAdjustedClose': True
+        })
+
+
+class HttpChartClient:
+    """
+    Yahoo chart endpoint over plain HTTP
+
+    base_url can point at a local stand-in server that implements
+    GET <base_url>/<symbol>?interval=...&range=...
+    """
+
+    def __init__(self, base_url=YAHOO_CHART_URL, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def get_chart(self, symbol, interval='1d', range=FULL_RANGE):
+        query = urllib.parse.urlencode({'interval': interval, 'range': range,
+                                        'includeAdjClose': 'true'})
+        url = f"{self.base_url}/{urllib.parse.quote(symbol)}?{query}"
+        request = urllib.request.Request(url, headers={'User-Agent': 'btc-nav-premium-analysis'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+
+class ReplayClient:
+    """
+    Local stand-in that serves canned chart responses
+
+    `responses` maps a symbol to a response dict, or is a directory holding
+    one <symbol>.json response file per symbol.
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def get_chart(self, symbol, interval='1d', range=FULL_RANGE):
+        self.calls.append((symbol, interval, range))
+        if isinstance(self.responses, dict):
+            return self.responses[symbol]
+        with open(os.path.join(self.responses, f"{symbol}.json"), 'r') as f:
+            return json.load(f)
+
+
+def default_client():
+    """The sandbox data_api client when it is available, plain HTTP otherwise"""
+    try:
+        return DataApiClient()
+    except ImportError:
+        return HttpChartClient()
+
+
+def load_symbols(path=SYMBOLS_FILE):
+    with open(path, 'r') as f:
+        return json.load(f)['symbols']
+
+
+def is_retryable(error):
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (OSError, TimeoutError, ConnectionError))
+
+
+def call_with_retries(fn, retries=4, backoff=0.5, max_backoff=8.0, log=print):
+    """
+    Call fn(), retrying transient failures with exponential backoff
+
+    The delay doubles after each failed attempt (with full jitter, capped at
+    max_backoff seconds); after `retries` retries the last error is raised.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+            log(f"Request failed ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def range_for_gap(days, interval='1d'):
+    """
+    Smallest chart range covering the last `days` days
+
+    Intraday intervals are capped at the longest range Yahoo serves for
+    them, so long intraday histories have to be built up by regular
+    incremental fetches.
+    """
+    chart_range = 'max'
+    for name, span in CHART_RANGES:
+        if days <= span:
+            chart_range = name
+            break
+    cap = INTRADAY_MAX_RANGE.get(interval)
+    if cap is not None and (chart_range == 'max' or dict(CHART_RANGES)[chart_range] > dict(CHART_RANGES)[cap]):
+        chart_range = cap
+    return chart_range
+
+
+def parse_chart(response, interval='1d'):
+    """Split a chart response into (meta, store columns); None if empty"""
+    if not (response and 'chart' in response and response['chart'].get('result')):
+        return None, None
+
+    result = response['chart']['result'][0]
+    meta = result['meta']
+    timestamps = result.get('timestamp') or []
+    quotes = result['indicators']['quote'][0]
+
+    # int64 epoch days (epoch seconds for intraday), float64 prices;
+    # missing or zero quotes become NaN. Daily bars are dated in the
+    # exchange's time zone: a Tokyo session opens on the previous UTC day
+    columns = {'date': np.asarray(timestamps, dtype=np.int64)}
+    if price_store.date_unit(interval) == 'D':
+        columns['date'] = (columns['date'] + int(meta.get('gmtoffset') or 0)) // 86400
+    for name in price_store.PRICE_COLUMNS:
+        columns[name] = np.array([v if v else np.nan for v in quotes[name]], dtype=np.float64)
+    return meta, columns
+
+
+def write_metadata(symbol, meta, path, interval='1d'):
+    """Save the chart metadata and the stored date range"""
+    store_meta = price_store.read_meta(symbol, interval=interval)
+    dates = price_store.open_series(symbol, ['date'], interval=interval)['date']
+    unit = store_meta['date_unit']
+    metadata = {
+        'symbol': meta['symbol'],
+        'currency': meta['currency'],
+        'exchange': meta.get('exchangeName', 'N/A'),
+        'data_points': store_meta['length'],
+        'interval': interval,
+        'first_date': str(dates[0].astype(f'datetime64[{unit}]')) if len(dates) else None,
+        'last_date': str(dates[-1].astype(f'datetime64[{unit}]')) if len(dates) else None,
+        'current_price': meta.get('regularMarketPrice', None)
+    }
+    with open(path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def fetch_symbol(symbol, client=None, incremental=False, export=True, metadata_path=None, today=None,
+                 retries=0, backoff=0.5, log=print, interval='1d'):
+    """
+    Fetch one symbol into the price store
+
+    `today` (epoch days) overrides the current date for incremental gaps.
+    Returns the chart metadata dict written to `metadata_path`, or None when
+    the response held no data.
+    """
+    client = client or default_client()
+    last = price_store.last_date(symbol, interval=interval) if incremental else None
+
+    if last is None:
+        chart_range = range_for_gap(dict(CHART_RANGES)[FULL_RANGE], interval)
+    else:
+        today = today if today is not None else int(time.time() // 86400)
+        last_day = last if price_store.date_unit(interval) == 'D' else last // 86400
+        # +1 so the (possibly still open) last stored bar is fetched again
+        chart_range = range_for_gap(today - last_day + 1, interval)
+
+    log(f"Fetching {symbol} {interval} ({'incremental, ' if last is not None else ''}range {chart_range})...")
+    response = call_with_retries(lambda: client.get_chart(symbol, interval=interval, range=chart_range),
+                                 retries=retries, backoff=backoff, log=log)
+    meta, columns = parse_chart(response, interval)
+    if meta is None:
+        log("No data found in the response")
+        return None
+
+    log(f"Symbol: {meta['symbol']}")
+    log(f"Currency: {meta['currency']}")
+    log(f"Current Price: ${meta.get('regularMarketPrice', 'N/A')}")
+    log(f"Total data points retrieved: {len(columns['date'])}")
+
+    if last is None:
+        store_meta = price_store.write_series(symbol, columns, interval=interval)
+    else:
+        before = price_store.read_meta(symbol, interval=interval)['length']
+        store_meta = price_store.append_series(symbol, columns, interval=interval)
+        log(f"Appended {store_meta['length'] - before} new bars")
+    log(f"Data saved to {price_store.series_dir(symbol, interval=interval)} ({store_meta['length']} rows)")
+
+    if export:
+        log(f"Data exported to {price_store.export_json(symbol, interval=interval)}")
+
+    metadata_path = metadata_path or f"{symbol.lower()}_metadata.json"
+    metadata = write_metadata(symbol, meta, metadata_path, interval)
+    log(f"Date range: {metadata['first_date']} to {metadata['last_date']}")
+    return metadata
+
+
+def fetch_symbols(symbols, client=None, incremental=False, max_workers=8, retries=4, backoff=0.5,
+                  today=None, interval='1d'):
+    """
+    Fetch several symbols concurrently through one shared client
+
+    At most `max_workers` requests are in flight at once, so the wall time
+    is roughly that of the slowest request when len(symbols) <= max_workers.
+    Only daily symbols with a known JSON export (BTC-USD, MSTR) refresh it; chart
+    metadata for each symbol goes next to its stored series.
+
+    Returns {symbol: metadata dict, None (no data) or the raised exception}.
+    """
+    client = client or default_client()
+
+    def fetch_one(symbol):
+        def log(message):
+            print(f"[{symbol}] {message}")
+        try:
+            return fetch_symbol(symbol, client=client, incremental=incremental,
+                                export=interval == '1d' and symbol in price_store.JSON_EXPORTS,
+                                metadata_path=os.path.join(price_store.series_dir(symbol, interval=interval),
+                                                           'chart_meta.json'),
+                                today=today, retries=retries, backoff=backoff, log=log, interval=interval)
+        except Exception as e:
+            log(f"Error occurred: {str(e)}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(fetch_one, symbols))
+    return dict(zip(symbols, results))
+
+
+def run(symbol, metadata_path, argv):
+    """Command-line entry point shared by the fetch scripts"""
+    incremental = '--incremental' in argv
+    export = '--no-export' not in argv
+    try:
+        return fetch_symbol(symbol, incremental=incremental, export=export,
+                            metadata_path=metadata_path, retries=4) is not None
+    except Exception as e:
+        print(f"Error occurred: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--workers': 8, '--retries': 4, '--base-url': None, '--interval': '1d'}
+    symbols = []
+    i = 0
+    while i < len(args):
+        if args[i] in options:
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            if not args[i].startswith('--'):
+                symbols.append(args[i])
+            i += 1
+
+    symbols = symbols or load_symbols()
+    client = HttpChartClient(options['--base-url']) if options['--base-url'] else None
+
+    start = time.perf_counter()
+    results = fetch_symbols(symbols, client=client, incremental='--incremental' in args,
+                            max_workers=int(options['--workers']), retries=int(options['--retries']),
+                            interval=options['--interval'])
+    elapsed = time.perf_counter() - start
+
+    failed = [s for s, r in results.items() if r is None or isinstance(r, Exception)]
+    print(f"\nFetched {len(symbols) - len(failed)}/{len(symbols)} symbols in {elapsed:.1f}s")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
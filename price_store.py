@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mapped price store for OHLCV series
+
+Each series lives in its own directory under STORE_DIR:
+
+    price_store/BTC-USD/meta.json     symbol, interval, row count, dtypes, digest
+    price_store/BTC-USD/date.bin      int64 epoch days
+    price_store/BTC-USD/open.bin      float64
+    ...
+    price_store/BTC-USD@5m/...        intraday bars, int64 epoch seconds
+
+Columns are raw little-endian arrays, so opening a series is just an mmap and
+costs nothing until the pages are touched. Daily series store dates as epoch
+days; intraday series (any interval below one day) store epoch seconds. The
+JSON history files are kept as an export format only (see export_json /
+import_json).
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = 'price_store'
+
+DATE_COLUMN = 'date'
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+COLUMN_DTYPES = {DATE_COLUMN: '<i8', **{col: '<f8' for col in PRICE_COLUMNS}}
+
+DAILY_INTERVALS = {'1d', '5d', '1wk', '1mo', '3mo'}
+
+# JSON export file for each symbol the analysis scripts know about
+JSON_EXPORTS = {
+    'BTC-USD': 'btc_historical_data.json',
+    'MSTR': 'mstr_historical_data.json',
+}
+
+
+def date_unit(interval):
+    """NumPy datetime unit of the stored 'date' column: 'D' (days) or 's' (seconds)"""
+    return 'D' if interval in DAILY_INTERVALS else 's'
+
+
+def interval_timedelta(interval):
+    """Bar length of a Yahoo interval string ('1m', '5m', '1h', '1d', ...)"""
+    units = {'m': 'min', 'h': 'h', 'd': 'D', 'wk': 'W'}
+    for suffix, unit in units.items():
+        if interval.endswith(suffix) and interval[:-len(suffix)].isdigit():
+            return pd.Timedelta(int(interval[:-len(suffix)]), unit=unit)
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+def series_name(symbol, interval='1d'):
+    """Store directory name: the symbol for daily bars, SYMBOL@interval otherwise"""
+    return symbol if interval == '1d' else f"{symbol}@{interval}"
+
+
+def json_export_path(symbol, interval='1d'):
+    """Return the JSON export file name for a symbol"""
+    if interval == '1d':
+        return JSON_EXPORTS.get(symbol, f"{symbol.lower()}_historical_data.json")
+    return f"{symbol.lower()}_{interval}_historical_data.json"
+
+
+def series_dir(symbol, root=STORE_DIR, interval='1d'):
+    return os.path.join(root, series_name(symbol, interval))
+
+
+def _column_path(symbol, column, root=STORE_DIR, interval='1d'):
+    return os.path.join(series_dir(symbol, root, interval), f"{column}.bin")
+
+
+def _meta_path(symbol, root=STORE_DIR, interval='1d'):
+    return os.path.join(series_dir(symbol, root, interval), 'meta.json')
+
+
+def _fsync_write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_meta(symbol, meta, root=STORE_DIR, interval='1d'):
+    # meta.json is the commit point: readers only trust the row count it records
+    path = _meta_path(symbol, root, interval)
+    _fsync_write(path + '.tmp', json.dumps(meta, indent=2).encode())
+    os.replace(path + '.tmp', path)
+
+
+def columns_digest(columns):
+    """SHA-256 over the raw bytes of every column, in a fixed column order"""
+    h = hashlib.sha256()
+    for name in sorted(columns):
+        h.update(name.encode())
+        # hashlib reads the array buffer directly, so memmaps are hashed without a copy
+        h.update(np.ascontiguousarray(columns[name]))
+    return h.hexdigest()
+
+
+def _normalize_columns(columns):
+    """Coerce a dict of array-likes to the store dtypes, sorted by date"""
+    out = {}
+    for name, dtype in COLUMN_DTYPES.items():
+        if name in columns:
+            out[name] = np.asarray(columns[name], dtype=dtype)
+    if DATE_COLUMN not in out:
+        raise ValueError("columns must include a 'date' column")
+    n = len(out[DATE_COLUMN])
+    for name, values in out.items():
+        if len(values) != n:
+            raise ValueError(f"column '{name}' has {len(values)} rows, expected {n}")
+    order = np.argsort(out[DATE_COLUMN], kind='stable')
+    if not np.all(order == np.arange(n)):
+        out = {name: values[order] for name, values in out.items()}
+    return out
+
+
+def write_series(symbol, columns, interval='1d', root=STORE_DIR):
+    """
+    Write a full series to the store, replacing any previous contents
+
+    `columns` maps column names to arrays; 'date' must hold int64 epoch days
+    for daily intervals and int64 epoch seconds for intraday ones.
+    """
+    columns = _normalize_columns(columns)
+    os.makedirs(series_dir(symbol, root, interval), exist_ok=True)
+
+    for name, values in columns.items():
+        path = _column_path(symbol, name, root, interval)
+        _fsync_write(path + '.tmp', values.tobytes())
+        os.replace(path + '.tmp', path)
+
+    meta = {
+        'symbol': symbol,
+        'interval': interval,
+        'date_unit': date_unit(interval),
+        'length': int(len(columns[DATE_COLUMN])),
+        'columns': {name: COLUMN_DTYPES[name] for name in columns},
+        'digest': columns_digest(columns),
+    }
+    _write_meta(symbol, meta, root, interval)
+    return meta
+
+
+def write_series_batches(symbol, batches, interval='1d', root=STORE_DIR):
+    """
+    Write a full series from an iterable of column batches
+
+    Each batch (a dict of arrays, as yielded by iter_json_batches) is written
+    to the column files as soon as it arrives, so only one batch is in memory
+    at a time. The stored series and its digest are identical to
+    write_series() on the concatenated columns. Batches that are not in date
+    order are concatenated and sorted in memory instead.
+    """
+    os.makedirs(series_dir(symbol, root, interval), exist_ok=True)
+    files = {}
+    n = 0
+    last = None
+    ordered = True
+    try:
+        for batch in batches:
+            batch = {name: np.asarray(values, dtype=COLUMN_DTYPES[name])
+                     for name, values in batch.items() if name in COLUMN_DTYPES}
+            if not files:
+                if DATE_COLUMN not in batch:
+                    raise ValueError("columns must include a 'date' column")
+                files = {name: open(_column_path(symbol, name, root, interval) + '.tmp', 'wb') for name in batch}
+            if set(batch) != set(files):
+                raise ValueError(f"batch columns {sorted(batch)} do not match {sorted(files)}")
+            dates = batch[DATE_COLUMN]
+            if len(dates):
+                ordered = ordered and (last is None or dates[0] >= last) and bool(np.all(dates[1:] >= dates[:-1]))
+                last = dates[-1]
+            for name, f in files.items():
+                f.write(batch[name].tobytes())
+            n += len(dates)
+        for f in files.values():
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        for f in files.values():
+            f.close()
+
+    if not files:
+        return write_series(symbol, {name: [] for name in COLUMN_DTYPES}, interval=interval, root=root)
+
+    tmp_paths = {name: _column_path(symbol, name, root, interval) + '.tmp' for name in files}
+    if not ordered:
+        columns = {name: np.fromfile(path, dtype=COLUMN_DTYPES[name]) for name, path in tmp_paths.items()}
+        for path in tmp_paths.values():
+            os.remove(path)
+        return write_series(symbol, columns, interval=interval, root=root)
+
+    for name, path in tmp_paths.items():
+        os.replace(path, _column_path(symbol, name, root, interval))
+    columns = {name: np.memmap(_column_path(symbol, name, root, interval), dtype=COLUMN_DTYPES[name],
+                               mode='r', shape=(n,)) if n else np.empty(0, dtype=COLUMN_DTYPES[name])
+               for name in files}
+
+    meta = {
+        'symbol': symbol,
+        'interval': interval,
+        'date_unit': date_unit(interval),
+        'length': int(n),
+        'columns': {name: COLUMN_DTYPES[name] for name in columns},
+        'digest': columns_digest(columns),
+    }
+    _write_meta(symbol, meta, root, interval)
+    return meta
+
+
+def _dedupe_dates(columns):
+    """Keep the last row for each date of date-sorted columns (the latest fetch wins)"""
+    dates = columns[DATE_COLUMN]
+    keep = np.ones(len(dates), dtype=bool)
+    keep[:-1] = dates[1:] != dates[:-1]
+    if keep.all():
+        return columns
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def _write_rows(symbol, columns, start, root=STORE_DIR, interval='1d'):
+    """Write columns into the column files at row `start` (no commit)"""
+    for name, values in columns.items():
+        with open(_column_path(symbol, name, root, interval), 'r+b') as f:
+            f.seek(start * values.itemsize)
+            f.write(values.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _truncate(symbol, meta, root=STORE_DIR, interval='1d'):
+    """Drop bytes past the committed length (left by staging or an interrupted append)"""
+    for name, dtype in meta['columns'].items():
+        with open(_column_path(symbol, name, root, interval), 'r+b') as f:
+            f.truncate(meta['length'] * np.dtype(dtype).itemsize)
+
+
+def _finish_replace(symbol, meta, root=STORE_DIR, interval='1d'):
+    """
+    Complete the last-bar replacement recorded in meta['pending']
+
+    The staged rows sit past both the committed length and their destination,
+    so this can be repeated after an interruption at any point.
+    """
+    pending = meta.pop('pending')
+    staged = {}
+    for name, dtype in meta['columns'].items():
+        dtype = np.dtype(dtype)
+        staged[name] = np.fromfile(_column_path(symbol, name, root, interval), dtype=dtype,
+                                   count=pending['rows'], offset=pending['staged'] * dtype.itemsize)
+    _write_rows(symbol, staged, pending['start'], root, interval)
+    meta['length'] = pending['start'] + pending['rows']
+    meta['digest'] = pending['digest']
+    _write_meta(symbol, meta, root, interval)
+    _truncate(symbol, meta, root, interval)
+    return meta
+
+
+def append_series(symbol, columns, root=STORE_DIR, interval='1d'):
+    """
+    Append new bars to a stored series, deduplicating overlapping bars
+
+    Incoming rows are sorted and deduplicated by date (the last row for a
+    date wins). Rows dated before the last stored bar are dropped as already
+    stored. A row dated on the last stored bar replaces it, because that bar
+    may have been fetched while still open. Later rows are appended.
+
+    Stored rows are never overwritten while they are visible: new bars are
+    written after the committed length and only become visible when meta.json
+    is replaced. A replacement is staged past the data, the old last bar is
+    hidden by one meta swap, the staged rows are moved into place and a
+    second swap commits them. An interruption therefore leaves the previous
+    series readable (without its last bar if it happened mid-replacement);
+    the next append finishes the pending replacement first.
+    """
+    columns = _dedupe_dates(_normalize_columns(columns))
+    if not has_series(symbol, root, interval):
+        return write_series(symbol, columns, interval=interval, root=root)
+
+    meta = read_meta(symbol, root, interval)
+    if 'pending' in meta:
+        meta = _finish_replace(symbol, meta, root, interval)
+    n = meta['length']
+    if set(columns) != set(meta['columns']):
+        raise ValueError(f"columns {sorted(columns)} do not match stored {sorted(meta['columns'])}")
+
+    replaces_last = False
+    if n:
+        last = open_series(symbol, [DATE_COLUMN], root, interval)[DATE_COLUMN][-1]
+        new_rows = columns[DATE_COLUMN] >= last
+        columns = {name: values[new_rows] for name, values in columns.items()}
+        replaces_last = bool(len(columns[DATE_COLUMN]) and columns[DATE_COLUMN][0] == last)
+    start = n - 1 if replaces_last else n
+
+    m = len(columns[DATE_COLUMN])
+    if m == 0:
+        return meta
+
+    # Chain the digest instead of rehashing the whole history on every append
+    h = hashlib.sha256()
+    h.update(meta['digest'].encode())
+    h.update(str(start).encode())
+    h.update(columns_digest(columns).encode())
+    digest = h.hexdigest()
+
+    if not replaces_last:
+        _write_rows(symbol, columns, n, root, interval)
+        meta['length'] = n + m
+        meta['digest'] = digest
+        _write_meta(symbol, meta, root, interval)
+        _truncate(symbol, meta, root, interval)
+        return meta
+
+    # Stage the rows after their destination [n - 1, n - 1 + m), hide the
+    # old last bar, then move them into place
+    staged = n - 1 + m
+    _write_rows(symbol, columns, staged, root, interval)
+    meta['length'] = n - 1
+    meta['pending'] = {'start': start, 'staged': staged, 'rows': m, 'digest': digest}
+    _write_meta(symbol, meta, root, interval)
+    return _finish_replace(symbol, meta, root, interval)
+
+
+def last_date(symbol, root=STORE_DIR, interval='1d'):
+    """Last stored date in store units, or None for an empty/missing series"""
+    if not has_series(symbol, root, interval):
+        return None
+    dates = open_series(symbol, [DATE_COLUMN], root, interval)[DATE_COLUMN]
+    return int(dates[-1]) if len(dates) else None
+
+
+def read_meta(symbol, root=STORE_DIR, interval='1d'):
+    with open(_meta_path(symbol, root, interval), 'r') as f:
+        meta = json.load(f)
+    meta.setdefault('date_unit', date_unit(meta.get('interval', interval)))
+    return meta
+
+
+def has_series(symbol, root=STORE_DIR, interval='1d'):
+    return os.path.exists(_meta_path(symbol, root, interval))
+
+
+def open_series(symbol, columns=None, root=STORE_DIR, interval='1d'):
+    """
+    Memory-map a stored series
+
+    Returns a dict of read-only NumPy arrays (np.memmap) of the committed
+    length recorded in meta.json.
+    """
+    meta = read_meta(symbol, root, interval)
+    n = meta['length']
+    names = columns if columns is not None else list(meta['columns'])
+    arrays = {}
+    for name in names:
+        dtype = np.dtype(meta['columns'][name])
+        if n == 0:
+            arrays[name] = np.empty(0, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(_column_path(symbol, name, root, interval), dtype=dtype,
+                                     mode='r', shape=(n,))
+    return arrays
+
+
+def store_dates_to_datetime(values, unit='D'):
+    return np.asarray(values, dtype='<i8').astype(f'datetime64[{unit}]').astype('datetime64[ns]')
+
+
+def datetime_to_store_dates(dates, unit='D'):
+    return np.asarray(dates, dtype=f'datetime64[{unit}]').astype('<i8')
+
+
+def epoch_days_to_datetime(days):
+    return store_dates_to_datetime(days, 'D')
+
+
+def datetime_to_epoch_days(dates):
+    return datetime_to_store_dates(dates, 'D')
+
+
+def _frame(arrays, unit, rows=slice(None)):
+    frame = {name: np.array(values[rows]) for name, values in arrays.items()}
+    frame[DATE_COLUMN] = store_dates_to_datetime(frame[DATE_COLUMN], unit)
+    return pd.DataFrame(frame)
+
+
+def _date_bounds(dates, unit, start, end):
+    """Row range [lo, hi) of bars with start <= date <= end"""
+    lo, hi = 0, len(dates)
+    if start is not None:
+        lo = int(np.searchsorted(dates, datetime_to_store_dates(pd.Timestamp(start).to_datetime64(), unit), 'left'))
+    if end is not None:
+        hi = int(np.searchsorted(dates, datetime_to_store_dates(pd.Timestamp(end).to_datetime64(), unit), 'right'))
+    return lo, max(lo, hi)
+
+
+def load_frame(symbol, columns=None, root=STORE_DIR, interval='1d', start=None, end=None):
+    """
+    Load a stored series as a DataFrame with a datetime64 'date' column
+
+    `start` / `end` restrict the rows to a date range; only that slice of
+    the memory map is read. If the store has no copy of a series yet, it is
+    imported once from the JSON export file.
+    """
+    ensure_series(symbol, root=root, interval=interval)
+    if columns is not None and DATE_COLUMN not in columns:
+        columns = [DATE_COLUMN] + list(columns)
+    unit = read_meta(symbol, root, interval)['date_unit']
+    arrays = open_series(symbol, columns, root, interval)
+    lo, hi = _date_bounds(arrays[DATE_COLUMN], unit, start, end)
+    return _frame(arrays, unit, slice(lo, hi))
+
+
+def iter_frames(symbol, chunk_rows=1_000_000, columns=None, root=STORE_DIR, interval='1d'):
+    """Yield a stored series as consecutive DataFrames of at most chunk_rows rows"""
+    ensure_series(symbol, root=root, interval=interval)
+    if columns is not None and DATE_COLUMN not in columns:
+        columns = [DATE_COLUMN] + list(columns)
+    unit = read_meta(symbol, root, interval)['date_unit']
+    arrays = open_series(symbol, columns, root, interval)
+    n = len(arrays[DATE_COLUMN])
+    for lo in range(0, n, chunk_rows):
+        yield _frame(arrays, unit, slice(lo, min(n, lo + chunk_rows)))
+
+
+# ============================================================================
+# JSON EXPORT FORMAT
+# ============================================================================
+
+def records_to_columns(records, interval='1d'):
+    """Convert [{'date': 'YYYY-MM-DD', 'open': ..., ...}] to store columns"""
+    columns = {DATE_COLUMN: datetime_to_store_dates([r['date'] for r in records], date_unit(interval))}
+    for name in PRICE_COLUMNS:
+        columns[name] = np.array(
+            [np.nan if r.get(name) is None else r[name] for r in records], dtype=np.float64
+        )
+    return columns
+
+
+# One key/value pair of a flat record, or the '}' that closes the record
+_JSON_TOKEN = re.compile(
+    r'"(\w+)"\s*:\s*(?:"([^"]*)"|(null|true|false)|(-?[0-9][0-9.eE+-]*))|(\})'
+)
+# Every value of one field across a block of records
+_JSON_FIELD = {
+    DATE_COLUMN: re.compile(rf'"{DATE_COLUMN}"\s*:\s*"([^"]*)"'),
+    **{name: re.compile(rf'"{name}"\s*:\s*("[^"]*"|null|true|false|-?[0-9][0-9.eE+-]*)')
+       for name in PRICE_COLUMNS},
+}
+
+
+def _parse_json_block_fast(text, end, records, unit):
+    """
+    Parse a block field by field with one regex scan and one array conversion each
+
+    Returns None when a field is not present exactly once per record (or
+    holds a value the vectorized conversion cannot handle).
+    """
+    columns = {}
+    for name, pattern in _JSON_FIELD.items():
+        tokens = pattern.findall(text, 0, end)
+        if len(tokens) != records:
+            return None
+        if name == DATE_COLUMN:
+            columns[name] = np.array(tokens, dtype=str).astype(f'datetime64[{unit}]')
+            continue
+        try:
+            columns[name] = np.fromiter(map(float, tokens), dtype=np.float64, count=records)
+        except ValueError:
+            # Nulls (missing quotes): map them to NaN and convert the whole block at once
+            values = np.array(tokens, dtype=str)
+            values[values == 'null'] = 'nan'
+            try:
+                columns[name] = values.astype(np.float64)
+            except ValueError:
+                return None
+    return columns
+
+
+def _parse_json_block(text, end, unit):
+    """Parse the complete records in text[:end] into column arrays"""
+    records = text.count('}', 0, end)
+    columns = _parse_json_block_fast(text, end, records, unit)
+    if columns is not None:
+        return records, columns
+
+    # Slow path: records with missing, extra or quoted fields
+    dates = np.full(records, '', dtype='U32')
+    columns = {name: np.full(records, np.nan) for name in PRICE_COLUMNS}
+    row = 0
+    for key, string, literal, number, close in _JSON_TOKEN.findall(text, 0, end):
+        if close:
+            row += 1
+        elif key == DATE_COLUMN:
+            dates[row] = string
+        elif key in columns and not literal:
+            columns[key][row] = float(number or string)
+    columns[DATE_COLUMN] = dates.astype(f'datetime64[{unit}]')
+    return records, columns
+
+
+def iter_json_batches(json_path, batch_rows=65_536, interval='1d', read_size=1 << 20):
+    """
+    Stream a JSON history file as batches of store columns
+
+    The file is read `read_size` characters at a time; the records in each
+    block are parsed column by column and copied into preallocated arrays of
+    `batch_rows` rows. No list of records is ever built, so peak memory is
+    one batch plus one read block regardless of the file size. The yielded
+    arrays are reused for the next batch, so copy them if they need to
+    outlive it.
+    """
+    unit = date_unit(interval)
+    batch = {name: np.empty(batch_rows, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+    row = 0
+    pending = ''
+
+    with open(json_path, 'r') as f:
+        while True:
+            block = f.read(read_size)
+            text = pending + block
+            # Only parse up to the last complete record; the rest waits for more input
+            end = text.rfind('}') + 1 if block else len(text)
+            pending = text[end:]
+
+            records, columns = _parse_json_block(text, end, unit)
+            if np.isnat(columns[DATE_COLUMN]).any():
+                raise ValueError(f"every record in {json_path} needs a 'date'")
+            columns[DATE_COLUMN] = columns[DATE_COLUMN].astype('<i8')
+
+            done = 0
+            while done < records:
+                take = min(records - done, batch_rows - row)
+                for name, values in batch.items():
+                    values[row:row + take] = columns[name][done:done + take]
+                row += take
+                done += take
+                if row == batch_rows:
+                    yield batch
+                    row = 0
+
+            if not block:
+                break
+
+    if row:
+        yield {name: values[:row] for name, values in batch.items()}
+
+
+def _json_value(name, value):
+    if np.isnan(value):
+        return None
+    if name == 'volume':
+        return int(value)
+    return float(value)
+
+
+def columns_to_records(columns, interval='1d'):
+    unit = date_unit(interval)
+    dates = np.asarray(columns[DATE_COLUMN]).astype(f'datetime64[{unit}]').astype(str)
+    names = [name for name in PRICE_COLUMNS if name in columns]
+    values = {name: np.asarray(columns[name]).tolist() for name in names}
+    records = []
+    for i, date in enumerate(dates):
+        record = {'date': str(date)}
+        for name in names:
+            record[name] = _json_value(name, values[name][i])
+        records.append(record)
+    return records
+
+
+def import_json(symbol, json_path=None, root=STORE_DIR, interval='1d'):
+    """Stream a JSON history export into the store, one batch at a time"""
+    json_path = json_path or json_export_path(symbol, interval)
+    return write_series_batches(symbol, iter_json_batches(json_path, interval=interval),
+                                interval=interval, root=root)
+
+
+def export_json(symbol, json_path=None, root=STORE_DIR, interval='1d'):
+    """Write a stored series out in the JSON history format"""
+    json_path = json_path or json_export_path(symbol, interval)
+    records = columns_to_records(open_series(symbol, root=root, interval=interval), interval)
+    with open(json_path + '.tmp', 'w') as f:
+        json.dump(records, f, indent=2)
+    os.replace(json_path + '.tmp', json_path)
+    return json_path
+
+
+def ensure_series(symbol, root=STORE_DIR, interval='1d'):
+    """Import the JSON export into the store if the series is not there yet"""
+    if not has_series(symbol, root, interval):
+        json_path = json_export_path(symbol, interval)
+        if not os.path.exists(json_path):
+            raise FileNotFoundError(f"No stored series for {series_name(symbol, interval)} "
+                                    f"and no export at {json_path}")
+        print(f"Importing {json_path} into {series_dir(symbol, root, interval)}...")
+        import_json(symbol, json_path, root=root, interval=interval)
+
+
+if __name__ == "__main__":
+    # python price_store.py import|export [SYMBOL ...]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'import'
+    symbols = sys.argv[2:] or list(JSON_EXPORTS)
+    for symbol in symbols:
+        if command == 'import':
+            meta = import_json(symbol)
+            print(f"{symbol}: {meta['length']} rows -> {series_dir(symbol)}")
+        elif command == 'export':
+            print(f"{symbol}: exported to {export_json(symbol)}")
+        else:
+            print(f"Unknown command: {command}")
+            sys.exit(1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Market regime indicators for the merged NAV frame
+
+All windows are time spans (pandas offsets such as '50D' or '6h'), not row
+counts, so the same definitions apply to daily and intraday bars:
+
+  MA crossover   mean BTC close over ma_fast vs ma_slow
+  Momentum       BTC return since the last bar at or before t - momentum
+  Drawdown       distance of the BTC close from its running all-time high
+
+Each method is a boolean signal (True = Bull) and the combined regime is
+their majority vote, computed as one int8 sum; further signals can be
+plugged in through `extra_signals`.
+
+iter_regime_chunks() applies them to a stream of frame chunks, carrying just
+enough trailing history between chunks to keep memory bounded.
+"""
+
+import numpy as np
+import pandas as pd
+
+import asof_join
+
+MA_FAST = '50D'
+MA_SLOW = '200D'
+MOMENTUM = '30D'
+DRAWDOWN_THRESHOLD = -0.20
+SMOOTH = '7D'
+
+# Category order matches the signal codes: False -> Bear, True -> Bull
+REGIME_LABELS = ['Bear', 'Bull']
+
+
+def rolling_mean(frame, column, window):
+    """Mean of `column` over the trailing time window (t - window, t]"""
+    return frame.rolling(window, on='date', min_periods=1)[column].mean().to_numpy()
+
+
+def lookback_return(dates, values, lookback):
+    """Return since the last bar at or before t - lookback (NaN if none)"""
+    times = asof_join.to_ns(dates)
+    values = np.asarray(values, dtype=np.float64)
+    idx = asof_join.asof_index(times, times - pd.Timedelta(lookback).value)
+    prior = values[np.maximum(idx, 0)]
+    prior[idx < 0] = np.nan
+    return values / prior - 1
+
+
+def regime_labels(bull):
+    """'Bull' / 'Bear' categorical labels for a boolean signal, without building strings"""
+    return pd.Categorical.from_codes(np.asarray(bull, dtype=np.int8), categories=REGIME_LABELS)
+
+
+def classify(frame, signals):
+    """
+    Add signal columns and their majority vote to `frame` (in place)
+
+    `signals` maps a name to a function frame -> boolean array (True =
+    Bull). Each signal is stored as a bool column signal_<name> plus a
+    categorical regime_<name> label; bull_votes is their int8 sum and
+    regime_bull / regime_combined the strict majority (ties are Bear).
+    """
+    votes = np.zeros(len(frame), dtype=np.int8)
+    for name, signal in signals.items():
+        bull = np.asarray(signal(frame), dtype=bool)
+        frame[f'signal_{name}'] = bull
+        frame[f'regime_{name}'] = regime_labels(bull)
+        votes += bull
+    frame['bull_votes'] = votes
+    frame['regime_bull'] = 2 * votes.astype(np.int16) > len(signals)
+    frame['regime_combined'] = regime_labels(frame['regime_bull'])
+    return frame
+
+
+def add_regime_indicators(frame, ma_fast=MA_FAST, ma_slow=MA_SLOW, momentum=MOMENTUM,
+                          drawdown_threshold=DRAWDOWN_THRESHOLD, initial_ath=-np.inf, extra_signals=None):
+    """
+    Return a copy of `frame` with the regime indicator columns added
+
+    `initial_ath` seeds the running all-time high when `frame` continues an
+    earlier chunk. `extra_signals` ({name: frame -> bool array}) vote
+    alongside the three built-in signals; for chunked runs they must only
+    look back as far as the longest built-in window.
+    """
+    frame = frame.copy()
+    close = frame['close_btc'].to_numpy(dtype=np.float64)
+
+    # Method 1: Moving Average Crossover
+    frame['btc_ma_fast'] = rolling_mean(frame, 'close_btc', ma_fast)
+    frame['btc_ma_slow'] = rolling_mean(frame, 'close_btc', ma_slow)
+
+    # Method 2: Price momentum
+    frame['btc_momentum'] = lookback_return(frame['date'], close, momentum)
+
+    # Method 3: Distance from all-time high
+    frame['btc_ath'] = np.maximum(np.fmax.accumulate(close), initial_ath) if len(close) else close
+    frame['drawdown'] = (frame['close_btc'] - frame['btc_ath']) / frame['btc_ath']
+
+    signals = {
+        # Bull: fast MA > slow MA, Bear: fast MA < slow MA
+        'ma': lambda f: f['btc_ma_fast'].to_numpy() > f['btc_ma_slow'].to_numpy(),
+        'momentum': lambda f: f['btc_momentum'].to_numpy() > 0,
+        # Bull: within 20% of ATH, Bear: more than 20% below ATH
+        'ath': lambda f: f['drawdown'].to_numpy() > drawdown_threshold,
+    }
+    signals.update(extra_signals or {})
+
+    # Combined regime (majority vote)
+    return classify(frame, signals)
+
+
+def add_premium_trend(frame, smooth=SMOOTH):
+    """Return a copy of `frame` with NAV premium derivatives added"""
+    frame = frame.copy()
+    frame['nav_premium_derivative'] = frame['nav_premium'].diff()
+    frame['nav_premium_derivative_pct'] = frame['nav_premium'].pct_change()
+    frame['nav_premium_derivative_smooth'] = rolling_mean(frame, 'nav_premium_derivative', smooth)
+    return frame
+
+
+def iter_regime_chunks(chunks, ma_fast=MA_FAST, ma_slow=MA_SLOW, momentum=MOMENTUM,
+                       drawdown_threshold=DRAWDOWN_THRESHOLD, smooth=SMOOTH, extra_signals=None):
+    """
+    Apply add_regime_indicators / add_premium_trend to consecutive chunks
+
+    Each chunk is prefixed with the trailing rows of the previous one that
+    the longest window can still reach, so the output matches running on
+    the concatenated frame while only one chunk (plus that tail) is in
+    memory at a time.
+    """
+    lookback = max(pd.Timedelta(w) for w in (ma_fast, ma_slow, momentum, smooth))
+    tail = None
+    ath = -np.inf
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        frame = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+        n_tail = 0 if tail is None else len(tail)
+
+        out = add_regime_indicators(frame, ma_fast, ma_slow, momentum, drawdown_threshold, initial_ath=ath,
+                                    extra_signals=extra_signals)
+        out = add_premium_trend(out, smooth)
+        out = out.iloc[n_tail:].reset_index(drop=True)
+        ath = out['btc_ath'].iloc[-1]
+
+        # Keep the last bar at or before (last date - lookback) and everything after it
+        times = asof_join.to_ns(frame['date'])
+        start = max(0, int(np.searchsorted(times, times[-1] - lookback.value, side='right')) - 1)
+        tail = frame.iloc[start:].reset_index(drop=True)
+
+        yield out
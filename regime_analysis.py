@@ -5,6 +5,7 @@ Identifies bull/bear markets and analyzes NAV Premium behavior
 """
 
 import json
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -15,71 +16,19 @@ from datetime import datetime
 import seaborn as sns
 from scipy import stats
 
+import nav_data
+import regime
+import regime_bootstrap
+
 # Set style
 plt.style.use('dark_background')
 sns.set_palette("husl")
 
 print("Loading data...")
 
-# Load all data
-with open('btc_historical_data.json', 'r') as f:
-    btc_data = json.load(f)
-with open('mstr_historical_data.json', 'r') as f:
-    mstr_data = json.load(f)
-with open('mstr_btc_holdings.json', 'r') as f:
-    holdings_data = json.load(f)
-
-# Create dataframes
-btc_df = pd.DataFrame(btc_data)
-btc_df['date'] = pd.to_datetime(btc_df['date'])
-btc_df = btc_df.sort_values('date')
-
-mstr_df = pd.DataFrame(mstr_data)
-mstr_df['date'] = pd.to_datetime(mstr_df['date'])
-mstr_df = mstr_df.sort_values('date')
-
-holdings_df = pd.DataFrame(holdings_data)
-holdings_df['date'] = pd.to_datetime(holdings_df['date'])
-holdings_df = holdings_df.sort_values('date')
-
-# Merge datasets
-merged_df = pd.merge(btc_df[['date', 'close']], 
-                     mstr_df[['date', 'close']], 
-                     on='date', 
-                     how='inner',
-                     suffixes=('_btc', '_mstr'))
-
-all_dates = pd.DataFrame({'date': merged_df['date'].unique()})
-holdings_filled = pd.merge(all_dates, holdings_df[['date', 'cumulative_btc_holdings']], 
-                          on='date', how='left')
-holdings_filled['cumulative_btc_holdings'] = holdings_filled['cumulative_btc_holdings'].ffill()
-
-merged_df = pd.merge(merged_df, holdings_filled, on='date', how='left')
-merged_df = merged_df[merged_df['cumulative_btc_holdings'].notna()]
-
-# Calculate NAV Premium
-def estimate_shares_outstanding(date):
-    if date < pd.Timestamp('2020-08-01'):
-        return 160_000_000
-    elif date < pd.Timestamp('2021-01-01'):
-        return 165_000_000
-    elif date < pd.Timestamp('2022-01-01'):
-        return 170_000_000
-    elif date < pd.Timestamp('2023-01-01'):
-        return 180_000_000
-    elif date < pd.Timestamp('2024-01-01'):
-        return 190_000_000
-    elif date < pd.Timestamp('2024-11-01'):
-        return 220_000_000
-    elif date < pd.Timestamp('2025-01-01'):
-        return 280_000_000
-    else:
-        return 320_000_000
-
-merged_df['shares_outstanding'] = merged_df['date'].apply(estimate_shares_outstanding)
-merged_df['market_cap_millions'] = (merged_df['close_mstr'] * merged_df['shares_outstanding']) / 1_000_000
-merged_df['btc_nav_millions'] = (merged_df['close_btc'] * merged_df['cumulative_btc_holdings']) / 1_000_000
-merged_df['nav_premium'] = merged_df['market_cap_millions'] / merged_df['btc_nav_millions']
+# Load the merged BTC / MSTR / holdings frame (cached per input change)
+INTERVAL = sys.argv[1] if len(sys.argv) > 1 else '1d'
+merged_df = nav_data.load_nav_frame(interval=INTERVAL)
 
 print(f"Total records: {len(merged_df)}")
 
@@ -91,30 +40,12 @@ print("\n" + "="*80)
 print("IDENTIFYING MARKET REGIMES")
 print("="*80)
 
-# Calculate moving averages for regime identification
-merged_df['btc_ma_50'] = merged_df['close_btc'].rolling(window=50, min_periods=1).mean()
-merged_df['btc_ma_200'] = merged_df['close_btc'].rolling(window=200, min_periods=1).mean()
-
-# Method 1: Moving Average Crossover (50-day vs 200-day)
-# Bull: 50-day MA > 200-day MA
-# Bear: 50-day MA < 200-day MA
-merged_df['regime_ma'] = np.where(merged_df['btc_ma_50'] > merged_df['btc_ma_200'], 'Bull', 'Bear')
-
-# Method 2: Price momentum (30-day return)
-merged_df['btc_return_30d'] = merged_df['close_btc'].pct_change(30)
-merged_df['regime_momentum'] = np.where(merged_df['btc_return_30d'] > 0, 'Bull', 'Bear')
-
-# Method 3: Distance from all-time high
-merged_df['btc_ath'] = merged_df['close_btc'].expanding().max()
-merged_df['drawdown'] = (merged_df['close_btc'] - merged_df['btc_ath']) / merged_df['btc_ath']
-# Bull: within 20% of ATH, Bear: more than 20% below ATH
-merged_df['regime_ath'] = np.where(merged_df['drawdown'] > -0.20, 'Bull', 'Bear')
-
-# Combined regime (majority vote)
-merged_df['regime_combined'] = merged_df.apply(
-    lambda row: 'Bull' if [row['regime_ma'], row['regime_momentum'], row['regime_ath']].count('Bull') >= 2 else 'Bear',
-    axis=1
-)
+# Three regime definitions plus their majority vote (see regime.py):
+#   Method 1: 50-day vs 200-day moving average crossover
+#   Method 2: 30-day BTC momentum
+#   Method 3: within 20% of the BTC all-time high
+# Windows are calendar spans, so the same definitions work on intraday bars
+merged_df = regime.add_regime_indicators(merged_df)
 
 # Print regime statistics
 print("\nRegime Distribution (Combined Method):")
@@ -131,12 +62,8 @@ print("\n" + "="*80)
 print("CALCULATING NAV PREMIUM DERIVATIVES")
 print("="*80)
 
-# Calculate derivatives (rate of change)
-merged_df['nav_premium_derivative'] = merged_df['nav_premium'].diff()
-merged_df['nav_premium_derivative_pct'] = merged_df['nav_premium'].pct_change()
-
-# Smooth derivative using rolling mean
-merged_df['nav_premium_derivative_smooth'] = merged_df['nav_premium_derivative'].rolling(window=7, min_periods=1).mean()
+# Derivatives (rate of change), smoothed with a 7-day rolling mean
+merged_df = regime.add_premium_trend(merged_df)
 
 print(f"\nNAV Premium Derivative Statistics:")
 print(merged_df['nav_premium_derivative'].describe())
@@ -151,10 +78,10 @@ print("="*80)
 
 # Filter out NaN values
 analysis_df = merged_df[['date', 'close_btc', 'nav_premium', 'nav_premium_derivative', 
-                          'nav_premium_derivative_smooth', 'regime_combined']].dropna()
+                          'nav_premium_derivative_smooth', 'regime_combined', 'regime_bull']].dropna()
 
 # Encode regime as numeric (Bull=1, Bear=0)
-analysis_df['regime_numeric'] = (analysis_df['regime_combined'] == 'Bull').astype(int)
+analysis_df['regime_numeric'] = analysis_df['regime_bull'].astype(int)
 
 # Calculate correlations
 corr_derivative_regime = analysis_df['nav_premium_derivative'].corr(analysis_df['regime_numeric'])
@@ -190,6 +117,19 @@ print(f"  t-statistic: {t_stat:.4f}")
 print(f"  p-value: {p_value:.6f}")
 print(f"  Significant difference: {'Yes' if p_value < 0.05 else 'No'} (α=0.05)")
 
+# The derivatives are autocorrelated, so also resample whole blocks of days
+bootstrap_table = regime_bootstrap.summarize(
+    analysis_df['regime_bull'].to_numpy(),
+    {'premium': analysis_df['nav_premium'].to_numpy(),
+     'derivative': analysis_df['nav_premium_derivative'].to_numpy()},
+)
+print(f"\nBlock bootstrap ({regime_bootstrap.N_RESAMPLES:,} stationary resamples, "
+      f"{regime_bootstrap.CONFIDENCE:.0%} CI) and circular-shift permutation test:")
+for name, label in [('derivative', 'NAV Premium Derivative'), ('premium', 'NAV Premium')]:
+    row = bootstrap_table.loc[f'diff_{name}']
+    print(f"  Bull - Bear {label}: {row['observed']:.6f} "
+          f"[{row['ci_low']:.6f}, {row['ci_high']:.6f}], p-value: {row['p_value']:.4f}")
+
 # ============================================================================
 # VISUALIZATION 1: Timeline with Regime Coloring
 # ============================================================================
@@ -356,6 +296,11 @@ results = {
         't_statistic': float(t_stat),
         'p_value': float(p_value),
         'significant': bool(p_value < 0.05)
+    },
+    'block_bootstrap': {
+        key: {column: float(value) for column, value in row.items()}
+        for key, row in bootstrap_table.iterrows()
+        if key.startswith('diff_')
     }
 }
 
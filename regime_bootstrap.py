@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Block-bootstrap and permutation tests for the Bull vs Bear comparisons
+
+The daily NAV premium and its derivative are strongly autocorrelated, so
+the single t-test in regime_analysis.py overstates how much independent
+evidence the sample holds. This engine resamples whole blocks instead:
+
+  bootstrap()          stationary (random block lengths, Politis-Romano) or
+                       moving-block bootstrap of the joint (regime, values)
+                       series -> confidence intervals for the Bull / Bear
+                       means and their difference
+  permutation_test()   null distribution of the Bull - Bear difference from
+                       circular shifts (or block permutations) of the regime
+                       labels, which keeps the autocorrelation of both series
+
+Resample indices are generated as whole (resamples x rows) matrices, one
+chunk at a time, each chunk drawing from its own SeedSequence child stream,
+so results are reproducible for a given seed whatever the number of
+worker processes:
+
+    python regime_bootstrap.py --resamples 100000 --workers 4
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import nav_benchmarks
+import nav_data
+import shared_arrays
+
+N_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+
+# Elements of the (resamples x rows) index matrix generated at once
+CHUNK_CELLS = 1 << 22
+
+
+def default_block_length(n):
+    """Mean block length: the usual n^(1/3) rule of thumb"""
+    return max(1.0, n ** (1 / 3))
+
+
+def regime_arrays(frame):
+    """
+    Regime flag and the compared series on the rows regime_analysis.py analyses
+
+    Returns (bull, {'premium': ..., 'derivative': ...}).
+    """
+    frame = nav_benchmarks.benchmark_frame(frame)
+    bull = frame['regime_bull'].to_numpy()
+    values = {
+        'premium': frame['nav_premium'].to_numpy(),
+        'derivative': frame['nav_premium_derivative'].to_numpy(),
+    }
+    return bull, values
+
+
+# ============================================================================
+# RESAMPLE INDICES
+# ============================================================================
+
+def stationary_indices(rng, size, n, block_length, length=None):
+    """
+    Stationary bootstrap indices into a series of n rows, shape (size, length)
+
+    Each position starts a new block with probability 1 / block_length
+    (so block lengths are geometric) at a uniform random start; otherwise it
+    continues the current block, wrapping around the end of the series.
+    `length` defaults to n.
+    """
+    length = n if length is None else length
+    t = np.arange(length)
+    new_block = rng.random((size, length)) < 1 / block_length
+    new_block[:, 0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    starts = rng.integers(0, n, size=(size, length))
+    return (np.take_along_axis(starts, block_start, axis=1) + (t - block_start)) % n
+
+
+def moving_block_indices(rng, size, n, block_length):
+    """Moving-block bootstrap indices (fixed blocks, circular), shape (size, n)"""
+    length = max(1, int(round(block_length)))
+    t = np.arange(n)
+    starts = rng.integers(0, n, size=(size, -(-n // length)))
+    return (np.repeat(starts, length, axis=1)[:, :n] + t % length) % n
+
+
+def shift_indices(rng, size, n, block_length=None):
+    """Circular shifts of the whole series by 1..n-1 rows, shape (size, n); needs n >= 2"""
+    return (np.arange(n) + rng.integers(1, n, size=(size, 1))) % n
+
+
+def block_permutation_indices(rng, size, n, block_length):
+    """Random orderings of consecutive blocks, shape (size, n)"""
+    length = max(1, int(round(block_length)))
+    n_blocks = -(-n // length)
+    order = np.argsort(rng.random((size, n_blocks)), axis=1)
+    full = np.repeat(order * length, length, axis=1) + np.arange(n_blocks * length) % length
+    # The last block is short: drop the positions past the end (n per row remain)
+    return full[full < n].reshape(size, n)
+
+
+RESAMPLERS = {
+    'stationary': stationary_indices,
+    'block': moving_block_indices,
+}
+
+PERMUTERS = {
+    'shift': shift_indices,
+    'block': block_permutation_indices,
+}
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def group_means(bull, values):
+    """
+    Bull mean, Bear mean and difference of each series for rows of `bull`
+
+    `bull` is (resamples, n) and each values array (resamples, n) or (n,).
+    """
+    bull_f = bull.astype(np.float64)
+    n1 = bull_f.sum(axis=-1)
+    n0 = bull.shape[-1] - n1
+    out = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, x in values.items():
+            s1 = (bull_f * x).sum(axis=-1)
+            s0 = x.sum(axis=-1) - s1
+            out[f'bull_mean_{name}'] = s1 / n1
+            out[f'bear_mean_{name}'] = s0 / n0
+            out[f'diff_{name}'] = s1 / n1 - s0 / n0
+    return out
+
+
+def _chunk_sizes(total, n):
+    size = max(1, CHUNK_CELLS // max(n, 1))
+    return [min(size, total - i) for i in range(0, total, size)]
+
+
+_shm = None
+_arrays = None
+
+
+def _init_worker(spec):
+    global _shm, _arrays
+    _shm, _arrays = shared_arrays.attach(spec)
+
+
+def _bootstrap_chunk(task, arrays=None):
+    seed, size, method, block_length = task
+    a = arrays if arrays is not None else _arrays
+    bull = a['bull']
+    values = {name[len('values_'):]: x for name, x in a.items() if name.startswith('values_')}
+    idx = RESAMPLERS[method](np.random.default_rng(seed), size, len(bull), block_length)
+    return group_means(bull[idx], {name: x[idx] for name, x in values.items()})
+
+
+def _permutation_chunk(task, arrays=None):
+    seed, size, method, block_length = task
+    a = arrays if arrays is not None else _arrays
+    bull = a['bull']
+    values = {name[len('values_'):]: x for name, x in a.items() if name.startswith('values_')}
+    idx = PERMUTERS[method](np.random.default_rng(seed), size, len(bull), block_length)
+    means = group_means(bull[idx], values)
+    return {key: v for key, v in means.items() if key.startswith('diff_')}
+
+
+def _run_chunks(fn, bull, values, n_resamples, method, block_length, seed, max_workers):
+    n = len(bull)
+    n_bull = int(np.count_nonzero(bull))
+    if n_bull == 0 or n_bull == n:
+        raise ValueError(f"Need both Bull and Bear rows to compare, got {n_bull} Bull of {n}")
+    block_length = block_length or default_block_length(n)
+    sizes = _chunk_sizes(n_resamples, n)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, method, block_length) for s, size in zip(seeds, sizes)]
+
+    arrays = {'bull': np.asarray(bull, dtype=bool),
+              **{f'values_{name}': np.asarray(x, dtype=np.float64) for name, x in values.items()}}
+    max_workers = min(max_workers or 1, len(tasks)) or 1
+    with shared_arrays.SharedArrays(arrays) as shared:
+        if max_workers == 1:
+            results = [fn(task, shared.arrays()) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(shared.spec,)) as pool:
+                results = list(pool.map(fn, tasks))
+    return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+
+def bootstrap(bull, values, n_resamples=N_RESAMPLES, method='stationary', block_length=None,
+              seed=0, max_workers=1):
+    """
+    Bootstrap distribution of the Bull / Bear means and their difference
+
+    Returns {statistic: array of n_resamples values}, with statistics named
+    bull_mean_<series>, bear_mean_<series> and diff_<series>.
+    """
+    return _run_chunks(_bootstrap_chunk, bull, values, n_resamples, method, block_length, seed, max_workers)
+
+
+def confidence_intervals(observed, samples, confidence=CONFIDENCE):
+    """Percentile intervals and bootstrap standard errors, one row per statistic"""
+    alpha = (1 - confidence) / 2
+    rows = {}
+    for key, values in samples.items():
+        values = values[np.isfinite(values)]
+        rows[key] = {
+            'observed': observed[key],
+            'std_error': values.std(ddof=1),
+            'ci_low': np.quantile(values, alpha),
+            'ci_high': np.quantile(values, 1 - alpha),
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def permutation_test(bull, values, n_permutations=N_RESAMPLES, method='shift', block_length=None,
+                     seed=0, max_workers=1):
+    """
+    Two-sided permutation p-values for the Bull - Bear mean differences
+
+    Returns {series: {'observed', 'p_value', 'null'}}.
+    """
+    observed = group_means(np.asarray(bull, dtype=bool), values)
+    null = _run_chunks(_permutation_chunk, bull, values, n_permutations, method, block_length,
+                       seed, max_workers)
+    out = {}
+    for name in values:
+        diffs = null[f'diff_{name}']
+        diffs = diffs[np.isfinite(diffs)]
+        obs = observed[f'diff_{name}']
+        p_value = (1 + np.count_nonzero(np.abs(diffs) >= abs(obs))) / (len(diffs) + 1)
+        out[name] = {'observed': obs, 'p_value': p_value, 'null': diffs}
+    return out
+
+
+def summarize(bull, values, n_resamples=N_RESAMPLES, block_length=None, seed=0, max_workers=1,
+              confidence=CONFIDENCE, method='stationary', permutation='shift'):
+    """
+    Confidence-interval table plus permutation p-values for the regime comparison
+
+    `method` picks the bootstrap (RESAMPLERS) and `permutation` the null
+    distribution of the p-values (PERMUTERS: circular shifts by default).
+    """
+    bull = np.asarray(bull, dtype=bool)
+    observed = group_means(bull, values)
+    samples = bootstrap(bull, values, n_resamples, method, block_length, seed, max_workers)
+    table = confidence_intervals(observed, samples, confidence)
+    tests = permutation_test(bull, values, n_resamples, permutation, block_length, seed + 1, max_workers)
+    table['p_value'] = np.nan
+    for name, result in tests.items():
+        table.loc[f'diff_{name}', 'p_value'] = result['p_value']
+    return table
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--resamples': str(N_RESAMPLES), '--block-length': None, '--seed': '0',
+               '--workers': None, '--interval': '1d', '--confidence': str(CONFIDENCE),
+               '--method': 'stationary', '--permutation': 'shift'}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    merged_df = nav_data.load_nav_frame(interval=options['--interval'])
+    bull, values = regime_arrays(merged_df)
+    block_length = float(options['--block-length']) if options['--block-length'] else default_block_length(len(bull))
+    n_resamples = int(options['--resamples'])
+
+    start = time.perf_counter()
+    table = summarize(bull, values, n_resamples, block_length, int(options['--seed']),
+                      int(options['--workers'] or os.cpu_count() or 1), float(options['--confidence']),
+                      options['--method'], options['--permutation'])
+    elapsed = time.perf_counter() - start
+
+    permutations = 'circular-shift' if options['--permutation'] == 'shift' else 'block'
+    print(f"{n_resamples:,} {options['--method']}-bootstrap resamples and {permutations} permutations "
+          f"of {len(bull):,} bars (mean block length {block_length:.1f}) in {elapsed:.2f}s\n")
+    with pd.option_context('display.width', 200, 'display.float_format', '{:.6f}'.format):
+        print(table)
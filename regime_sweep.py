@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep over regime definitions
+
+Evaluates every combination of MA crossover windows, momentum lookbacks
+and drawdown thresholds with the statistics reported by
+regime_analysis.py: Bull/Bear day counts, NAV premium mean and median per
+regime, mean premium derivative per regime, the derivative t-test and the
+derivative / regime correlations.
+
+Each distinct moving average and momentum lookback is computed once; the
+resulting indicator arrays, the premium and its derivatives are placed in
+shared memory and a process pool scores batches of configurations with
+matrix products, so thousands of definitions take seconds:
+
+    python regime_sweep.py
+    python regime_sweep.py --ma-fast 20D,50D --ma-slow 100D,200D --momentum 14D,30D --drawdown -0.2,-0.3
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import nav_data
+import regime
+import shared_arrays
+
+DEFAULT_GRID = {
+    'ma_fast': [f"{d}D" for d in range(10, 101, 10)],
+    'ma_slow': [f"{d}D" for d in range(100, 301, 25)],
+    'momentum': ['7D', '14D', '30D', '60D', '90D'],
+    'drawdown_threshold': [-0.10, -0.15, -0.20, -0.25, -0.30, -0.35, -0.40],
+}
+
+OUTPUT_FILE = 'regime_sweep_results.csv'
+
+# Rows of the bull matrix scored at once (bounds worker memory on intraday data)
+BATCH_CELLS = 1 << 24
+
+
+def config_grid(ma_fast, ma_slow, momentum, drawdown_threshold):
+    """All combinations with a fast MA shorter than the slow MA"""
+    return [c for c in product(ma_fast, ma_slow, momentum, drawdown_threshold)
+            if pd.Timedelta(c[0]) < pd.Timedelta(c[1])]
+
+
+def prepare_arrays(frame, grid):
+    """
+    Indicator matrices for every window in the grid, restricted to the rows
+    regime_analysis.py analyses (non-NaN premium and derivatives)
+    """
+    frame = regime.add_premium_trend(frame)
+    close = frame['close_btc'].to_numpy(dtype=np.float64)
+
+    ma_windows = sorted(set(grid['ma_fast']) | set(grid['ma_slow']), key=pd.Timedelta)
+    ma = np.vstack([regime.rolling_mean(frame, 'close_btc', w) for w in ma_windows])
+    momentum = np.vstack([regime.lookback_return(frame['date'], close, lb) for lb in grid['momentum']])
+    ath = np.fmax.accumulate(close)
+    drawdown = (close - ath) / ath
+
+    valid = frame[['close_btc', 'nav_premium', 'nav_premium_derivative',
+                   'nav_premium_derivative_smooth']].notna().all(axis=1).to_numpy()
+    arrays = {
+        'ma': ma[:, valid],
+        'momentum': momentum[:, valid],
+        'drawdown': drawdown[valid],
+        'premium': frame['nav_premium'].to_numpy()[valid],
+        'derivative': frame['nav_premium_derivative'].to_numpy()[valid],
+        'derivative_smooth': frame['nav_premium_derivative_smooth'].to_numpy()[valid],
+    }
+    index = {'ma': {w: i for i, w in enumerate(ma_windows)},
+             'momentum': {lb: i for i, lb in enumerate(grid['momentum'])}}
+    return arrays, index
+
+
+# ============================================================================
+# SCORING (runs in the workers)
+# ============================================================================
+
+_shm = None
+_arrays = None
+
+
+def _init_worker(spec):
+    global _shm, _arrays
+    _shm, _arrays = shared_arrays.attach(spec)
+
+
+def _group_stats(bull, values, prefix):
+    """Mean of `values` over the Bull and Bear rows of each config"""
+    n1 = bull.sum(axis=1)
+    s1 = bull @ values
+    return {f'bull_mean_{prefix}': s1 / n1, f'bear_mean_{prefix}': (values.sum() - s1) / (len(values) - n1)}
+
+
+def _masked_median(bull, values, order):
+    """Median of `values` over the True entries of each row of `bull`"""
+    ranked = bull[:, order]
+    counts = np.cumsum(ranked, axis=1, dtype=np.int32)
+    n = counts[:, -1]
+    lo = np.argmax(counts > ((n - 1) // 2)[:, None], axis=1)
+    hi = np.argmax(counts > (n // 2)[:, None], axis=1)
+    sorted_values = values[order]
+    median = (sorted_values[lo] + sorted_values[hi]) / 2
+    return np.where(n > 0, median, np.nan)
+
+
+def _correlation(bull_f, centered, n):
+    """Pearson correlation between a 0/1 regime series and a centered series"""
+    n1 = bull_f.sum(axis=1)
+    s1 = bull_f @ centered
+    # cov = s1/n - mean(bull) * mean(centered) = s1/n
+    return (s1 / n) / (np.sqrt(n1 / n * (1 - n1 / n)) * np.sqrt((centered ** 2).mean()))
+
+
+def score_configs(configs, a=None):
+    """Regime statistics for a batch of (ma_fast_i, ma_slow_i, momentum_i, drawdown) configs"""
+    a = a if a is not None else _arrays
+    configs = np.asarray(configs, dtype=np.float64)
+    fast, slow, mom = (configs[:, i].astype(np.intp) for i in range(3))
+    threshold = configs[:, 3]
+
+    # Majority vote of the three signals, one row per config
+    votes = (a['ma'][fast] > a['ma'][slow]).astype(np.int8)
+    votes += a['momentum'][mom] > 0
+    votes += a['drawdown'][None, :] > threshold[:, None]
+    bull = votes >= 2
+
+    n = bull.shape[1]
+    bull_f = bull.astype(np.float64)
+    n1 = bull_f.sum(axis=1)
+    n0 = n - n1
+
+    premium = a['premium']
+    derivative = a['derivative']
+    centered = derivative - derivative.mean()
+    out = {'bull_days': n1.astype(np.int64), 'bear_days': n0.astype(np.int64), 'bull_pct': n1 / n * 100}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out.update(_group_stats(bull_f, premium, 'premium'))
+        order = np.argsort(premium, kind='stable')
+        out['bull_median_premium'] = _masked_median(bull, premium, order)
+        out['bear_median_premium'] = _masked_median(~bull, premium, order)
+        out['premium_spread'] = out['bull_mean_premium'] - out['bear_mean_premium']
+        out.update(_group_stats(bull_f, derivative, 'derivative'))
+
+        # Two-sample t-test on the derivative (pooled variance, as scipy.stats.ttest_ind)
+        s1 = bull_f @ centered
+        q1 = bull_f @ centered ** 2
+        s0 = centered.sum() - s1
+        q0 = (centered ** 2).sum() - q1
+        var1 = (q1 - s1 ** 2 / n1) / (n1 - 1)
+        var0 = (q0 - s0 ** 2 / n0) / (n0 - 1)
+        pooled = ((n1 - 1) * var1 + (n0 - 1) * var0) / (n - 2)
+        t_stat = (s1 / n1 - s0 / n0) / np.sqrt(pooled * (1 / n1 + 1 / n0))
+        out['t_stat'] = t_stat
+        out['p_value'] = 2 * stats.t.sf(np.abs(t_stat), n - 2)
+
+        out['corr_derivative'] = _correlation(bull_f, centered, n)
+        smooth = a['derivative_smooth']
+        out['corr_derivative_smooth'] = _correlation(bull_f, smooth - smooth.mean(), n)
+    return out
+
+
+# ============================================================================
+# SWEEP
+# ============================================================================
+
+def run_sweep(frame, grid=None, max_workers=None):
+    """Score every configuration of `grid`; returns one row per configuration"""
+    grid = grid or DEFAULT_GRID
+    configs = config_grid(grid['ma_fast'], grid['ma_slow'], grid['momentum'], grid['drawdown_threshold'])
+    arrays, index = prepare_arrays(frame, grid)
+    encoded = np.array([(index['ma'][f], index['ma'][s], index['momentum'][m], d)
+                        for f, s, m, d in configs], dtype=np.float64).reshape(-1, 4)
+
+    n = len(arrays['premium'])
+    batch = max(1, min(256, BATCH_CELLS // max(n, 1)))
+    batches = [encoded[i:i + batch] for i in range(0, len(encoded), batch)]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(batches)) or 1
+    with shared_arrays.SharedArrays(arrays) as shared:
+        if max_workers == 1:
+            results = [score_configs(b, shared.arrays()) for b in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(shared.spec,)) as pool:
+                results = list(pool.map(score_configs, batches))
+
+    table = pd.DataFrame(configs, columns=['ma_fast', 'ma_slow', 'momentum', 'drawdown_threshold'])
+    scores = {key: np.concatenate([r[key] for r in results]) if results else [] for key in
+              (results[0] if results else {})}
+    return pd.concat([table, pd.DataFrame(scores)], axis=1)
+
+
+def parse_list(value, cast=str):
+    return [cast(v) for v in value.split(',')]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--ma-fast': None, '--ma-slow': None, '--momentum': None, '--drawdown': None,
+               '--workers': None, '--interval': '1d', '--output': OUTPUT_FILE, '--top': '15'}
+    i = 0
+    while i < len(args):
+        if args[i] not in options:
+            print(f"Unknown option: {args[i]}")
+            sys.exit(1)
+        options[args[i]] = args[i + 1]
+        i += 2
+
+    grid = dict(DEFAULT_GRID)
+    for option, key, cast in [('--ma-fast', 'ma_fast', str), ('--ma-slow', 'ma_slow', str),
+                              ('--momentum', 'momentum', str), ('--drawdown', 'drawdown_threshold', float)]:
+        if options[option]:
+            grid[key] = parse_list(options[option], cast)
+
+    merged_df = nav_data.load_nav_frame(interval=options['--interval'])
+    start = time.perf_counter()
+    results = run_sweep(merged_df, grid,
+                        max_workers=int(options['--workers']) if options['--workers'] else None)
+    elapsed = time.perf_counter() - start
+
+    print(f"Evaluated {len(results):,} regime definitions on {len(merged_df):,} bars in {elapsed:.2f}s")
+    results.to_csv(options['--output'], index=False)
+    print(f"Saved: {options['--output']}")
+
+    top = int(options['--top'])
+    columns = ['ma_fast', 'ma_slow', 'momentum', 'drawdown_threshold', 'bull_pct', 'bull_mean_premium',
+               'bear_mean_premium', 'premium_spread', 't_stat', 'p_value']
+    with pd.option_context('display.width', 200, 'display.max_columns', None,
+                           'display.float_format', '{:.4f}'.format):
+        print(f"\nLargest Bull - Bear NAV premium spread:")
+        print(results.nlargest(top, 'premium_spread')[columns].to_string(index=False))
+        print(f"\nStrongest derivative t-test:")
+        print(results.nsmallest(top, 'p_value')[columns].to_string(index=False))
@@ -3,7 +3,6 @@
 Run BTC NAV Premium Analysis
 """
 
-import json
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -13,94 +12,21 @@ import matplotlib.dates as mdates
 from datetime import datetime
 import seaborn as sns
 
+import nav_data
+
 # Set style
 plt.style.use('dark_background')
 sns.set_palette("husl")
 
 print("Loading data...")
 
-# Load Bitcoin historical data
-with open('btc_historical_data.json', 'r') as f:
-    btc_data = json.load(f)
-
-btc_df = pd.DataFrame(btc_data)
-btc_df['date'] = pd.to_datetime(btc_df['date'])
-btc_df = btc_df.sort_values('date')
-
-print(f"Bitcoin data: {len(btc_df)} records from {btc_df['date'].min()} to {btc_df['date'].max()}")
-
-# Load MicroStrategy stock data
-with open('mstr_historical_data.json', 'r') as f:
-    mstr_data = json.load(f)
-
-mstr_df = pd.DataFrame(mstr_data)
-mstr_df['date'] = pd.to_datetime(mstr_df['date'])
-mstr_df = mstr_df.sort_values('date')
-
-print(f"MSTR data: {len(mstr_df)} records from {mstr_df['date'].min()} to {mstr_df['date'].max()}")
-
-# Load MicroStrategy Bitcoin holdings
-with open('mstr_btc_holdings.json', 'r') as f:
-    holdings_data = json.load(f)
-
-holdings_df = pd.DataFrame(holdings_data)
-holdings_df['date'] = pd.to_datetime(holdings_df['date'])
-holdings_df = holdings_df.sort_values('date')
-
-print(f"MSTR BTC Holdings: {len(holdings_df)} purchase events from {holdings_df['date'].min()} to {holdings_df['date'].max()}")
-print(f"Current holdings: {holdings_df['cumulative_btc_holdings'].iloc[-1]:,} BTC")
-
-print("\nMerging datasets...")
-
-# Merge datasets
-merged_df = pd.merge(btc_df[['date', 'close']], 
-                     mstr_df[['date', 'close']], 
-                     on='date', 
-                     how='inner',
-                     suffixes=('_btc', '_mstr'))
-
-# Forward fill BTC holdings
-all_dates = pd.DataFrame({'date': merged_df['date'].unique()})
-holdings_filled = pd.merge(all_dates, holdings_df[['date', 'cumulative_btc_holdings']], 
-                          on='date', how='left')
-holdings_filled['cumulative_btc_holdings'] = holdings_filled['cumulative_btc_holdings'].ffill()
-
-# Merge with holdings
-merged_df = pd.merge(merged_df, holdings_filled, on='date', how='left')
-
-# Filter to dates where MSTR held Bitcoin
-merged_df = merged_df[merged_df['cumulative_btc_holdings'].notna()]
-
-print(f"Merged data: {len(merged_df)} records")
-
-print("\nCalculating NAV Premium...")
-
-# Calculate NAV Premium
-def estimate_shares_outstanding(date):
-    """Estimate shares outstanding based on date"""
-    if date < pd.Timestamp('2020-08-01'):
-        return 160_000_000
-    elif date < pd.Timestamp('2021-01-01'):
-        return 165_000_000
-    elif date < pd.Timestamp('2022-01-01'):
-        return 170_000_000
-    elif date < pd.Timestamp('2023-01-01'):
-        return 180_000_000
-    elif date < pd.Timestamp('2024-01-01'):
-        return 190_000_000
-    elif date < pd.Timestamp('2024-11-01'):
-        return 220_000_000
-    elif date < pd.Timestamp('2025-01-01'):
-        return 280_000_000
-    else:
-        return 320_000_000
-
-merged_df['shares_outstanding'] = merged_df['date'].apply(estimate_shares_outstanding)
-merged_df['market_cap_millions'] = (merged_df['close_mstr'] * merged_df['shares_outstanding']) / 1_000_000
-merged_df['btc_nav_millions'] = (merged_df['close_btc'] * merged_df['cumulative_btc_holdings']) / 1_000_000
-merged_df['nav_premium'] = merged_df['market_cap_millions'] / merged_df['btc_nav_millions']
-
-print(f"NAV Premium statistics:")
+# Load the merged BTC / MSTR / holdings frame (cached per input change)
+merged_df = nav_data.load_nav_frame()
+
+print(f"Merged data: {len(merged_df)} records from {merged_df['date'].min()} to {merged_df['date'].max()}")
+print(f"Current holdings: {merged_df['cumulative_btc_holdings'].iloc[-1]:,.0f} BTC")
+
+print(f"\nNAV Premium statistics:")
 print(merged_df['nav_premium'].describe())
 
 # Filter data to the relevant range
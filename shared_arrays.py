@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Read-only NumPy arrays shared with worker processes
+
+SharedArrays copies a dict of arrays into one multiprocessing.shared_memory
+block. Workers attach to it by name (see attach()) and get read-only views
+of the same physical pages, so large price / premium arrays are neither
+pickled per task nor duplicated per worker.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArrays:
+    """
+    Owner of a shared-memory block holding several named arrays
+
+    Use as a context manager (or call close()) so the block is unlinked
+    when the owner is done; `spec` is the small picklable handle to pass to
+    workers.
+    """
+
+    def __init__(self, arrays):
+        layout = {}
+        offset = 0
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            offset = -(-offset // 64) * 64  # 64-byte aligned
+            layout[name] = (offset, values.shape, values.dtype.str)
+            offset += values.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.layout = layout
+        for name, values in arrays.items():
+            self._view(name)[...] = values
+
+    def _view(self, name):
+        offset, shape, dtype = self.layout[name]
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+
+    @property
+    def spec(self):
+        return self.shm.name, self.layout
+
+    def arrays(self):
+        return {name: self._view(name) for name in self.layout}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec):
+    """
+    Attach to a SharedArrays block from a worker
+
+    Returns (shm, arrays); keep `shm` referenced for as long as the arrays
+    are used. The arrays are read-only views.
+    """
+    name, layout = spec
+    # Pool workers share the owner's resource tracker, which already knows the
+    # block; the owner unlinks it in SharedArrays.close()
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for key, (offset, shape, dtype) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        view.flags.writeable = False
+        arrays[key] = view
+    return shm, arrays
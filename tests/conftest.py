@@ -0,0 +1,132 @@
+"""
+Shared fixtures: the repo root on sys.path, a synthetic merged NAV frame,
+and a local stand-in for the Yahoo chart endpoint that
+price_fetcher.HttpChartClient can point at
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import price_fetcher
+
+
+def nav_frame(rows, freq, seed=1, btc_sigma=0.008, premium_sigma=0.004, **columns):
+    """
+    Bars every `freq` with a random-walk BTC close and NAV premium (log
+    steps of `btc_sigma` and `premium_sigma`), plus constant `columns`
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(dict({
+        'date': pd.Timestamp('2024-01-01') + pd.Timedelta(freq) * np.arange(rows),
+        'close_btc': 60_000 * np.exp(np.cumsum(rng.normal(0, btc_sigma, rows))),
+        'nav_premium': 2.0 * np.exp(np.cumsum(rng.normal(0, premium_sigma, rows))),
+    }, **columns))
+
+
+def chart_response(symbol, days, closes, gmtoffset=0):
+    """
+    Yahoo chart response for daily bars on `days` (epoch days, in the
+    exchange's time zone `gmtoffset` seconds from UTC) closing at `closes`
+    """
+    return {'chart': {'result': [{
+        'meta': {'symbol': symbol, 'currency': 'USD', 'exchangeName': 'TEST', 'gmtoffset': gmtoffset,
+                 'regularMarketPrice': closes[-1] if len(closes) else None},
+        'timestamp': [int(day) * 86400 - gmtoffset for day in days],
+        'indicators': {'quote': [{
+            'open': list(closes), 'high': list(closes), 'low': list(closes),
+            'close': list(closes), 'volume': [1000] * len(closes),
+        }]},
+    }]}}
+
+
+class ChartServer:
+    """
+    Stand-in chart server on 127.0.0.1
+
+    `bars[symbol]` maps epoch days to closes; a request for range R gets the
+    bars in the last R days up to `today`. `failures[symbol]` is a list of
+    HTTP statuses returned (and consumed) before any data, and every request
+    takes `delay` seconds. Requests and the peak number in flight are recorded.
+    """
+
+    def __init__(self):
+        self.bars = {}
+        self.failures = {}
+        self.today = 0
+        self.delay = 0.0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                symbol = urllib.parse.unquote(parsed.path.strip('/'))
+                query = urllib.parse.parse_qs(parsed.query)
+                with server.lock:
+                    server.requests.append((symbol, query['interval'][0], query['range'][0]))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    failures = server.failures.get(symbol)
+                    status = failures.pop(0) if failures else 200
+                try:
+                    time.sleep(server.delay)
+                    if status != 200:
+                        self.send_error(status)
+                        return
+                    body = json.dumps(server.response(symbol, query['range'][0])).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+    def response(self, symbol, chart_range):
+        span = dict(price_fetcher.CHART_RANGES).get(chart_range, 10 ** 6)
+        days = sorted(d for d in self.bars.get(symbol, {}) if self.today - span < d <= self.today)
+        return chart_response(symbol, days, [self.bars[symbol][d] for d in days])
+
+    def client(self):
+        return price_fetcher.HttpChartClient(self.url, timeout=5)
+
+
+@pytest.fixture
+def chart_server():
+    server = ChartServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """Run in an empty directory, so the price store and exports land there"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
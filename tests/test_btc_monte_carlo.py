@@ -0,0 +1,73 @@
+"""Scenario inputs of the Monte Carlo fair value against fair_value_model's projections"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import btc_monte_carlo
+import fair_value_model
+import fair_value_scenarios
+
+SCENARIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'scenarios', 'high_dilution_2026.json')
+
+
+def test_path_inputs_match_the_scenario_projections():
+    scenario = fair_value_scenarios.load_scenario(SCENARIO)
+    quarter_ends, assumptions = btc_monte_carlo.scenario_assumptions(scenario)
+    assert quarter_ends == {quarter: prices['date'] for quarter, prices in scenario['btc_scenarios'].items()}
+    assert assumptions == scenario['assumptions']
+
+    state = scenario['current_state']
+    holdings, shares = btc_monte_carlo.projected_holdings(state['btc_holdings'], state['shares_outstanding'],
+                                                          len(quarter_ends), assumptions)
+    rows = [row for row in fair_value_scenarios.evaluate_scenario(scenario)['projections']
+            if row['btc_scenario'] == 'base']
+    assert np.allclose(holdings, [row['btc_holdings'] for row in rows])
+    assert np.allclose(shares, [row['shares_outstanding'] for row in rows])
+
+    # The broadcast fair value over (paths, quarters) equals the per-quarter projections
+    target = scenario['premium_targets'][1]
+    prices = np.array([[row['btc_price'] for row in rows]] * 3)
+    fair = fair_value_model.calculate_fair_value(
+        prices, holdings, shares, target['premium'],
+        software_value_per_share=assumptions['software_business_value_per_share'])['fair_price']
+    assert np.allclose(fair, [[row[f"{target['name']}_price"] for row in rows]] * 3)
+
+
+def btc_history(days=800):
+    """Daily random-walk BTC closes up to the scenario's current date, half Bull and half Bear"""
+    rng = np.random.default_rng(4)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2025-11-06') - pd.Timedelta('1D') * np.arange(days)[::-1],
+        'close_btc': 60_000 * np.exp(np.cumsum(rng.normal(0.001, 0.03, days))),
+        'regime_bull': np.arange(days) % 200 < 100,
+    })
+
+
+def test_seeded_simulation_starts_from_the_scenario_state(monkeypatch):
+    monkeypatch.setattr(btc_monte_carlo, 'btc_history', btc_history)
+    scenario = fair_value_scenarios.load_scenario(SCENARIO)
+    scenario['current_state'] = dict(scenario['current_state'], btc_holdings=700_000)
+
+    table = btc_monte_carlo.simulate(n_paths=500, method='regime', premium=1.8, seed=1, max_workers=1,
+                                     scenario=scenario)
+    again = btc_monte_carlo.simulate(n_paths=500, method='regime', premium=1.8, seed=1, max_workers=1,
+                                     scenario=scenario)
+    pd.testing.assert_frame_equal(table, again)
+
+    assert list(table.index) == list(scenario['btc_scenarios'])
+    assert table.shape == (len(scenario['btc_scenarios']), 1 + 2 * (len(btc_monte_carlo.QUANTILES) + 1))
+    assert table.attrs['btc_holdings'] == 700_000
+    for prefix in ['btc', 'fair_value']:
+        columns = [f'{prefix}_q{round(q * 100):02d}' for q in btc_monte_carlo.QUANTILES]
+        assert (np.diff(table[columns].to_numpy(), axis=1) > 0).all()
+
+    # Fair value is increasing in the BTC price, so its quantiles are those of the BTC price
+    holdings, shares = btc_monte_carlo.projected_holdings(700_000, scenario['current_state']['shares_outstanding'],
+                                                          len(table), scenario['assumptions'])
+    fair = fair_value_model.calculate_fair_value(
+        table['btc_q50'].to_numpy(), holdings, shares, 1.8,
+        software_value_per_share=scenario['assumptions']['software_business_value_per_share'])['fair_price']
+    assert np.allclose(table['fair_value_q50'], fair, rtol=2e-3)
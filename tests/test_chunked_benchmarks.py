@@ -0,0 +1,55 @@
+"""Chunked regime indicators and streamed benchmarks against the whole-frame results"""
+
+import numpy as np
+import pandas as pd
+
+import nav_benchmarks
+import regime
+from conftest import nav_frame
+
+# Hourly bars, long enough for the daily regime windows
+ROWS, FREQ = 9600, '1h'
+
+
+def chunks(frame, size):
+    return (frame.iloc[i:i + size].reset_index(drop=True) for i in range(0, len(frame), size))
+
+
+def test_regime_chunks_match_the_whole_frame():
+    frame = nav_frame(ROWS, FREQ)
+    windows = {'ma_fast': '5D', 'ma_slow': '20D', 'momentum': '3D', 'smooth': '12h'}
+    whole = regime.add_premium_trend(regime.add_regime_indicators(
+        frame, windows['ma_fast'], windows['ma_slow'], windows['momentum']), windows['smooth'])
+    chunked = pd.concat(regime.iter_regime_chunks(chunks(frame, 700), **windows), ignore_index=True)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_streamed_benchmarks_match_the_exact_ones():
+    frame = nav_frame(ROWS, FREQ)
+    exact = nav_benchmarks.compute_benchmarks(frame)
+    streamed = nav_benchmarks.stream_benchmarks(regime.iter_regime_chunks(chunks(frame, 500)))
+
+    for key in ['historical_mean', 'bull_market_mean', 'bear_market_mean', 'current',
+                'historical_min', 'historical_max']:
+        assert np.isclose(streamed[key], exact[key], rtol=1e-12)
+    for key in ['historical_median', 'bull_market_median', 'bear_market_median', 'historical_q05',
+                'historical_q95']:
+        assert np.isclose(streamed[key], exact[key], rtol=2e-3)
+    assert streamed['as_of'] == exact['as_of']
+    assert streamed['btc_price_buckets'].keys() == exact['btc_price_buckets'].keys()
+    for label, row in exact['btc_price_buckets'].items():
+        assert streamed['btc_price_buckets'][label]['days'] == row['days']
+
+
+def test_current_is_the_latest_premium_even_without_a_trend():
+    frame = nav_frame(ROWS, FREQ)
+    # An all-null bar leaves the next bar without a premium derivative
+    frame.loc[len(frame) - 2, ['close_btc', 'nav_premium']] = np.nan
+    frame.loc[len(frame) - 1, 'date'] += pd.Timedelta('1D')
+    assert nav_benchmarks.benchmark_frame(frame).index[-1] == len(frame) - 3
+
+    exact = nav_benchmarks.compute_benchmarks(frame)
+    streamed = nav_benchmarks.stream_benchmarks(regime.iter_regime_chunks(chunks(frame, 500)))
+    for benchmarks in (exact, streamed):
+        assert benchmarks['current'] == frame['nav_premium'].iloc[-1]
+        assert benchmarks['as_of'] == str(frame['date'].iloc[-1].date())
@@ -0,0 +1,15 @@
+"""Where fair_value_model.py writes a scenario's projections"""
+
+import os
+
+import fair_value_model
+import fair_value_scenarios
+
+
+def test_only_the_default_scenario_writes_the_committed_projections():
+    default = fair_value_scenarios.DEFAULT_SCENARIO
+    assert fair_value_model.projections_path(default, 'base_2026') == fair_value_model.PROJECTIONS_FILE
+    assert fair_value_model.projections_path(os.path.abspath(default), 'base_2026') == \
+        fair_value_model.PROJECTIONS_FILE
+    assert fair_value_model.projections_path('scenarios/high_dilution_2026.json', 'high_dilution_2026') == \
+        'fair_value_projections_high_dilution_2026.json'
@@ -0,0 +1,122 @@
+"""FairValueService queries, input validation and the JSON-lines / HTTP framing"""
+
+import asyncio
+import http.client
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import fair_value_server
+from conftest import nav_frame
+
+# 1,000 BTC and 1,000 shares: the BTC NAV per share is the BTC price
+HOLDINGS = 1000.0
+SHARES = 1000.0
+
+
+@pytest.fixture(scope='module')
+def service():
+    frame = nav_frame(400, '1D', seed=3, btc_sigma=0.03, premium_sigma=0.02,
+                      cumulative_btc_holdings=HOLDINGS, shares_outstanding=SHARES)
+    return fair_value_server.FairValueService(frame, {'historical_median': 1.5, 'bear_market_mean': np.nan},
+                                              software_value_per_share=15.0)
+
+
+@pytest.fixture
+def address(service):
+    """Serve on an ephemeral TCP port from a background event loop"""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(fair_value_server.serve(service, port=0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server.sockets[0].getsockname()[:2]
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def strict_json(data):
+    def reject(name):
+        raise AssertionError(f"{name} in response")
+    return json.loads(data, parse_constant=reject)
+
+
+def test_fair_value_and_percentile(service):
+    result = service.handle({'op': 'fair_value', 'btc_price': [100_000, 200_000], 'nav_premium': 1.5})
+    assert result['fair_price'] == [150_015.0, 300_015.0]
+    assert result['software_component'] == 15.0
+
+    result = service.handle({'btc_price': 100_000, 'nav_premium': 'historical_median', 'include_software': False})
+    assert result['fair_price'] == 150_000.0 and result['software_component'] == 0
+
+    median = service.handle({'op': 'fair_value', 'btc_price': 100_000, 'percentile': 50})['nav_premium']
+    assert np.isclose(median, np.median(service.premiums['all']))
+    assert service.handle({'op': 'percentile', 'nav_premium': median})['percentile'] == 50.0
+    # An MSTR price implies the premium through the default holdings and shares
+    implied = service.handle({'op': 'percentile', 'mstr_price': median * 100_000, 'btc_price': 100_000})
+    assert np.isclose(implied['nav_premium'], median)
+
+
+def test_batches_answer_each_query(service):
+    results = service.handle([{'op': 'state'}, {'op': 'nope'}, {'nav_premium': 1.5}])
+    assert results[0]['btc_holdings'] == HOLDINGS
+    assert results[1]['error'].startswith('Unknown op')
+    assert 'fair_price' in results[2]
+
+
+@pytest.mark.parametrize('query, error', [
+    ({'nav_premium': float('nan')}, "'nav_premium' must be finite"),
+    ({'nav_premium': 1.5, 'btc_price': [1e5, float('inf')]}, "'btc_price' must be finite"),
+    ({'nav_premium': 1.5, 'shares_outstanding': 0}, "'shares_outstanding' must be positive"),
+    ({'nav_premium': 1.5, 'btc_holdings': -1}, "'btc_holdings' must be positive"),
+    ({'nav_premium': 1.5, 'software_value_per_share': 'nan'}, "'software_value_per_share' must be finite"),
+    ({'nav_premium': 'bear_market_mean'}, "'nav_premium' must be finite"),
+    ({'percentile': 'nan'}, "'percentile' must be finite"),
+    ({'nav_premium': 1.5, 'include_software': 'no'}, "'include_software' must be true or false"),
+    ({'op': 'percentile', 'nav_premium': float('nan')}, "'nav_premium' must be finite"),
+    ({'op': 'percentile', 'mstr_price': 0}, "'mstr_price' must be positive"),
+])
+def test_invalid_inputs_are_rejected(service, query, error):
+    assert service.handle(query) == {'error': error}
+
+
+def test_responses_are_strict_json(service):
+    assert strict_json(service.handle_bytes(b'{"nav_premium": NaN}'))['error'].startswith('Invalid JSON')
+    # The NaN benchmark cannot be written, so the whole response becomes an error
+    assert strict_json(service.handle_bytes(b'{"op": "benchmarks"}')) == {'error': 'The result is not finite'}
+    assert strict_json(service.handle_bytes(b'{"nav_premium": 1.5}'))['fair_price'] > 0
+
+
+def test_json_lines_over_tcp(address):
+    client = fair_value_server.FairValueClient('%s:%d' % address)
+    try:
+        assert client.query('fair_value', btc_price=100_000, nav_premium=1.5)['fair_price'] == 150_015.0
+        results = client.batch([{'op': 'percentile', 'nav_premium': 1e9}, {'op': 'fair_value'}])
+        assert results[0]['percentile'] == 100.0
+        assert 'Give exactly one' in results[1]['error']
+        assert client.query('stats')['ticks'] >= 2
+    finally:
+        client.close()
+
+
+def test_http_keep_alive(address):
+    connection = http.client.HTTPConnection(*address)
+    try:
+        connection.request('POST', '/query', body=json.dumps({'btc_price': 100_000, 'nav_premium': 1.5}))
+        response = connection.getresponse()
+        assert response.status == 200 and strict_json(response.read())['fair_price'] == 150_015.0
+
+        # Same connection
+        connection.request('GET', '/state')
+        response = connection.getresponse()
+        assert response.status == 200 and strict_json(response.read())['shares_outstanding'] == SHARES
+
+        connection.request('GET', '/missing', headers={'Connection': 'close'})
+        response = connection.getresponse()
+        assert response.status == 404 and 'No route' in strict_json(response.read())['error']
+    finally:
+        connection.close()
@@ -0,0 +1,103 @@
+"""LiveMonitor fed from a tick file and from the stand-in tick server"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+import asof_join
+import fair_value_model
+import live_monitor
+import live_nav
+import nav_benchmarks
+
+START = pd.Timestamp('2025-01-01')
+# 1,000 BTC and 1,000 shares: the NAV premium is the MSTR / BTC price ratio
+BTC_PRICE = 100.0
+PREMIUMS = [1.60, 1.71, 1.69, 1.73, 1.71, 1.69, 1.67, 1.75]
+
+
+def calculator():
+    holdings = asof_join.HoldingsTable([START - pd.Timedelta('30D')], [1000.0], [50.0])
+    shares = asof_join.ShareTable([START - pd.Timedelta('30D')], [1000.0])
+    return live_nav.LiveNavCalculator(holdings, shares)
+
+
+def monitor(**kwargs):
+    kwargs.setdefault('fair_value_premium', 1.8)
+    kwargs.setdefault('software_value_per_share', 15)
+    return live_monitor.LiveMonitor(calculator(), thresholds=[1.7], **kwargs)
+
+
+def write_ticks(path, premiums=PREMIUMS):
+    """One BTC and one MSTR tick per daily bar"""
+    ticks = []
+    for day, premium in enumerate(premiums):
+        t = (START + pd.Timedelta(days=day)).value
+        ticks.append(live_monitor.Tick(live_monitor.BTC_SYMBOL, t, BTC_PRICE))
+        ticks.append(live_monitor.Tick(live_monitor.MSTR_SYMBOL, t, BTC_PRICE * premium))
+    path.write_text(''.join(live_monitor.format_tick(tick) + '\n' for tick in ticks))
+    return path
+
+
+async def run(monitor, feed):
+    queue = monitor.subscribe(maxsize=10_000)
+    await monitor.run(feed)
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait())
+    return messages
+
+
+def alerts(messages):
+    return [(m['date'], m['direction']) for m in messages if m['type'] == 'alert']
+
+
+def day(n):
+    return START + pd.Timedelta(days=n)
+
+
+def test_dead_band_suppresses_alerts_around_the_threshold(tmp_path):
+    messages = asyncio.run(run(monitor(dead_band=0.02), live_monitor.FileFeed(write_ticks(tmp_path / 'ticks.jsonl'))))
+    # 1.71 and 1.69 stay inside the band; 1.73, 1.67 and 1.75 clear it
+    assert alerts(messages) == [(day(3), 'above'), (day(6), 'below'), (day(7), 'above')]
+    assert messages[-1]['type'] == 'end' and messages[-1]['latency']['ticks'] == 2 * len(PREMIUMS)
+
+
+def test_without_dead_band_every_crossing_alerts(tmp_path):
+    messages = asyncio.run(run(monitor(dead_band=0), live_monitor.FileFeed(write_ticks(tmp_path / 'ticks.jsonl'))))
+    assert [direction for _, direction in alerts(messages)] == ['above', 'below', 'above', 'below', 'above']
+
+
+def test_socket_feed_from_the_stand_in_server(tmp_path):
+    path = write_ticks(tmp_path / 'ticks.jsonl')
+
+    async def main():
+        server = await live_monitor.serve_ticks(live_monitor.FileFeed(path), port=0)
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            return await run(monitor(), live_monitor.SocketFeed(host, port))
+
+    messages = asyncio.run(main())
+    snapshots = [m for m in messages if m['type'] == 'snapshot']
+    assert len(snapshots) == 2 * len(PREMIUMS)
+    assert np.isclose(snapshots[-1]['nav_premium'], PREMIUMS[-1])
+    # BTC NAV per share is 100: fair value 100 x 1.8 + 15
+    assert np.isclose(snapshots[-1]['fair_value'], 195.0)
+    assert alerts(messages) == [(day(3), 'above'), (day(6), 'below'), (day(7), 'above')]
+
+
+def test_late_ticks_are_skipped():
+    m = monitor()
+    t0, t1 = day(0).value, day(1).value
+    m.process(live_monitor.Tick(live_monitor.MSTR_SYMBOL, t1, 170.0))
+    m.process(live_monitor.Tick(live_monitor.BTC_SYMBOL, t1, BTC_PRICE))
+    assert m.process(live_monitor.Tick(live_monitor.BTC_SYMBOL, t0, BTC_PRICE)) is None
+    assert m.late_ticks == 1
+
+
+def test_fair_value_defaults_come_from_benchmarks_and_the_model(monkeypatch):
+    monkeypatch.setattr(nav_benchmarks, 'load_benchmarks', lambda: {'historical_median': 1.9})
+    m = live_monitor.LiveMonitor(calculator())
+    assert m.fair_value_premium == 1.9
+    assert m.software_value_per_share == fair_value_model.SOFTWARE_BUSINESS_VALUE_PER_SHARE
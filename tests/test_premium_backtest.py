@@ -0,0 +1,47 @@
+"""Walk-forward premium ranks and position timing in premium_backtest"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import premium_backtest
+
+
+@pytest.mark.parametrize('chunk_cells', [1000, premium_backtest.CHUNK_CELLS])
+def test_ranks_match_a_brute_force_trailing_window(chunk_cells):
+    rng = np.random.default_rng(6)
+    # Rounded, so that ties (which do not count as lower) occur
+    premium = np.round(rng.uniform(1.0, 3.0, 150), 1)
+    lookbacks = [0, 1, 5, 20, 60]
+    ranks, valid = premium_backtest.premium_ranks(premium, lookbacks, min_history=10, chunk_cells=chunk_cells)
+
+    for i, lookback in enumerate(lookbacks):
+        for t in range(len(premium)):
+            window = premium[:t] if lookback == 0 else premium[max(t - lookback, 0):t]
+            complete = t >= (10 if lookback == 0 else lookback)
+            assert valid[i, t] == complete, (lookback, t)
+            if complete:
+                assert ranks[i, t] == (window < premium[t]).sum() / len(window), (lookback, t)
+
+
+def test_position_set_at_close_earns_the_next_day():
+    days = 200
+    # The premium falls on odd days, so a 1-day lookback holds MSTR from each
+    # odd close; MSTR gains 10% on even days and loses 5% on odd days
+    mstr_return = np.where(np.arange(days) % 2 == 0, 0.10, -0.05)
+    mstr_return[0] = 0.0
+    frame = pd.DataFrame({
+        'date': pd.Timestamp('2024-01-01') + pd.Timedelta('1D') * np.arange(days),
+        'close_btc': 50_000.0,
+        'close_mstr': 100 * np.cumprod(1 + mstr_return),
+        'nav_premium': np.where(np.arange(days) % 2 == 0, 1.0, 0.9),
+    })
+    table = premium_backtest.backtest(frame, lookbacks=[1], thresholds=[0.5], costs_bps=[0])
+    row = table.iloc[0]
+
+    assert table.attrs['start'] == '2024-01-02' and table.attrs['days'] == days - 2
+    assert np.isclose(row['time_in_mstr'], 0.5)
+    # Every day in MSTR is an up day and every other day is flat BTC
+    assert row['max_drawdown'] == 0
+    years = (days - 2) / 365.25
+    assert np.isclose(row['cagr'], 1.1 ** ((days - 2) / 2 / years) - 1)
@@ -0,0 +1,23 @@
+"""Regime-conditioned premium parameters in premium_simulator"""
+
+import numpy as np
+import pandas as pd
+
+import premium_simulator
+
+
+def test_oscillating_premium_still_gives_finite_parameters():
+    rng = np.random.default_rng(5)
+    days = 800
+    # The log premium flips sign every day, so its AR(1) slope is negative
+    frame = pd.DataFrame({
+        'date': pd.Timestamp('2023-01-01') + pd.Timedelta('1D') * np.arange(days),
+        'close_btc': 30_000 * np.exp(np.cumsum(rng.normal(0, 0.03, days))),
+        'nav_premium': np.exp(0.2 * (-1.0) ** np.arange(days) + rng.normal(0, 0.01, days)),
+        'cumulative_btc_holdings': 1000.0,
+        'shares_outstanding': 1000.0,
+    })
+    params = premium_simulator.fit_params(frame)
+    for name in ['premium_mean', 'premium_theta', 'premium_sigma', 'rho']:
+        assert np.isfinite(params[name]).all(), name
+    assert (params['premium_theta'] > 0).all()
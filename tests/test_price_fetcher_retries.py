@@ -0,0 +1,89 @@
+"""Retries, backoff and bounded concurrency against the stand-in chart server"""
+
+import time
+import types
+import urllib.error
+
+import pytest
+
+import price_fetcher
+
+START = 19_000  # epoch days
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping, with jitter pinned to its upper bound"""
+    delays = []
+    monkeypatch.setattr(price_fetcher, 'time', types.SimpleNamespace(sleep=delays.append, time=time.time))
+    monkeypatch.setattr(price_fetcher.random, 'uniform', lambda lo, hi: hi)
+    return delays
+
+
+def serve_bars(server, *symbols):
+    for symbol in symbols:
+        server.bars[symbol] = {START + i: 10.0 + i for i in range(5)}
+    server.today = START + 4
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_retries_transient_errors_with_exponential_backoff(chart_server, store_dir, sleeps, status):
+    serve_bars(chart_server, 'TEST')
+    chart_server.failures['TEST'] = [status, status, status]
+
+    metadata = price_fetcher.fetch_symbol('TEST', client=chart_server.client(), export=False, retries=4,
+                                          backoff=0.5, log=lambda m: None)
+    assert metadata['data_points'] == 5
+    assert len(chart_server.requests) == 4
+    assert sleeps == [0.5, 1.0, 2.0]
+
+
+def test_backoff_is_capped(sleeps):
+    attempts = []
+
+    def fail():
+        attempts.append(1)
+        raise urllib.error.HTTPError('url', 503, 'Service Unavailable', None, None)
+
+    with pytest.raises(urllib.error.HTTPError):
+        price_fetcher.call_with_retries(fail, retries=5, backoff=1.0, max_backoff=3.0, log=lambda m: None)
+    assert len(attempts) == 6
+    assert sleeps == [1.0, 2.0, 3.0, 3.0, 3.0]
+
+
+def test_gives_up_after_the_last_retry(chart_server, store_dir, sleeps):
+    serve_bars(chart_server, 'TEST')
+    chart_server.failures['TEST'] = [503] * 10
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        price_fetcher.fetch_symbol('TEST', client=chart_server.client(), export=False, retries=2,
+                                   log=lambda m: None)
+    assert error.value.code == 503
+    assert len(chart_server.requests) == 3
+
+
+@pytest.mark.parametrize('status', [400, 403, 404])
+def test_fails_fast_on_other_client_errors(chart_server, store_dir, sleeps, status):
+    serve_bars(chart_server, 'TEST')
+    chart_server.failures['TEST'] = [status]
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        price_fetcher.fetch_symbol('TEST', client=chart_server.client(), export=False, retries=4,
+                                   log=lambda m: None)
+    assert error.value.code == status
+    assert len(chart_server.requests) == 1
+    assert sleeps == []
+
+
+def test_fetch_symbols_bounds_concurrency(chart_server, store_dir, sleeps):
+    symbols = [f"SYM{i}" for i in range(8)]
+    serve_bars(chart_server, *symbols)
+    chart_server.failures['SYM3'] = [404]
+    chart_server.delay = 0.1
+
+    results = price_fetcher.fetch_symbols(symbols, client=chart_server.client(), max_workers=3, retries=0)
+
+    assert chart_server.max_in_flight == 3
+    assert len(chart_server.requests) == len(symbols)
+    assert isinstance(results['SYM3'], urllib.error.HTTPError)
+    assert all(results[s]['data_points'] == 5 for s in symbols if s != 'SYM3')
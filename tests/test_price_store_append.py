@@ -0,0 +1,99 @@
+"""Incremental fetches and appends against the stand-in chart server"""
+
+import numpy as np
+import pytest
+
+import price_fetcher
+import price_store
+from conftest import chart_response
+
+START = 19_000  # epoch days
+
+
+def stored(symbol):
+    return {name: np.array(values) for name, values in price_store.open_series(symbol).items()}
+
+
+def test_incremental_gap_fetch_dedupes_overlap_and_replaces_last_bar(chart_server, store_dir):
+    chart_server.bars['TEST'] = {START + i: 100.0 + i for i in range(90)}
+    chart_server.today = START + 89
+    client = chart_server.client()
+
+    price_fetcher.fetch_symbol('TEST', client=client, incremental=True, export=False, log=lambda m: None)
+    assert chart_server.requests[-1][2] == price_fetcher.FULL_RANGE
+    assert price_store.read_meta('TEST')['length'] == 90
+
+    # Ten more days; the last stored bar was still open and has since changed
+    chart_server.bars['TEST'].update({START + i: 100.0 + i for i in range(90, 100)})
+    chart_server.bars['TEST'][START + 89] = 500.0
+    chart_server.today = START + 99
+    price_fetcher.fetch_symbol('TEST', client=client, incremental=True, export=False, today=START + 99,
+                               log=lambda m: None)
+
+    # An 11-day gap (including the refetched last bar) needs only the 1mo range,
+    # which overlaps 20 stored bars
+    assert chart_server.requests[-1][2] == '1mo'
+    columns = stored('TEST')
+    assert list(columns['date']) == list(range(START, START + 100))
+    expected = [100.0 + i for i in range(100)]
+    expected[89] = 500.0
+    assert list(columns['close']) == expected
+
+
+def test_replay_client_full_fetch(store_dir):
+    client = price_fetcher.ReplayClient({'TEST': chart_response('TEST', [START, START + 1], [1.0, 2.0])})
+    metadata = price_fetcher.fetch_symbol('TEST', client=client, export=False, log=lambda m: None)
+    assert client.calls == [('TEST', '1d', price_fetcher.FULL_RANGE)]
+    assert metadata['data_points'] == 2
+    assert list(stored('TEST')['close']) == [1.0, 2.0]
+
+
+def test_append_sorts_and_dedupes_incoming_batch(store_dir):
+    price_store.write_series('TEST', {'date': [1, 2, 3], 'close': [1.0, 2.0, 3.0]})
+    price_store.append_series('TEST', {'date': [5, 3, 4, 5, 2], 'close': [50.0, 30.0, 40.0, 55.0, 20.0]})
+    columns = stored('TEST')
+    # Rows before the last stored bar are dropped, the last bar replaced and
+    # the later duplicate of day 5 wins
+    assert list(columns['date']) == [1, 2, 3, 4, 5]
+    assert list(columns['close']) == [1.0, 2.0, 30.0, 40.0, 55.0]
+
+
+def test_interrupted_replacement_never_exposes_mixed_rows(store_dir, monkeypatch):
+    price_store.write_series('TEST', {'date': [1, 2, 3], 'open': [1.0, 2.0, 3.0], 'close': [1.0, 2.0, 3.0]})
+    write_rows = price_store._write_rows
+    calls = []
+
+    def crash_while_moving(symbol, columns, start, root=price_store.STORE_DIR, interval='1d'):
+        calls.append(start)
+        if len(calls) == 2:
+            # Move half the columns into place, then die
+            first = dict(list(columns.items())[:1])
+            write_rows(symbol, first, start, root, interval)
+            raise KeyboardInterrupt
+        return write_rows(symbol, columns, start, root, interval)
+
+    monkeypatch.setattr(price_store, '_write_rows', crash_while_moving)
+    with pytest.raises(KeyboardInterrupt):
+        price_store.append_series('TEST', {'date': [3, 4], 'open': [30.0, 40.0], 'close': [31.0, 41.0]})
+    monkeypatch.setattr(price_store, '_write_rows', write_rows)
+
+    # The half-replaced last bar is hidden; everything visible is the old data
+    columns = stored('TEST')
+    assert list(columns['date']) == [1, 2]
+    assert list(columns['open']) == [1.0, 2.0] and list(columns['close']) == [1.0, 2.0]
+
+    # The next append completes the pending replacement first
+    price_store.append_series('TEST', {'date': [5], 'open': [50.0], 'close': [51.0]})
+    columns = stored('TEST')
+    assert list(columns['date']) == [1, 2, 3, 4, 5]
+    assert list(columns['open']) == [1.0, 2.0, 30.0, 40.0, 50.0]
+    assert list(columns['close']) == [1.0, 2.0, 31.0, 41.0, 51.0]
+    assert 'pending' not in price_store.read_meta('TEST')
+
+
+@pytest.mark.parametrize('gmtoffset', [9 * 3600, -5 * 3600])
+def test_daily_bars_are_dated_in_the_exchange_time_zone(gmtoffset):
+    # Local midnight in Tokyo is 15:00 UTC on the previous day
+    meta, columns = price_fetcher.parse_chart(chart_response('3350.T', [START, START + 1], [1.0, 2.0], gmtoffset))
+    assert meta['gmtoffset'] == gmtoffset
+    assert list(columns['date']) == [START, START + 1]
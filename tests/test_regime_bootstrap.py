@@ -0,0 +1,40 @@
+"""Degenerate inputs and method selection in regime_bootstrap"""
+
+import numpy as np
+import pytest
+
+import regime_bootstrap
+
+
+def series(n=400):
+    rng = np.random.default_rng(2)
+    bull = np.repeat([True, False], n // 2)
+    return bull, {'premium': np.where(bull, 2.0, 1.5) + rng.normal(0, 0.1, n)}
+
+
+@pytest.mark.parametrize('bull', [[], [True], [True, True, True], [False, False]])
+def test_one_sided_or_tiny_samples_are_rejected(bull):
+    bull = np.array(bull, dtype=bool)
+    values = {'premium': np.ones(len(bull))}
+    with pytest.raises(ValueError, match='both Bull and Bear'):
+        regime_bootstrap.summarize(bull, values, n_resamples=10)
+
+
+def test_two_rows_are_enough_for_a_shift_test():
+    result = regime_bootstrap.permutation_test(np.array([True, False]), {'premium': np.array([2.0, 1.0])},
+                                               n_permutations=10)
+    # The only shift swaps the labels
+    assert np.all(result['premium']['null'] == -1.0)
+
+
+@pytest.mark.parametrize('permutation', ['shift', 'block'])
+def test_summarize_uses_the_requested_permutation(permutation, monkeypatch):
+    used = []
+    permuter = regime_bootstrap.PERMUTERS[permutation]
+    monkeypatch.setitem(regime_bootstrap.PERMUTERS, permutation,
+                        lambda *args: used.append(permutation) or permuter(*args))
+    bull, values = series()
+    table = regime_bootstrap.summarize(bull, values, n_resamples=200, permutation=permutation)
+    assert used and set(used) == {permutation}
+    assert np.isclose(table.loc['diff_premium', 'observed'], 0.5, atol=0.05)
+    assert table.loc['diff_premium', 'p_value'] < 0.05
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+NAV premium panel across bitcoin-treasury companies
+
+Each company in treasury_companies.json has its own price series in the
+price store, holdings events and share-count table (same layouts as the
+MSTR files). The BTC series is loaded once and handed to a pool of worker
+processes; each worker builds one company's NAV frame through
+nav_data.load_nav_frame(), so per-company caching works as for MSTR.
+
+    python treasury_nav.py                     every configured company
+    python treasury_nav.py MSTR --workers 4 --interval 1d
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import nav_data
+
+COMPANIES_FILE = 'treasury_companies.json'
+
+# Columns kept in the long panel; each company's close becomes close_stock
+PANEL_COLUMNS = ['date', 'symbol', 'close_btc', 'close_stock', 'cumulative_btc_holdings',
+                 'shares_outstanding', 'market_cap_millions', 'btc_nav_millions', 'nav_premium']
+
+
+def load_companies(path=COMPANIES_FILE):
+    """Company configs: [{'symbol', 'name', 'holdings', 'shares'}, ...]"""
+    with open(path, 'r') as f:
+        return json.load(f)['companies']
+
+
+# ============================================================================
+# WORKERS
+# ============================================================================
+
+# BTC series shared by every task in a worker process (set by _init_worker)
+_btc_df = None
+
+
+def _init_worker(btc_df):
+    global _btc_df
+    _btc_df = btc_df
+
+
+def build_company(company, interval='1d', use_cache=True, interpolate_shares=False):
+    """One company's NAV frame in the panel layout"""
+    symbol = company['symbol']
+    frame = nav_data.load_nav_frame(use_cache=use_cache, holdings_path=company['holdings'],
+                                    shares_path=company['shares'], interpolate_shares=interpolate_shares,
+                                    interval=interval, symbol=symbol, btc_df=_btc_df)
+    frame = frame.rename(columns={nav_data.stock_close_column(symbol): 'close_stock'})
+    frame.insert(1, 'symbol', symbol)
+    return frame[PANEL_COLUMNS]
+
+
+def _build_company_safe(args):
+    try:
+        return build_company(*args)
+    except Exception as e:
+        return e
+
+
+# ============================================================================
+# PANEL
+# ============================================================================
+
+def build_panel(companies=None, interval='1d', max_workers=None, use_cache=True, interpolate_shares=False):
+    """
+    Build every company's NAV frame in parallel
+
+    Returns (panel, errors): the long panel frame (one row per date and
+    company, sorted by date then symbol) and {symbol: exception} for the
+    companies that could not be built, e.g. because their price series or
+    holdings file is missing.
+    """
+    companies = companies if companies is not None else load_companies()
+    btc_df = nav_data.load_prices(nav_data.BTC_SYMBOL, interval)[['date', 'close']]
+    tasks = [(company, interval, use_cache, interpolate_shares) for company in companies]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks)) or 1
+    if max_workers == 1:
+        _init_worker(btc_df)
+        results = [_build_company_safe(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(btc_df,)) as pool:
+            results = list(pool.map(_build_company_safe, tasks))
+
+    frames = []
+    errors = {}
+    for company, result in zip(companies, results):
+        if isinstance(result, Exception):
+            errors[company['symbol']] = result
+        else:
+            frames.append(result)
+
+    if frames:
+        panel = pd.concat(frames, ignore_index=True).sort_values(['date', 'symbol'], kind='stable')
+        panel = panel.reset_index(drop=True)
+    else:
+        panel = pd.DataFrame(columns=PANEL_COLUMNS)
+    return panel, errors
+
+
+def premium_panel(panel, column='nav_premium'):
+    """Wide date x symbol frame of one panel column"""
+    return panel.pivot(index='date', columns='symbol', values=column)
+
+
+def summarize(panel):
+    """Per-company premium statistics and the latest value"""
+    grouped = panel.groupby('symbol')
+    return pd.DataFrame({
+        'first_date': grouped['date'].min(),
+        'last_date': grouped['date'].max(),
+        'rows': grouped.size(),
+        'latest_premium': grouped['nav_premium'].last(),
+        'mean_premium': grouped['nav_premium'].mean(),
+        'median_premium': grouped['nav_premium'].median(),
+        'min_premium': grouped['nav_premium'].min(),
+        'max_premium': grouped['nav_premium'].max(),
+    })
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {'--workers': None, '--interval': '1d'}
+    symbols = []
+    i = 0
+    while i < len(args):
+        if args[i] in options:
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            symbols.append(args[i])
+            i += 1
+
+    companies = load_companies()
+    if symbols:
+        companies = [c for c in companies if c['symbol'] in symbols]
+
+    start = time.perf_counter()
+    panel, errors = build_panel(companies, interval=options['--interval'],
+                                max_workers=int(options['--workers']) if options['--workers'] else None)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nNAV premium panel: {len(panel)} rows, {panel['symbol'].nunique()} companies "
+          f"in {elapsed:.1f}s")
+    if len(panel):
+        with pd.option_context('display.width', 200, 'display.max_columns', None,
+                               'display.float_format', '{:.3f}'.format):
+            print(summarize(panel))
+    for symbol, error in errors.items():
+        print(f"{symbol}: failed ({error})")
+    sys.exit(1 if errors else 0)
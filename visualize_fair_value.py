@@ -11,6 +11,10 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+import fair_value_grid
+import fair_value_scenarios
+import fair_value_sensitivity
+
 # Set style
 plt.style.use('dark_background')
 sns.set_palette("husl")
@@ -177,6 +181,45 @@ plt.savefig('fair_value_2026_all_scenarios.png', dpi=300, facecolor='#0a0a0a', e
 print("Saved: fair_value_2026_all_scenarios.png")
 plt.close()
 
+# ============================================================================
+# SENSITIVITY GRID (see fair_value_sensitivity.py)
+# ============================================================================
+
+# The grid covers the scenario's premium target and growth assumptions;
+# the heatmaps also read it at the scenario BTC prices, while the tornado
+# summarizes the evenly spaced BTC prices
+state = results['current_state']
+assumptions = results['assumptions']
+# Projections written before premium targets were saved used the default scenario's
+premium_targets = results.get('premium_targets') or \
+    fair_value_scenarios.load_scenario(fair_value_scenarios.DEFAULT_SCENARIO)['premium_targets']
+fair_value_premium = next(t['premium'] for t in premium_targets if t['name'] == 'fair_value')
+
+
+def with_values(coords, values):
+    """Grid coordinates plus any of `values` not already on them"""
+    values = np.atleast_1d(values)
+    missing = [v for v in values if not np.isclose(coords, v).any()]
+    return np.union1d(coords, missing) if missing else coords
+
+
+sensitivity_args = dict(
+    btc_price=np.arange(50_000, 250_001, 2_000),
+    nav_premium=with_values(np.round(np.arange(1.0, 3.01, 0.1), 2), fair_value_premium),
+    holdings_growth=with_values(np.linspace(0, 0.06, 7), assumptions['btc_holdings_growth_quarterly']),
+    dilution=with_values(np.linspace(0, 0.04, 5), assumptions['shares_dilution_quarterly']),
+    horizon=np.arange(1, 5),
+    btc_holdings=state['btc_holdings'],
+    shares_outstanding=state['shares_outstanding'],
+    software_value_per_share=assumptions['software_business_value_per_share'],
+)
+sensitivity = fair_value_sensitivity.sensitivities(
+    **dict(sensitivity_args, btc_price=with_values(sensitivity_args['btc_price'], projections['btc_price'])))
+tornado = fair_value_sensitivity.tornado(**sensitivity_args)
+tornado_scenarios = int(np.prod([np.size(sensitivity_args[dim]) for dim in fair_value_grid.DIMS]))
+base_labels = dict(holdings_growth=assumptions['btc_holdings_growth_quarterly'],
+                   dilution=assumptions['shares_dilution_quarterly'])
+
 # ============================================================================
 # VISUALIZATION 4: Price Range Heatmap
 # ============================================================================
@@ -187,14 +230,16 @@ fig, ax = plt.subplots(figsize=(14, 10))
 quarters_list = ['Q1_2026', 'Q2_2026', 'Q3_2026', 'Q4_2026']
 scenarios_list = ['bear', 'base', 'bull', 'moon']
 
-# Use fair value prices for heatmap
+# Fair value prices at the fair-value premium, read from the sensitivity grid
+# (horizon x BTC price) at each quarter's scenario BTC price
+fair_table = sensitivity['fair_price'].table('horizon', 'btc_price', nav_premium=fair_value_premium, **base_labels)
 matrix = []
-for quarter in quarters_list:
+for horizon, quarter in enumerate(quarters_list, start=1):
     row = []
     for scenario in scenarios_list:
-        price = projections[(projections['quarter'] == quarter) & 
-                          (projections['btc_scenario'] == scenario)]['fair_value_price'].iloc[0]
-        row.append(price)
+        btc_price = projections[(projections['quarter'] == quarter) &
+                                (projections['btc_scenario'] == scenario)]['btc_price'].iloc[0]
+        row.append(fair_table.loc[horizon, btc_price])
     matrix.append(row)
 
 matrix = np.array(matrix)
@@ -222,7 +267,7 @@ cbar.set_label('Fair Value Price ($)', rotation=270, labelpad=25, fontsize=12, w
 
 ax.set_xlabel('BTC Price Scenario', fontsize=13, weight='bold')
 ax.set_ylabel('Quarter', fontsize=13, weight='bold')
-ax.set_title('MicroStrategy Fair Value Heatmap - 2026 (1.8x NAV Premium)', 
+ax.set_title(f'MicroStrategy Fair Value Heatmap - 2026 ({fair_value_premium:.1f}x NAV Premium)', 
             fontsize=16, weight='bold', pad=20)
 
 ax.set_facecolor('#1a1a1a')
@@ -233,4 +278,88 @@ plt.savefig('fair_value_heatmap.png', dpi=300, facecolor='#0a0a0a', edgecolor='n
 print("Saved: fair_value_heatmap.png")
 plt.close()
 
+# ============================================================================
+# VISUALIZATION 5: Premium Sensitivity Heatmap
+# ============================================================================
+
+# A separate chart from the fair value heatmap: it shows how much a +0.1x
+# premium move is worth at each BTC price, not the fair value level
+
+fig, ax = plt.subplots(figsize=(14, 10))
+
+# Dollar change in fair value per +0.1x of NAV premium
+premium_slope = sensitivity['derivative']['nav_premium'].table('horizon', 'btc_price',
+                                                                nav_premium=fair_value_premium, **base_labels) * 0.1
+premium_slope = premium_slope.loc[:, premium_slope.columns % 50_000 == 0]
+matrix = premium_slope.to_numpy()
+
+im = ax.imshow(matrix, cmap='RdYlGn', aspect='auto', alpha=0.8)
+
+ax.set_xticks(np.arange(matrix.shape[1]))
+ax.set_yticks(np.arange(matrix.shape[0]))
+ax.set_xticklabels([f'${p / 1000:.0f}k' for p in premium_slope.columns], fontsize=12)
+ax.set_yticklabels(quarter_labels, fontsize=12)
+
+for i in range(matrix.shape[0]):
+    for j in range(matrix.shape[1]):
+        ax.text(j, i, f'${matrix[i, j]:.0f}',
+                ha="center", va="center", color="white",
+                fontsize=11, weight='bold',
+                bbox=dict(boxstyle='round', facecolor='black', alpha=0.5))
+
+cbar = plt.colorbar(im, ax=ax, pad=0.02)
+cbar.set_label('Fair Value Change per +0.1x Premium ($)', rotation=270, labelpad=25, fontsize=12, weight='bold')
+
+ax.set_xlabel('BTC Price', fontsize=13, weight='bold')
+ax.set_ylabel('Quarter', fontsize=13, weight='bold')
+ax.set_title('MicroStrategy Fair Value Sensitivity to NAV Premium - 2026', 
+            fontsize=16, weight='bold', pad=20)
+
+ax.set_facecolor('#1a1a1a')
+fig.patch.set_facecolor('#0a0a0a')
+
+plt.tight_layout()
+plt.savefig('fair_value_sensitivity_heatmap.png', dpi=300, facecolor='#0a0a0a', edgecolor='none')
+print("Saved: fair_value_sensitivity_heatmap.png")
+plt.close()
+
+# ============================================================================
+# VISUALIZATION 6: Tornado Chart
+# ============================================================================
+
+fig, ax = plt.subplots(figsize=(14, 8))
+
+shock = fair_value_sensitivity.TORNADO_SHOCK
+order = tornado.index[::-1]
+y_pos = np.arange(len(order))
+low = tornado.loc[order, 'low_median'].to_numpy() * 100
+high = tornado.loc[order, 'high_median'].to_numpy() * 100
+
+ax.barh(y_pos, low, color='#ff6b6b', alpha=0.8, edgecolor='white', linewidth=1,
+        label=f'Input -{shock:.0%}')
+ax.barh(y_pos, high, color='#4ecdc4', alpha=0.8, edgecolor='white', linewidth=1,
+        label=f'Input +{shock:.0%}')
+
+# Whiskers: 5-95% of the change across the grid
+for side, values in [('low', low), ('high', high)]:
+    spread = tornado.loc[order, [f'{side}_q05', f'{side}_q95']].to_numpy().T * 100
+    ax.errorbar(values, y_pos, xerr=np.abs(spread - values), fmt='none', ecolor='white', alpha=0.6, capsize=4)
+
+ax.axvline(x=0, color='white', linewidth=1, alpha=0.8)
+ax.set_yticks(y_pos)
+ax.set_yticklabels([name.replace('_', ' ').title() for name in order], fontsize=11)
+ax.set_xlabel('Fair Value Change (%)', fontsize=13, weight='bold')
+ax.set_title(f'Fair Value Tornado - {shock:.0%} Input Shocks '
+             f'(median and 5-95% over {tornado_scenarios:,} scenarios)',
+            fontsize=16, weight='bold', pad=20)
+ax.legend(loc='lower right', fontsize=11)
+ax.grid(True, alpha=0.3, axis='x')
+ax.set_facecolor('#1a1a1a')
+fig.patch.set_facecolor('#0a0a0a')
+
+plt.tight_layout()
+plt.savefig('fair_value_tornado.png', dpi=300, facecolor='#0a0a0a', edgecolor='none')
+print("Saved: fair_value_tornado.png")
+plt.close()
+
 print("\nAll visualizations created successfully!")